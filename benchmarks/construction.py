@@ -0,0 +1,183 @@
+"""Client side graph construction latency benchmarks
+
+Time the construction of many Image and Collection objects in Python (no
+Earth Engine requests are made) and optionally profile the construction to
+find the hot spots in Model.__init__(), crop_data_image() and the
+lazy_property access.
+
+Examples
+--------
+    python benchmarks/construction.py --sizes 1000 10000 --profile
+
+Build the objects offline using the algorithm signatures from a test
+recording (see openet/sims/replay.py):
+
+    python benchmarks/construction.py --replay openet/sims/tests/ee_recording.json.gz
+
+"""
+import argparse
+import cProfile
+import datetime
+import logging
+import pstats
+import sys
+import time
+
+import ee
+
+import openet.sims as model
+import openet.sims.replay
+
+MODEL_ARGS = {
+    'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+    'et_reference_band': 'eto',
+    'et_reference_resample': 'nearest',
+}
+
+# Function names reported separately in the profile summary
+HOT_SPOTS = [
+    'Image.__init__', 'Model.__init__', 'crop_data_image', '_lazy_property',
+    'from_landsat_c2_sr', 'Collection.__init__',
+]
+
+
+def image_ids(n):
+    """Generate synthetic (but valid looking) Landsat 8 image IDs"""
+    start_dt = datetime.datetime(2013, 4, 1)
+    for i in range(n):
+        date = (start_dt + datetime.timedelta(days=i % 3650)).strftime('%Y%m%d')
+        wrs2 = f'{30 + (i // 3650) % 10:03d}{30 + i % 7:03d}'
+        yield f'LANDSAT/LC08/C02/T1_L2/LC08_{wrs2}_{date}'
+
+
+def image_from_id(n):
+    """Construct Image objects from image IDs"""
+    for image_id in image_ids(n):
+        model.Image.from_image_id(image_id, **MODEL_ARGS)
+
+
+def image_calculate(n):
+    """Construct Image objects and access the lazy properties"""
+    for image_id in image_ids(n):
+        model.Image.from_image_id(image_id, **MODEL_ARGS).calculate(
+            ['et', 'et_reference', 'et_fraction', 'ndvi']
+        )
+
+
+def collection_geometries(n):
+    """Construct Collection objects for many point geometries"""
+    for i in range(n):
+        model.Collection(
+            collections=['LANDSAT/LC08/C02/T1_L2'],
+            start_date='2017-06-01',
+            end_date='2017-09-01',
+            geometry=ee.Geometry.Point(-121.5 + (i % 1000) * 0.001, 38.7 + (i // 1000) * 0.001),
+            model_args=dict(MODEL_ARGS),
+        )
+
+
+def collection_overpass(n):
+    """Construct Collection objects and build the overpass graphs"""
+    for i in range(n):
+        model.Collection(
+            collections=['LANDSAT/LC08/C02/T1_L2'],
+            start_date='2017-06-01',
+            end_date='2017-09-01',
+            geometry=ee.Geometry.Point(-121.5 + (i % 1000) * 0.001, 38.7 + (i // 1000) * 0.001),
+            model_args=dict(MODEL_ARGS),
+        ).overpass(variables=['et', 'ndvi'])
+
+
+BENCHMARKS = {
+    'image_from_id': image_from_id,
+    'image_calculate': image_calculate,
+    'collection_geometries': collection_geometries,
+    'collection_overpass': collection_overpass,
+}
+
+
+def time_benchmark(func, n):
+    """Return the total seconds to run a benchmark function for n objects"""
+    start_time = time.perf_counter()
+    func(n)
+    return time.perf_counter() - start_time
+
+
+def profile_benchmark(func, n, top=25, output=None):
+    """Profile a benchmark function and print the slowest functions"""
+    profiler = cProfile.Profile()
+    profiler.runcall(func, n)
+    if output:
+        profiler.dump_stats(output)
+
+    stats = pstats.Stats(profiler).strip_dirs().sort_stats('cumulative')
+    stats.print_stats(top)
+
+    print('Hot spots (calls, total seconds, cumulative seconds, cumulative us per object)')
+    for (filename, line, name), (cc, nc, tt, ct, callers) in sorted(stats.stats.items()):
+        qualified_name = name
+        if filename in ['image.py', 'model.py', 'collection.py'] and name == '__init__':
+            qualified_name = {
+                'image.py': 'Image', 'model.py': 'Model', 'collection.py': 'Collection'
+            }[filename] + '.__init__'
+        if qualified_name in HOT_SPOTS:
+            print(
+                f'  {qualified_name:<24s} {nc:>10d} {tt:>10.3f} {ct:>10.3f}'
+                f' {1000000 * ct / n:>10.1f}  ({filename}:{line})'
+            )
+
+
+def main(names, sizes, profile=False, profile_top=25, profile_output=None):
+    for name in names:
+        for n in sizes:
+            seconds = time_benchmark(BENCHMARKS[name], n)
+            print(f'{name:<24s} {n:>8d} {seconds:>10.3f}s {1000000 * seconds / n:>10.1f}us/object')
+
+        if profile:
+            print(f'\nProfile: {name} ({sizes[0]} objects)')
+            profile_benchmark(
+                BENCHMARKS[name], sizes[0], top=profile_top,
+                output=f'{profile_output}_{name}.prof' if profile_output else None,
+            )
+            print()
+
+
+def arg_parse():
+    parser = argparse.ArgumentParser(
+        description='Client side graph construction benchmarks',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        '--benchmarks', default=list(BENCHMARKS.keys()), nargs='+',
+        choices=list(BENCHMARKS.keys()), help='Benchmarks to run')
+    parser.add_argument(
+        '--sizes', default=[1000, 10000, 100000], nargs='+', type=int,
+        help='Number of objects to construct')
+    parser.add_argument(
+        '--profile', default=False, action='store_true',
+        help='Profile each benchmark at the first size')
+    parser.add_argument(
+        '--top', default=25, type=int, help='Number of profile functions to print')
+    parser.add_argument(
+        '--profile-output', default=None,
+        help='Write the cProfile stats to "{profile_output}_{benchmark}.prof"')
+    parser.add_argument(
+        '--replay', default=None,
+        help='Build the objects offline using the algorithms from a recording file')
+    parser.add_argument(
+        '--project', default=None, help='Earth Engine project ID')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = arg_parse()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+    if args.replay:
+        openet.sims.replay.Recorder(args.replay, mode='replay').start()
+    else:
+        ee.Initialize(project=args.project)
+
+    sys.exit(main(
+        args.benchmarks, args.sizes, profile=args.profile, profile_top=args.top,
+        profile_output=args.profile_output,
+    ))
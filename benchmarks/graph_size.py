@@ -0,0 +1,301 @@
+"""Serialized Earth Engine graph size benchmarks
+
+Build the graphs for Image.calculate(), Collection.overpass(),
+Collection.interpolate() and interpolate.from_scene_et_fraction() for a
+matrix of variables, time intervals, flags and date spans, and report the
+node count, serialized size and client side build time of each graph.
+
+The node counts and sizes are compared against a stored baseline file,
+and cases that grow more than the tolerance are reported as regressions.
+The script exits with an error if the baseline file does not exist.
+
+Examples
+--------
+Write the baseline file (with a live Earth Engine connection):
+
+    python benchmarks/graph_size.py --update
+
+Compare against the baseline without a connection, using the algorithm
+signatures from a test recording (see openet/sims/replay.py):
+
+    python benchmarks/graph_size.py --replay openet/sims/tests/ee_recording.json.gz
+
+The committed baseline is generated with the algorithm signatures bundled
+with the earthengine-api test fixtures, which needs no credentials:
+
+    python benchmarks/graph_size.py --offline
+    python benchmarks/graph_size.py --offline --update
+
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+import ee
+
+import openet.sims as model
+import openet.sims.interpolate as interpolate
+import openet.sims.replay
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'graph_size.json')
+
+IMAGE_ID = 'LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716'
+COLLECTIONS = ['LANDSAT/LC08/C02/T1_L2', 'LANDSAT/LE07/C02/T1_L2']
+GEOMETRY = [-121.5265, 38.7399]
+MODEL_ARGS = {
+    'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+    'et_reference_band': 'eto',
+    'et_reference_resample': 'nearest',
+}
+DATE_SPANS = {
+    '1m': ['2017-07-01', '2017-08-01'],
+    '1y': ['2017-01-01', '2018-01-01'],
+    '5y': ['2015-01-01', '2020-01-01'],
+}
+VARIABLES = {
+    'et': ['et'],
+    'all': ['et', 'et_reference', 'et_fraction', 'ndvi'],
+}
+# The node keys of the cloud API graph encoding (see ee.serializer)
+VALUE_NODE_KEYS = {
+    'argumentReference', 'arrayValue', 'bytesValue', 'constantValue',
+    'dictionaryValue', 'functionDefinitionValue', 'functionInvocationValue',
+    'integerValue', 'valueReference',
+}
+
+
+def count_nodes(graph):
+    """Count the value nodes in a cloud API encoded graph"""
+    if isinstance(graph, dict):
+        count = 1 if VALUE_NODE_KEYS.intersection(graph.keys()) else 0
+        return count + sum(count_nodes(v) for v in graph.values())
+    elif isinstance(graph, list):
+        return sum(count_nodes(v) for v in graph)
+    return 0
+
+
+def graph_stats(build_func):
+    """Build an Earth Engine object and measure the serialized graph
+
+    Parameters
+    ----------
+    build_func : function
+        Function with no arguments that returns the Earth Engine object.
+
+    Returns
+    -------
+    dict : nodes, bytes, build_seconds, serialize_seconds
+
+    """
+    build_time = time.perf_counter()
+    ee_obj = build_func()
+    build_seconds = time.perf_counter() - build_time
+
+    serialize_time = time.perf_counter()
+    graph = ee.serializer.encode(ee_obj, for_cloud_api=True)
+    graph_json = json.dumps(graph, separators=(',', ':'))
+    serialize_seconds = time.perf_counter() - serialize_time
+
+    return {
+        'nodes': count_nodes(graph),
+        'bytes': len(graph_json),
+        'build_seconds': round(build_seconds, 4),
+        'serialize_seconds': round(serialize_seconds, 4),
+    }
+
+
+def collection_obj(span, **kwargs):
+    start_date, end_date = DATE_SPANS[span]
+    return model.Collection(
+        collections=COLLECTIONS,
+        start_date=start_date,
+        end_date=end_date,
+        geometry=ee.Geometry.Point(GEOMETRY),
+        cloud_cover_max=70,
+        model_args=dict(MODEL_ARGS),
+        **kwargs
+    )
+
+
+def benchmark_cases():
+    """Yield the case names and the functions that build each graph"""
+    flags = list(itertools.product([False, True], [True, False]))
+
+    for var_name, (crop_type_kc_flag, water_kc_flag) in itertools.product(VARIABLES, flags):
+        name = (
+            f'image.calculate|variables={var_name}|crop_type_kc_flag={crop_type_kc_flag}'
+            f'|water_kc_flag={water_kc_flag}'
+        )
+        yield name, lambda v=var_name, c=crop_type_kc_flag, w=water_kc_flag: (
+            model.Image.from_image_id(
+                IMAGE_ID, crop_type_kc_flag=c, water_kc_flag=w, **MODEL_ARGS
+            ).calculate(VARIABLES[v])
+        )
+
+    for var_name, span in itertools.product(VARIABLES, DATE_SPANS):
+        yield f'collection.overpass|variables={var_name}|span={span}', \
+            lambda v=var_name, s=span: collection_obj(s).overpass(variables=VARIABLES[v])
+
+    for var_name, t_interval, span in itertools.product(
+            VARIABLES, ['daily', 'monthly', 'annual', 'custom'], DATE_SPANS):
+        if t_interval == 'daily' and span == '5y':
+            continue
+        yield f'collection.interpolate|variables={var_name}|t_interval={t_interval}|span={span}', \
+            lambda v=var_name, t=t_interval, s=span: (
+                collection_obj(s).interpolate(variables=VARIABLES[v], t_interval=t)
+            )
+
+    for t_interval, soil_evap, span in itertools.product(
+            ['daily', 'monthly'], [False, True], ['1m', '1y']):
+        name = (
+            f'interpolate.from_scene_et_fraction|t_interval={t_interval}'
+            f'|estimate_soil_evaporation={soil_evap}|span={span}'
+        )
+        yield name, lambda t=t_interval, e=soil_evap, s=span: (
+            interpolate.from_scene_et_fraction(
+                collection_obj(s).overpass(variables=['et_fraction', 'ndvi']),
+                start_date=DATE_SPANS[s][0],
+                end_date=DATE_SPANS[s][1],
+                variables=['et', 'et_reference', 'et_fraction', 'ndvi'],
+                interp_args={'interp_method': 'linear', 'interp_days': 32,
+                             'estimate_soil_evaporation': e},
+                model_args=dict(MODEL_ARGS),
+                t_interval=t,
+            )
+        )
+
+
+def compare(results, baseline, tolerance):
+    """Return the cases whose node count or size grew past the tolerance
+
+    Baseline cases that now fail to build are also returned.
+
+    """
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        elif 'error' in stats:
+            regressions.append(f'{name} error: {stats["error"]}')
+            continue
+        for key in ['nodes', 'bytes']:
+            if stats[key] > baseline[name][key] * (1 + tolerance):
+                regressions.append(f'{name} {key}: {baseline[name][key]} -> {stats[key]}')
+    return regressions
+
+
+def main(baseline_path=BASELINE_PATH, update=False, tolerance=0.05, pattern=None, output=None):
+    results = {}
+    for name, build_func in benchmark_cases():
+        if pattern and pattern not in name:
+            continue
+        try:
+            results[name] = graph_stats(build_func)
+        except Exception as e:
+            # Some graphs make getInfo calls while being built
+            logging.warning(f'{name}: {e}')
+            results[name] = {'error': str(e)}
+            continue
+        print(
+            f'{results[name]["nodes"]:>8d} {results[name]["bytes"]:>10d} '
+            f'{results[name]["build_seconds"]:>8.3f}s  {name}'
+        )
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if update:
+        baseline = {
+            name: {'nodes': stats['nodes'], 'bytes': stats['bytes']}
+            for name, stats in results.items() if 'error' not in stats
+        }
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'\nBaseline written to {baseline_path}')
+        return 0
+
+    if not os.path.isfile(baseline_path):
+        print(
+            f'\nERROR: baseline file {baseline_path} does not exist, nothing was compared.'
+            f'\nGenerate it with --update and commit it.'
+        )
+        return 2
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    new_cases = sorted(name for name in results if name not in baseline)
+    if new_cases:
+        print('\nCases missing from the baseline (not compared):')
+        for name in new_cases:
+            print(f'  {name}')
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f'  {regression}')
+        return 1
+    print('\nNo regressions')
+    return 0
+
+
+def offline_initialize():
+    """Initialize the Earth Engine classes from the bundled test signatures"""
+    import ee.apitestcase
+
+    def compute_value(obj):
+        raise ee.ee_exception.EEException('getInfo calls are not supported offline')
+
+    ee.data.getAlgorithms = ee.apitestcase.GetAlgorithms
+    ee.data.computeValue = compute_value
+    openet.sims.replay.initialize_classes()
+
+
+def arg_parse():
+    parser = argparse.ArgumentParser(
+        description='Serialized graph size benchmarks',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        '--baseline', default=BASELINE_PATH, help='Baseline JSON file path')
+    parser.add_argument(
+        '--update', default=False, action='store_true',
+        help='Write the results to the baseline file')
+    parser.add_argument(
+        '--tolerance', default=0.05, type=float,
+        help='Allowed fractional increase in node count and size')
+    parser.add_argument(
+        '--pattern', default=None, help='Only run the cases containing this string')
+    parser.add_argument(
+        '--output', default=None, help='Write the full results to a JSON file')
+    parser.add_argument(
+        '--replay', default=None,
+        help='Build the graphs offline using the algorithms from a recording file')
+    parser.add_argument(
+        '--offline', default=False, action='store_true',
+        help='Build the graphs offline using the earthengine-api test algorithm signatures')
+    parser.add_argument(
+        '--project', default=None, help='Earth Engine project ID')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = arg_parse()
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+    if args.replay:
+        openet.sims.replay.Recorder(args.replay, mode='replay').start()
+    elif args.offline:
+        offline_initialize()
+    else:
+        ee.Initialize(project=args.project)
+
+    sys.exit(main(
+        baseline_path=args.baseline, update=args.update, tolerance=args.tolerance,
+        pattern=args.pattern, output=args.output,
+    ))
@@ -2,7 +2,12 @@
 
 from .image import Image
 from .collection import Collection
+from . import catalog
+from . import export
+from . import extract
 from . import interpolate
+from . import workqueue
+from . import wrs2
 
 MODEL_NAME = 'SIMS'
 
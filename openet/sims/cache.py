@@ -0,0 +1,186 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import ee
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'openet-sims', 'results.sqlite')
+
+# Module level cache used by utils.getinfo() (see enable())
+_default_cache = None
+
+# Sentinel for distinguishing missing results from cached None values
+_MISSING = object()
+
+
+def graph_hash(ee_obj, params=None):
+    """Compute a stable hash of a serialized Earth Engine graph
+
+    Parameters
+    ----------
+    ee_obj : ee.ComputedObject
+    params : dict, optional
+        Additional call parameters to include in the hash.
+
+    Returns
+    -------
+    str : hex SHA256 digest
+
+    """
+    graph = ee.serializer.encode(ee_obj, for_cloud_api=True)
+    key_str = json.dumps([graph, params or {}], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(key_str.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """SQLite backed getInfo result cache with LRU size limits and a TTL"""
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=10000, max_bytes=None, ttl=None):
+        """
+
+        Parameters
+        ----------
+        path : str, optional
+            SQLite database path (the default is ~/.cache/openet-sims/results.sqlite).
+            Set to ':memory:' for a cache that is not written to disk.
+        max_entries : int, optional
+            Maximum number of stored results (the default is 10000).
+        max_bytes : int, optional
+            Maximum total size of the stored (JSON) results (the default is None).
+        ttl : float, optional
+            Number of seconds a result is valid for (the default is None).
+            If not set, results do not expire.
+
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A single connection is shared by all threads (guarded by the lock)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, value TEXT, size INTEGER, '
+                'created REAL, accessed REAL)'
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __contains__(self, key):
+        return self.get(key, default=_MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        """Return the cached result for a key (or default if missing/expired)"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT value, created FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            if self.ttl is not None and (now - row[1]) >= self.ttl:
+                self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                return default
+            self._conn.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store a JSON serializable result and evict the least recently used"""
+        value_str = json.dumps(value)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                (key, value_str, len(value_str), now, now)
+            )
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used results above the size limits"""
+        if self.max_entries is not None:
+            self._conn.execute(
+                'DELETE FROM results WHERE key IN ('
+                'SELECT key FROM results ORDER BY accessed DESC, rowid DESC '
+                'LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+        if self.max_bytes is not None:
+            total = 0
+            rows = self._conn.execute(
+                'SELECT key, size FROM results ORDER BY accessed DESC, rowid DESC'
+            ).fetchall()
+            for key, size in rows:
+                total += size
+                if total > self.max_bytes:
+                    self._conn.execute('DELETE FROM results WHERE key = ?', (key,))
+
+    def clear(self):
+        """Remove all stored results"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM results')
+
+    def getinfo(self, ee_obj, params=None, **kwargs):
+        """Return the cached getInfo result, making the call on a cache miss
+
+        Parameters
+        ----------
+        ee_obj : ee.ComputedObject
+        params : dict, optional
+            Additional call parameters to include in the cache key.
+        kwargs : dict, optional
+            Additional keyword arguments passed to utils.getinfo_retry().
+
+        """
+        from . import utils
+
+        key = graph_hash(ee_obj, params)
+        output = self.get(key, default=_MISSING)
+        if output is not _MISSING:
+            logging.debug(f'    Cache hit {key[:12]}')
+            return output
+
+        output = utils.getinfo_retry(ee_obj, **kwargs)
+        self.set(key, output)
+        return output
+
+
+def enable(path=DEFAULT_PATH, **kwargs):
+    """Cache all utils.getinfo() results (and the functions that call it)
+
+    Parameters
+    ----------
+    path : str, optional
+        SQLite database path (the default is ~/.cache/openet-sims/results.sqlite).
+    kwargs : dict, optional
+        Additional keyword arguments passed to ResultCache().
+
+    Returns
+    -------
+    ResultCache
+
+    """
+    global _default_cache
+    _default_cache = ResultCache(path, **kwargs)
+    return _default_cache
+
+
+def disable():
+    """Stop caching utils.getinfo() results"""
+    global _default_cache
+    _default_cache = None
+
+
+def get_cache():
+    """Return the enabled ResultCache (or None if caching is not enabled)"""
+    return _default_cache
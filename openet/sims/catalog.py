@@ -0,0 +1,475 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from dateutil.relativedelta import relativedelta
+import ee
+import openet.core.common
+
+from . import cache
+from . import utils
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'openet-sims', 'catalog.sqlite')
+
+# Scenes can be added to the Landsat collections weeks after they were
+#   acquired, so incremental refreshes start this many days before the
+#   end of the last refresh
+REFRESH_OVERLAP_DAYS = 60
+
+
+class SceneCatalog:
+    """Local SQLite catalog of Landsat Collection 2 Level 2 scene metadata
+
+    The catalog stores the image ID, time_start, CLOUD_COVER_LAND, WRS2 path
+    and row, and the footprint (and its bounding box) of each scene, along with the
+    date ranges (and extents) that have been refreshed from Earth Engine.
+    Scene lists can then be planned and counted without a network call.
+
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+
+        Parameters
+        ----------
+        path : str, optional
+            SQLite database path (the default is ~/.cache/openet-sims/catalog.sqlite).
+            Set to ':memory:' for a catalog that is not written to disk.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS scenes ('
+                'image_id TEXT PRIMARY KEY, collection TEXT, time_start INTEGER, '
+                'cloud_cover_land REAL, wrs_path INTEGER, wrs_row INTEGER, '
+                'xmin REAL, ymin REAL, xmax REAL, ymax REAL, footprint TEXT)'
+            )
+            # Catalogs written before the footprints were stored
+            columns = [row[1] for row in self._conn.execute('PRAGMA table_info(scenes)')]
+            if 'footprint' not in columns:
+                self._conn.execute('ALTER TABLE scenes ADD COLUMN footprint TEXT')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS scenes_time ON scenes (collection, time_start)'
+            )
+            # Refreshed date ranges, a NULL extent is a global refresh
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS refreshes ('
+                'collection TEXT, start_date TEXT, end_date TEXT, '
+                'xmin REAL, ymin REAL, xmax REAL, ymax REAL, updated TEXT)'
+            )
+            # Scene clear fractions keyed on the geometry and scale hash
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS clear_fractions ('
+                'image_id TEXT, geometry_key TEXT, clear_fraction REAL, '
+                'PRIMARY KEY (image_id, geometry_key))'
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM scenes').fetchone()[0]
+
+    def add_scenes(self, collection, rows):
+        """Insert or update scene metadata
+
+        Parameters
+        ----------
+        collection : str
+            Collection ID (i.e. 'LANDSAT/LC08/C02/T1_L2').
+        rows : list
+            Lists of [system:index, time_start, cloud_cover_land, wrs_path,
+            wrs_row, xmin, ymin, xmax, ymax, footprint].  The footprint is a
+            GeoJSON geometry dictionary and is optional.
+
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO scenes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (f'{collection}/{row[0]}', collection, *row[1:9],
+                     json.dumps(row[9]) if len(row) > 9 and row[9] is not None else None)
+                    for row in rows
+                ]
+            )
+
+    def add_refresh(self, collection, start_date, end_date, bbox=None):
+        """Record that a date range (and extent) has been refreshed"""
+        bbox = bbox or [None, None, None, None]
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO refreshes VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (collection, start_date, end_date, *bbox,
+                 datetime.datetime.now(datetime.timezone.utc).isoformat())
+            )
+
+    def _refreshes(self, collection, bbox=None):
+        """Return the refreshed date ranges whose extent contains the bbox"""
+        query = 'SELECT start_date, end_date FROM refreshes WHERE collection = ? AND (xmin IS NULL'
+        params = [collection]
+        if bbox is not None:
+            query += ' OR (xmin <= ? AND ymin <= ? AND xmax >= ? AND ymax >= ?)'
+            params.extend(bbox)
+        query += ') ORDER BY start_date'
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def covers(self, collections, start_date, end_date, bbox=None):
+        """Check if the catalog has been refreshed for the dates and extent
+
+        Parameters
+        ----------
+        collections : list
+        start_date : str
+            ISO format start date (inclusive).
+        end_date : str
+            ISO format end date (exclusive).
+        bbox : list, optional
+            [xmin, ymin, xmax, ymax] extent (the default is None).
+            If not set, only global refreshes are considered.
+
+        Returns
+        -------
+        bool
+
+        """
+        for collection in collections:
+            covered_date = start_date
+            for refresh_start, refresh_end in self._refreshes(collection, bbox):
+                if refresh_start > covered_date:
+                    break
+                covered_date = max(covered_date, refresh_end)
+            if covered_date < end_date:
+                return False
+        return True
+
+    def scenes(self, collections, start_date, end_date, bbox=None, cloud_cover_max=None):
+        """Return the scene metadata for the collections, dates and extent
+
+        Parameters
+        ----------
+        collections : list
+        start_date : str
+            ISO format start date (inclusive).
+        end_date : str
+            ISO format end date (exclusive).
+        bbox : list, optional
+            [xmin, ymin, xmax, ymax] extent.  Scenes are selected if their
+            footprint bounding box intersects the extent, so some scenes
+            may not actually intersect the geometry.  The default is None.
+        cloud_cover_max : float, optional
+            Maximum CLOUD_COVER_LAND (exclusive), scenes with missing values
+            (less than -0.5) are also removed.  The default is None.
+
+        Returns
+        -------
+        list of dict sorted by image ID, the footprint is a GeoJSON geometry
+            dictionary (or None if it was not stored)
+
+        """
+        query = (
+            f'SELECT * FROM scenes WHERE collection IN ({", ".join("?" * len(collections))}) '
+            f'AND time_start >= ? AND time_start < ?'
+        )
+        params = [*collections, utils.millis(_parse_date(start_date)), utils.millis(_parse_date(end_date))]
+        if bbox is not None:
+            query += ' AND xmin <= ? AND ymin <= ? AND xmax >= ? AND ymax >= ?'
+            params.extend([bbox[2], bbox[3], bbox[0], bbox[1]])
+        if cloud_cover_max is not None:
+            query += ' AND cloud_cover_land < ? AND cloud_cover_land > -0.5'
+            params.append(cloud_cover_max)
+        query += ' ORDER BY image_id'
+
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            columns = [c[0] for c in cursor.description]
+            scenes = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        for scene in scenes:
+            if scene['footprint'] is not None:
+                scene['footprint'] = json.loads(scene['footprint'])
+        return scenes
+
+    def image_ids(self, collections, start_date, end_date, bbox=None, cloud_cover_max=None):
+        """Return the sorted image IDs (see scenes() for the parameters)"""
+        return [
+            scene['image_id']
+            for scene in self.scenes(collections, start_date, end_date, bbox, cloud_cover_max)
+        ]
+
+    def count(self, collections, start_date, end_date, bbox=None, cloud_cover_max=None):
+        """Return the number of scenes (see scenes() for the parameters)"""
+        return len(self.scenes(collections, start_date, end_date, bbox, cloud_cover_max))
+
+    def footprints(self, collections=None):
+        """Return the WRS2 path/row footprint bounding boxes
+
+        Parameters
+        ----------
+        collections : list, optional
+            Only use the scenes from these collections (the default is None).
+
+        Returns
+        -------
+        dict : [xmin, ymin, xmax, ymax] of all the scenes for each path/row,
+            keyed on the (path, row) tuple
+
+        """
+        query = (
+            'SELECT wrs_path, wrs_row, MIN(xmin), MIN(ymin), MAX(xmax), MAX(ymax) '
+            'FROM scenes WHERE wrs_path IS NOT NULL AND wrs_row IS NOT NULL'
+        )
+        params = []
+        if collections:
+            query += f' AND collection IN ({", ".join("?" * len(collections))})'
+            params.extend(collections)
+        query += ' GROUP BY wrs_path, wrs_row'
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {(row[0], row[1]): list(row[2:]) for row in rows}
+
+    def cached_clear_fractions(self, geometry, scale=300):
+        """Return all the cached clear fractions for a geometry (without a request)
+
+        Parameters
+        ----------
+        geometry : ee.Geometry
+        scale : float, optional
+            Reduction scale in meters (the default is 300).
+
+        Returns
+        -------
+        dict : clear fraction (0-1) keyed on the image ID
+
+        """
+        geometry_key = cache.graph_hash(geometry, {'scale': scale})
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT image_id, clear_fraction FROM clear_fractions WHERE geometry_key = ?',
+                [geometry_key]
+            ).fetchall()
+        return dict(rows)
+
+    def clear_fractions(self, image_ids, geometry, scale=300, chunk_size=50, max_workers=8):
+        """Return the clear fraction of each scene within a geometry
+
+        Cached values are read from the catalog and the missing values are
+        computed (see clear_fraction()) and stored.
+
+        Parameters
+        ----------
+        image_ids : list
+            Landsat Collection 2 Level 2 image IDs.
+        geometry : ee.Geometry
+        scale : float, optional
+            Reduction scale in meters (the default is 300).
+        chunk_size : int, optional
+            Number of scenes in each request (the default is 50).
+        max_workers : int, optional
+            Maximum number of concurrent requests (the default is 8).
+
+        Returns
+        -------
+        dict : clear fraction (0-1) keyed on the image ID
+
+        """
+        geometry_key = cache.graph_hash(geometry, {'scale': scale})
+        cached = self.cached_clear_fractions(geometry, scale=scale)
+        output = {image_id: cached[image_id] for image_id in image_ids if image_id in cached}
+
+        missing_ids = [image_id for image_id in image_ids if image_id not in output]
+        chunks = [missing_ids[i:i + chunk_size] for i in range(0, len(missing_ids), chunk_size)]
+        values = utils.getinfo_batch(
+            [
+                ee.List([clear_fraction(ee.Image(image_id), geometry, scale) for image_id in chunk])
+                for chunk in chunks
+            ],
+            max_workers=max_workers,
+        )
+        new_rows = [
+            (image_id, geometry_key, value if value is not None else 0)
+            for chunk, chunk_values in zip(chunks, values)
+            for image_id, value in zip(chunk, chunk_values)
+        ]
+        if new_rows:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO clear_fractions VALUES (?, ?, ?)', new_rows
+                )
+        output.update({row[0]: row[2] for row in new_rows})
+
+        return output
+
+    def refresh_start_date(self, collection, bbox=None):
+        """Return the start date for an incremental refresh (or None)"""
+        refreshes = self._refreshes(collection, bbox)
+        if not refreshes:
+            return None
+        last_end_dt = _parse_date(max(end for start, end in refreshes))
+        return (last_end_dt - datetime.timedelta(days=REFRESH_OVERLAP_DAYS)).strftime('%Y-%m-%d')
+
+    def refresh(self, collections, start_date=None, end_date=None, geometry=None, max_workers=4):
+        """Update the scene metadata from Earth Engine
+
+        Parameters
+        ----------
+        collections : list, str
+            Landsat Collection 2 Level 2 collection IDs.
+        start_date : str, optional
+            ISO format start date (inclusive).  If not set, the refresh will
+            start shortly before the end of the previous refresh.
+        end_date : str, optional
+            ISO format end date (exclusive).  The default is tomorrow.
+        geometry : ee.Geometry, list, optional
+            Only refresh scenes intersecting the geometry or bounding box.
+            The default is None (global).
+        max_workers : int, optional
+            Maximum number of concurrent monthly requests (the default is 4).
+
+        Returns
+        -------
+        int : number of scenes read
+
+        Raises
+        ------
+        ValueError if start_date is not set and the collection has not been
+            refreshed before
+
+        """
+        if isinstance(collections, str):
+            collections = [collections]
+        if end_date is None:
+            end_date = (
+                datetime.datetime.now(datetime.timezone.utc).date() + datetime.timedelta(days=1)
+            ).isoformat()
+
+        bbox = utils.geometry_bbox(geometry) if geometry is not None else None
+        ee_geometry = ee.Geometry.Rectangle(bbox, 'EPSG:4326', False) if bbox else None
+
+        scene_count = 0
+        for collection in collections:
+            coll_start_date = start_date or self.refresh_start_date(collection, bbox)
+            if coll_start_date is None:
+                raise ValueError(f'start_date must be set for the first refresh of {collection}')
+
+            # Request each month separately to keep the responses small
+            start_dt, end_dt = _parse_date(coll_start_date), _parse_date(end_date)
+            month_dts = [start_dt]
+            while month_dts[-1] < end_dt:
+                month_dts.append(min(start_dt + relativedelta(months=len(month_dts)), end_dt))
+            month_dates = [
+                (dt.strftime('%Y-%m-%d'), next_dt.strftime('%Y-%m-%d'))
+                for dt, next_dt in zip(month_dts[:-1], month_dts[1:])
+            ]
+
+            # The results are not cached since recent scenes are still being added
+            build_func = functools.partial(scene_metadata, collection, geometry=ee_geometry)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                outputs = executor.map(
+                    lambda dates: utils.getinfo_date_bisect(
+                        build_func, dates[0], dates[1], merge_reduce_columns, use_cache=False),
+                    month_dates
+                )
+                for output in outputs:
+                    rows = [_scene_row(row) for row in output['list']]
+                    self.add_scenes(collection, rows)
+                    scene_count += len(rows)
+
+            self.add_refresh(collection, coll_start_date, end_date, bbox)
+            logging.info(f'  {collection} {coll_start_date} {end_date}: {scene_count} scenes')
+
+        return scene_count
+
+
+def scene_metadata(collection, start_date, end_date, geometry=None):
+    """Build the scene metadata request for a collection and date range
+
+    Parameters
+    ----------
+    collection : str
+    start_date : str
+    end_date : str
+    geometry : ee.Geometry, optional
+
+    Returns
+    -------
+    ee.Dictionary : reduceColumns toList output with a row for each scene
+        [system:index, time_start, cloud_cover_land, wrs_path, wrs_row, footprint]
+
+    """
+    coll = ee.ImageCollection(collection).filterDate(start_date, end_date)
+    if geometry is not None:
+        coll = coll.filterBounds(geometry)
+
+    def scene_ftr(image):
+        return ee.Feature(None, {
+            'index': image.get('system:index'),
+            'time': image.get('system:time_start'),
+            'cloud_cover': image.get('CLOUD_COVER_LAND'),
+            'wrs_path': image.get('WRS_PATH'),
+            'wrs_row': image.get('WRS_ROW'),
+            'footprint': image.geometry(),
+        })
+
+    selectors = ['index', 'time', 'cloud_cover', 'wrs_path', 'wrs_row', 'footprint']
+    return (
+        ee.FeatureCollection(coll.map(scene_ftr))
+        .reduceColumns(ee.Reducer.toList(len(selectors)), selectors)
+    )
+
+
+def clear_fraction(image, geometry, scale=300):
+    """Compute the clear (unmasked) fraction of a scene within a geometry
+
+    The QA_PIXEL cloud mask is built with the cirrus, dilate, shadow and
+    snow flags set (the Image.from_landsat_c2_sr() defaults), and fill
+    pixels outside the scene footprint are not counted.
+
+    Parameters
+    ----------
+    image : ee.Image
+        Landsat Collection 2 Level 2 image.
+    geometry : ee.Geometry
+    scale : float, optional
+        Reduction scale in meters (the default is 300).
+
+    Returns
+    -------
+    ee.Number : the clear fraction, null if the geometry has no scene pixels
+
+    """
+    clear_mask = (
+        openet.core.common.landsat_c2_sr_cloud_mask(
+            image, cirrus_flag=True, dilate_flag=True, shadow_flag=True, snow_flag=True,
+        )
+        .updateMask(image.select(['QA_PIXEL']).bitwiseAnd(1).eq(0))
+        .rename(['clear'])
+    )
+    return ee.Number(
+        clear_mask.reduceRegion(
+            reducer=ee.Reducer.mean(), geometry=geometry, scale=scale, bestEffort=True,
+        ).get('clear')
+    )
+
+
+def merge_reduce_columns(outputs):
+    """Merge reduceColumns toList outputs"""
+    return {'list': [row for output in outputs for row in output['list']]}
+
+
+def _scene_row(row):
+    """Convert a scene_metadata() row to a catalog row"""
+    xmin, ymin, xmax, ymax = utils.geometry_bbox(row[5])
+    return [row[0], row[1], row[2], row[3], row[4], xmin, ymin, xmax, ymax, row[5]]
+
+
+def _parse_date(date_str):
+    return datetime.datetime.strptime(date_str, '%Y-%m-%d')
@@ -0,0 +1,352 @@
+"""Run SIMS interpolation work units from an INI file
+
+Example INI file:
+
+    [INPUTS]
+    collections = LANDSAT/LC08/C02/T1_L2, LANDSAT/LE07/C02/T1_L2
+    start_date = 2017-01-01
+    end_date = 2018-01-01
+    # Bounding box [xmin, ymin, xmax, ymax] or a GeoJSON file path
+    geometry = -121.6, 38.5, -121.4, 38.7
+    cloud_cover_max = 70
+    # Split the date range into 'month' or 'year' windows (or 'none')
+    date_window = month
+
+    [INTERPOLATE]
+    variables = et, et_reference, et_fraction
+    t_interval = monthly
+    interp_days = 32
+
+    [MODEL]
+    et_reference_source = IDAHO_EPSCOR/GRIDMET
+    et_reference_band = eto
+    et_reference_resample = nearest
+
+    [EXPORT]
+    # 'asset' starts an export task for each unit, 'dryrun' only builds the graphs
+    mode = asset
+    asset_folder = projects/my-project/assets/sims
+    crs = EPSG:4326
+    crs_transform = 0.00025, 0, -180, 0, -0.00025, 90
+    tile_size = 1024
+
+"""
+import argparse
+from ast import literal_eval
+from concurrent.futures import as_completed, ProcessPoolExecutor, ThreadPoolExecutor
+import configparser
+import datetime
+import functools
+import inspect
+import json
+import logging
+import sys
+import time
+
+from dateutil.relativedelta import relativedelta
+import ee
+
+from . import export
+from . import utils
+from .collection import Collection
+
+SECTIONS = ['INPUTS', 'INTERPOLATE', 'MODEL', 'EXPORT']
+LIST_KEYS = ['collections', 'variables', 'geometry', 'crs_transform']
+DATE_WINDOWS = {'none': None, 'month': relativedelta(months=1), 'year': relativedelta(years=1)}
+EXPORT_MODES = ['asset', 'dryrun']
+# Collection.interpolate() keyword arguments that can be set in the INTERPOLATE
+#   section (the dates and scene collection are set for each work unit)
+INTERPOLATE_KEYS = sorted(
+    (set(inspect.signature(Collection.interpolate).parameters.keys()) |
+     {'et_reference_source', 'et_reference_band', 'et_reference_factor', 'et_reference_resample'}) -
+    {'self', 'kwargs', 'start_date', 'end_date', 'scene_coll'}
+)
+
+
+def parse_value(value, list_flag=False):
+    """Convert an INI value string to a Python value
+
+    Parameters
+    ----------
+    value : str
+    list_flag : bool, optional
+        If True, split the value on commas (the default is False).
+
+    Returns
+    -------
+    int, float, bool, None, str, or a list of these
+
+    """
+    if list_flag:
+        return [parse_value(item) for item in value.split(',') if item.strip()]
+    value = value.strip()
+    if value.lower() in ['none', '']:
+        return None
+    try:
+        return literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+
+def read_ini(ini_path):
+    """Read the INI file sections into parameter dictionaries
+
+    Parameters
+    ----------
+    ini_path : str
+
+    Returns
+    -------
+    dict : INPUTS, INTERPOLATE, MODEL and EXPORT parameter dictionaries
+
+    Raises
+    ------
+    ValueError if the INI file can't be read or required parameters are missing
+
+    """
+    config = configparser.ConfigParser(inline_comment_prefixes=('#', ';'))
+    if not config.read(ini_path):
+        raise ValueError(f'INI file could not be read: {ini_path}')
+
+    ini = {
+        section: {
+            key: parse_value(value, key in LIST_KEYS)
+            for key, value in (config[section].items() if config.has_section(section) else [])
+        }
+        for section in SECTIONS
+    }
+
+    for key in ['collections', 'start_date', 'end_date', 'geometry']:
+        if ini['INPUTS'].get(key) is None:
+            raise ValueError(f'INPUTS {key} parameter must be set')
+    for key in ini['INTERPOLATE'].keys():
+        if key not in INTERPOLATE_KEYS:
+            raise ValueError(f'unsupported INTERPOLATE parameter: {key}')
+    if (ini['INPUTS'].get('date_window') or 'none') not in DATE_WINDOWS:
+        raise ValueError(f'unsupported date_window: {ini["INPUTS"]["date_window"]}')
+    if (ini['EXPORT'].get('mode') or 'dryrun') not in EXPORT_MODES:
+        raise ValueError(f'unsupported export mode: {ini["EXPORT"]["mode"]}')
+    if ini['EXPORT'].get('mode') == 'asset':
+        for key in ['asset_folder', 'crs_transform']:
+            if ini['EXPORT'].get(key) is None:
+                raise ValueError(f'EXPORT {key} parameter must be set for asset exports')
+
+    return ini
+
+
+def _geometry_bbox(geometry):
+    """Return the INPUTS geometry bounding box (from a list or GeoJSON file)"""
+    if isinstance(geometry, list) and len(geometry) == 1 and isinstance(geometry[0], str):
+        with open(geometry[0]) as f:
+            geojson = json.load(f)
+        if geojson['type'] == 'FeatureCollection':
+            geojson = {'type': 'GeometryCollection', 'geometries': [f['geometry'] for f in geojson['features']]}
+        elif geojson['type'] == 'Feature':
+            geojson = geojson['geometry']
+        return utils.geometry_bbox(geojson)
+    return utils.geometry_bbox(geometry)
+
+
+def work_units(ini):
+    """Expand the INI date range and geometry into work units
+
+    Parameters
+    ----------
+    ini : dict
+        Output of read_ini().
+
+    Returns
+    -------
+    list of dict : id, start_date, end_date, tile
+
+    Notes
+    -----
+    If the EXPORT crs is not EPSG:4326, Earth Engine must be initialized to
+    project the geometry bounding box.
+
+    """
+    start_dt = datetime.datetime.strptime(ini['INPUTS']['start_date'], '%Y-%m-%d')
+    end_dt = datetime.datetime.strptime(ini['INPUTS']['end_date'], '%Y-%m-%d')
+    window = DATE_WINDOWS[ini['INPUTS'].get('date_window') or 'none']
+    date_windows = []
+    while start_dt < end_dt:
+        next_dt = min(start_dt + window, end_dt) if window else end_dt
+        date_windows.append((start_dt.strftime('%Y-%m-%d'), next_dt.strftime('%Y-%m-%d')))
+        start_dt = next_dt
+
+    bbox = _geometry_bbox(ini['INPUTS']['geometry'])
+    crs = ini['EXPORT'].get('crs') or 'EPSG:4326'
+    if ini['EXPORT'].get('crs_transform'):
+        # The INPUTS geometry is in lon/lat, so for other output CRSs it is
+        #   passed to tile_grid() as a geometry to be projected (with a getInfo call)
+        if crs.upper() != 'EPSG:4326':
+            bbox = ee.Geometry.Rectangle(bbox, 'EPSG:4326', False)
+        tiles = export.tile_grid(
+            bbox, ini['EXPORT']['crs_transform'],
+            tile_size=ini['EXPORT'].get('tile_size') or 1024,
+            crs=crs,
+        )
+    else:
+        tiles = [{'id': 'all', 'bbox': bbox, 'crs': 'EPSG:4326'}]
+
+    return [
+        {
+            'id': f'{tile["id"]}_{start_date.replace("-", "")}',
+            'start_date': start_date,
+            'end_date': end_date,
+            'tile': tile,
+        }
+        for tile in tiles
+        for start_date, end_date in date_windows
+    ]
+
+
+def run_unit(unit, ini):
+    """Build the interpolation graph for a work unit and run the export
+
+    Parameters
+    ----------
+    unit : dict
+        Work unit from work_units().
+    ini : dict
+        Output of read_ini().
+
+    Returns
+    -------
+    dict : id, seconds, and the export task ID or serialized graph size
+
+    """
+    start_time = time.perf_counter()
+    interp_args = dict(ini['INTERPOLATE'])
+    variables = interp_args.pop('variables', None) or ['et']
+    coll_args = {
+        k: v for k, v in ini['INPUTS'].items() if k not in ['geometry', 'date_window']
+    }
+    coll_args.update({
+        'start_date': unit['start_date'],
+        'end_date': unit['end_date'],
+        'geometry': export.tile_geometry(unit['tile']),
+        'model_args': dict(ini['MODEL']),
+    })
+    output_coll = Collection(**coll_args).interpolate(variables=variables, **interp_args)
+
+    output = {'id': unit['id']}
+    if ini['EXPORT'].get('mode') == 'asset':
+        task_api = export.EETaskAPI(
+            ini['EXPORT']['asset_folder'], overwrite=ini['EXPORT'].get('overwrite') or False
+        )
+        output['task_id'] = task_api.start(output_coll.toBands(), f'sims_{unit["id"]}', unit['tile'])
+    else:
+        output['bytes'] = len(output_coll.serialize())
+    output['seconds'] = time.perf_counter() - start_time
+
+    return output
+
+
+def _init_worker(project=None):
+    """Initialize Earth Engine in each worker process"""
+    ee.Initialize(project=project)
+
+
+def run(ini, workers=4, pool='thread', project=None):
+    """Run the work units in a thread or process pool
+
+    Parameters
+    ----------
+    ini : dict
+        Output of read_ini().
+    workers : int, optional
+        Number of pool workers (the default is 4).
+    pool : {'thread', 'process'}, optional
+        The default is 'thread'.
+    project : str, optional
+        Earth Engine project ID for initializing the worker processes.
+
+    Returns
+    -------
+    list : run_unit() output dictionaries (or an 'error') for each unit
+
+    """
+    units = work_units(ini)
+    logging.info(f'Work units: {len(units)}')
+    if pool == 'process':
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(project,))
+    elif pool == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers)
+    else:
+        raise ValueError(f'unsupported pool: {pool}')
+
+    start_time = time.perf_counter()
+    outputs = []
+    with executor:
+        futures = {executor.submit(functools.partial(run_unit, ini=ini), unit): unit for unit in units}
+        for future in as_completed(futures):
+            try:
+                output = future.result()
+            except Exception as e:
+                output = {'id': futures[future]['id'], 'error': str(e)}
+                print(f'{output["id"]:<32s} ERROR {e}')
+            else:
+                print(
+                    f'{output["id"]:<32s} {output["seconds"]:>8.2f}s  '
+                    f'{output.get("task_id", output.get("bytes"))}'
+                )
+            outputs.append(output)
+
+    seconds = time.perf_counter() - start_time
+    print(
+        f'\n{len(outputs)} units in {seconds:.2f}s '
+        f'({60 * len(outputs) / seconds if seconds else 0:.1f} units/minute), '
+        f'{sum("error" in output for output in outputs)} errors'
+    )
+    return outputs
+
+
+def arg_parse(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='openet-sims',
+        description='Run SIMS interpolation work units from an INI file',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('ini', help='INI file path')
+    parser.add_argument(
+        '--workers', default=4, type=int, help='Number of parallel workers')
+    parser.add_argument(
+        '--pool', default='thread', choices=['thread', 'process'], help='Worker pool type')
+    parser.add_argument(
+        '--project', default=None, help='Earth Engine project ID')
+    parser.add_argument(
+        '--list', default=False, action='store_true',
+        help='List the work units without running them')
+    parser.add_argument(
+        '--debug', default=logging.INFO, const=logging.DEBUG, action='store_const',
+        dest='loglevel', help='Debug level logging')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = arg_parse(argv)
+    logging.basicConfig(level=args.loglevel, format='%(message)s')
+    logging.getLogger('googleapiclient').setLevel(logging.ERROR)
+
+    try:
+        ini = read_ini(args.ini)
+    except ValueError as e:
+        logging.error(str(e))
+        return 1
+
+    # Projecting the geometry for the tiles needs Earth Engine, even when listing
+    crs = ini['EXPORT'].get('crs') or 'EPSG:4326'
+    if not args.list or (ini['EXPORT'].get('crs_transform') and crs.upper() != 'EPSG:4326'):
+        ee.Initialize(project=args.project)
+
+    if args.list:
+        for unit in work_units(ini):
+            print(f'{unit["id"]:<32s} {unit["start_date"]} {unit["end_date"]} {unit["tile"]["bbox"]}')
+        return 0
+
+    outputs = run(ini, workers=args.workers, pool=args.pool, project=args.project)
+    return 1 if any('error' in output for output in outputs) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
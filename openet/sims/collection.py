@@ -1,3 +1,4 @@
+from concurrent.futures import as_completed, ThreadPoolExecutor
 import copy
 import datetime
 from importlib import metadata
@@ -9,9 +10,26 @@ import openet.core.interpolate
 # TODO: import utils from openet.core
 # import openet.core.utils as utils
 
+from . import interpolate
 from . import utils
+from .catalog import clear_fraction
 from .image import Image
 
+GEOMETRY_FILTERS = ['exact', 'bbox', 'hull']
+INTERPOLATE_WINDOWS = {
+    'month': relativedelta(months=+1),
+    'quarter': relativedelta(months=+3),
+    'year': relativedelta(years=+1),
+}
+
+# Time filters to remove the bad (L5) and pre-op (L8) images
+COLLECTION_TIME_FILTERS = {
+    'LT05': ('lt', '2011-12-31'),
+    'LE07': ('lt', '2022-01-01'),
+    'LC08': ('gt', '2013-04-01'),
+    'LC09': ('gt', '2022-01-01'),
+}
+
 
 def lazy_property(fn):
     """Decorator that makes a property lazy-evaluated
@@ -45,6 +63,12 @@ class Collection():
         et_reference_resample=None,
         filter_args=None,
         model_args=None,
+        catalog=None,
+        wrs2_index=None,
+        clear_fraction_min=None,
+        clear_fraction_scale=300,
+        geometry_filter='exact',
+        geometry_tolerance=None,
         # model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
         #             'et_reference_band': 'eto',
         #             'et_reference_factor': 0.85,
@@ -91,6 +115,31 @@ class Collection():
         model_args : dict
             Model Image initialization keyword arguments (the default is None).
             Dictionary will be passed through to model Image init.
+        catalog : openet.sims.catalog.SceneCatalog, optional
+            Local scene catalog used by get_image_ids() when the catalog has
+            been refreshed for the collections, dates and geometry extent
+            (the default is None).
+        wrs2_index : openet.sims.wrs2.WRS2Index, optional
+            WRS2 footprint index used to prefilter the input collections on
+            the WRS_PATH/WRS_ROW properties of the path/rows intersecting the
+            geometry, before the filterBounds() call (the default is None).
+            The index must include all the path/rows covering the geometry.
+        clear_fraction_min : float, optional
+            Minimum QA_PIXEL clear fraction (0-1) within the geometry for a
+            scene to be included (the default is None, no filtering).
+            The clear fractions are computed server side, except for the
+            scenes with values cached in the catalog for the geometry
+            (see SceneCatalog.clear_fractions()).
+        clear_fraction_scale : float, optional
+            Clear fraction reduction scale in meters (the default is 300).
+        geometry_filter : {'exact', 'bbox', 'hull'}, optional
+            Geometry used in the filterBounds() calls (the default is 'exact').
+            The bounding box and convex hull are computed client side so that
+            a detailed geometry is not embedded in the collection graphs.
+            They may include extra scenes that don't intersect the geometry.
+        geometry_tolerance : float, optional
+            Convex hull grid spacing in decimal degrees (the default is None).
+            Coarser spacing gives fewer hull vertices (see utils.geometry_hull()).
 
         """
         self.collections = collections
@@ -99,15 +148,23 @@ class Collection():
         self.end_date = end_date
         self.geometry = geometry
         self.cloud_cover_max = cloud_cover_max
+        self.catalog = catalog
+        self.wrs2_index = wrs2_index
+        self.clear_fraction_min = clear_fraction_min
+        self.clear_fraction_scale = clear_fraction_scale
+        self.geometry_filter = geometry_filter
+        self.geometry_tolerance = geometry_tolerance
 
         # CGM - Should we check that model_args and filter_args are dict?
+        # Copy the args so that the caller's dictionaries are never modified
+        #   and later changes to them don't leak into the collection
         if model_args is not None:
-            self.model_args = model_args
+            self.model_args = dict(model_args)
         else:
             self.model_args = {}
 
         if filter_args is not None:
-            self.filter_args = filter_args
+            self.filter_args = dict(filter_args)
         else:
             self.filter_args = {}
 
@@ -185,6 +242,23 @@ class Collection():
         if (self.cloud_cover_max < 0) or (self.cloud_cover_max > 100):
             raise ValueError('cloud_cover_max must be in the range 0 to 100')
 
+        # Check clear_fraction_min
+        if clear_fraction_min is not None:
+            if not utils.is_number(clear_fraction_min):
+                raise TypeError('clear_fraction_min must be a number')
+            elif not 0 <= float(clear_fraction_min) <= 1:
+                raise ValueError('clear_fraction_min must be in the range 0 to 1')
+            self.clear_fraction_min = float(clear_fraction_min)
+
+        if geometry_filter not in GEOMETRY_FILTERS:
+            raise ValueError(f'unsupported geometry_filter: {geometry_filter}')
+        if geometry_tolerance is not None:
+            if not utils.is_number(geometry_tolerance):
+                raise TypeError('geometry_tolerance must be a number')
+            elif float(geometry_tolerance) <= 0:
+                raise ValueError('geometry_tolerance must be greater than zero')
+            self.geometry_tolerance = float(geometry_tolerance)
+
         # Check geometry?
         # if not isinstance(self.geometry, computedobject.ComputedObject):
         #     raise ValueError()
@@ -209,7 +283,7 @@ class Collection():
         # if self.end_date <= '2015-01-01':
         #     self.collections = [c for c in self.collections if 'COPERNICUS' not in c]
 
-    def _build(self, variables=None, start_date=None, end_date=None):
+    def _build(self, variables=None, start_date=None, end_date=None, model_args=None, image_ids=None):
         """Build a merged model variable image collection
 
         Parameters
@@ -222,6 +296,10 @@ class Collection():
             images for interpolation.
         end_date : str, optional
             Set an exclusive end_date that is different than the class end_date.
+        model_args : dict, optional
+            Set model_args that are different than the class model_args.
+        image_ids : list, optional
+            Only include these image IDs (the default is None).
 
         Returns
         -------
@@ -248,16 +326,28 @@ class Collection():
             start_date = self.start_date
         if not end_date:
             end_date = self.end_date
+        if model_args is None:
+            model_args = self.model_args
+
+        # The path/row filter is skipped if the geometry is outside the index
+        #   since the index may have been built for a different area
+        wrs2_filter = None
+        if self.wrs2_index is not None:
+            wrs2_filter = self.wrs2_index.filter(self.geometry)
 
         # Build the variable image collection
         variable_coll = ee.ImageCollection([])
         for coll_id in self.collections:
             # TODO: Move to separate methods/functions for each type
             if coll_id in self._landsat_c2_sr_collections:
+                input_coll = ee.ImageCollection(coll_id).filterDate(start_date, end_date)
+                if wrs2_filter is not None:
+                    input_coll = input_coll.filter(wrs2_filter)
+                if image_ids is not None:
+                    input_coll = input_coll.filter(ee.Filter.inList('system:id', list(image_ids)))
                 input_coll = (
-                    ee.ImageCollection(coll_id)
-                    .filterDate(start_date, end_date)
-                    .filterBounds(self.geometry)
+                    input_coll
+                    .filterBounds(self._filter_geometry)
                     .filterMetadata('CLOUD_COVER_LAND', 'less_than', self.cloud_cover_max)
                     .filterMetadata('CLOUD_COVER_LAND', 'greater_than', -0.5)
                 )
@@ -286,26 +376,19 @@ class Collection():
                     raise ValueError('Unsupported filter_arg parameter')
 
                 # Time filters are to remove bad (L5) and pre-op (L8) images
-                if 'LT05' in coll_id:
-                    input_coll = input_coll.filter(ee.Filter.lt(
-                        'system:time_start', ee.Date('2011-12-31').millis()
-                    ))
-                elif 'LE07' in coll_id:
-                    input_coll = input_coll.filter(ee.Filter.lt(
-                        'system:time_start', ee.Date('2022-01-01').millis()
-                    ))
-                elif 'LC08' in coll_id:
-                    input_coll = input_coll.filter(ee.Filter.gt(
-                        'system:time_start', ee.Date('2013-04-01').millis()
-                    ))
-                elif 'LC09' in coll_id:
-                    input_coll = input_coll.filter(ee.Filter.gt(
-                        'system:time_start', ee.Date('2022-01-01').millis()
-                    ))
+                for coll_type, (op, date) in COLLECTION_TIME_FILTERS.items():
+                    if coll_type in coll_id:
+                        input_coll = input_coll.filter(getattr(ee.Filter, op)(
+                            'system:time_start', ee.Date(date).millis()
+                        ))
+                        break
+
+                if self.clear_fraction_min is not None:
+                    input_coll = self._clear_fraction_filter(input_coll)
 
                 def compute_vars(image):
                     model_obj = Image.from_landsat_c2_sr(
-                        sr_image=ee.Image(image), **self.model_args
+                        sr_image=ee.Image(image), **model_args
                     )
                     return model_obj.calculate(variables)
 
@@ -321,6 +404,59 @@ class Collection():
 
         return variable_coll
 
+    @lazy_property
+    def _filter_geometry(self):
+        """Geometry for the filterBounds() calls (see geometry_filter)"""
+        if self.geometry_filter == 'bbox':
+            return ee.Geometry.Rectangle(utils.geometry_bbox(self.geometry), 'EPSG:4326', False)
+        elif self.geometry_filter == 'hull':
+            hull = utils.geometry_hull(self.geometry, tolerance=self.geometry_tolerance)
+            # Points and lines don't have a polygon hull
+            if len(hull) >= 4:
+                return ee.Geometry.Polygon([hull], 'EPSG:4326', False)
+        return self.geometry
+
+    def _clear_fraction_filter(self, input_coll):
+        """Filter a Landsat collection on the scene clear fractions
+
+        The clear fractions are computed server side so that no requests are
+        made while the graph is built.  If a catalog is set, the scenes with
+        clear fractions cached in the catalog (see
+        SceneCatalog.clear_fractions()) are filtered on the cached values.
+
+        Parameters
+        ----------
+        input_coll : ee.ImageCollection
+            Filtered Landsat collection (before the model is applied).
+
+        Returns
+        -------
+        ee.ImageCollection
+
+        """
+        def set_clear_fraction(image):
+            return image.set(
+                'clear_fraction', clear_fraction(ee.Image(image), self.geometry, self.clear_fraction_scale)
+            )
+
+        cached = {}
+        if self.catalog is not None:
+            cached = self.catalog.cached_clear_fractions(self.geometry, scale=self.clear_fraction_scale)
+
+        computed_coll = input_coll
+        if cached:
+            computed_coll = computed_coll.filter(ee.Filter.inList('system:id', list(cached.keys())).Not())
+        computed_coll = (
+            computed_coll.map(set_clear_fraction)
+            .filter(ee.Filter.gte('clear_fraction', self.clear_fraction_min))
+        )
+        if not cached:
+            return computed_coll
+
+        return input_coll.filter(ee.Filter.inList('system:id', [
+            image_id for image_id, value in cached.items() if value >= self.clear_fraction_min
+        ])).merge(computed_coll)
+
     def overpass(self, variables=None):
         """Return a collection of computed values for the overpass images
 
@@ -357,6 +493,10 @@ class Collection():
             interp_days=32,
             use_joins=True,
             mask_partial_aggregations=True,
+            interp_engine='core',
+            start_date=None,
+            end_date=None,
+            scene_coll=None,
             **kwargs,
     ):
         """
@@ -367,10 +507,12 @@ class Collection():
             List of variables that will be returned in the Image Collection.
             If variables is not set here it must be specified in the class
             instantiation call.
-        t_interval : {'daily', 'monthly', 'custom'}, optional
+        t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}, optional
             Time interval over which to interpolate and aggregate values
             The default 'custom' interval will aggregate all days within the
             start/end dates and return an image collection with a single image.
+            The 'annual' and 'water_year' intervals are built by aggregating
+            the monthly images (see interpolate.from_monthly_aggregates()).
         interp_method : {'linear}, optional
             Interpolation method (the default is 'linear').
         interp_days : int, str, optional
@@ -383,6 +525,20 @@ class Collection():
         mask_partial_aggregations : bool, optional
             If True, pixels with an aggregation count less than the number of
             days in the aggregation time period will be masked.  The default is True.
+        interp_engine : {'core', 'array'}, optional
+            If 'core', interpolate with openet.core.interpolate.daily().
+            If 'array', interpolate with interpolate.daily_array(), which
+            stacks the scene images into an array image instead of joining
+            each day to the neighboring scenes.  This uses less memory for
+            long time periods.  The default is 'core'.
+        start_date : str, optional
+            Set a start_date that is different than the class start_date.
+        end_date : str, optional
+            Set an exclusive end_date that is different than the class end_date.
+        scene_coll : ee.ImageCollection, optional
+            Precomputed scene images with the interpolation bands (i.e. a
+            previous overpass export with "et_fraction", "ndvi", "time" and
+            "mask" bands).  If set, the scene images are not rebuilt.
         kwargs : dict, optional
 
         Returns
@@ -403,10 +559,12 @@ class Collection():
 
         """
         # Check that the input parameters are valid
-        if t_interval.lower() not in ['daily', 'monthly', 'custom']:
+        if t_interval.lower() not in ['daily', 'monthly', 'custom'] + interpolate.ROLLUP_INTERVALS:
             raise ValueError(f'unsupported t_interval: {t_interval}')
         elif interp_method.lower() not in ['linear']:
             raise ValueError(f'unsupported interp_method: {interp_method}')
+        elif interp_engine.lower() not in interpolate.INTERP_ENGINES:
+            raise ValueError(f'unsupported interp_engine: {interp_engine}')
 
         if (type(interp_days) is str) and utils.is_number(interp_days):
             interp_days = int(interp_days)
@@ -422,22 +580,25 @@ class Collection():
             else:
                 raise ValueError('variables parameter must be set')
 
+        # Annual and water year values are aggregated from the monthly images
+        # The ET and reference ET sums are needed to recompute the ET fraction
+        if t_interval.lower() in interpolate.ROLLUP_INTERVALS:
+            rollup_interval = t_interval.lower()
+            output_vars = variables
+            variables = list(variables)
+            if 'et_fraction' in variables:
+                variables.extend(v for v in ['et', 'et_reference'] if v not in variables)
+            t_interval = 'monthly'
+        else:
+            rollup_interval = None
+
         # Adjust start/end dates based on t_interval
         # Increase the date range to fully include the time interval
-        start_dt = datetime.datetime.strptime(self.start_date, '%Y-%m-%d')
-        end_dt = datetime.datetime.strptime(self.end_date, '%Y-%m-%d')
-        if t_interval.lower() == 'monthly':
-            start_dt = datetime.datetime(start_dt.year, start_dt.month, 1)
-            end_dt -= relativedelta(days=+1)
-            end_dt = datetime.datetime(end_dt.year, end_dt.month, 1)
-            end_dt += relativedelta(months=+1)
-        # elif t_interval.lower() == 'annual':
-        #     start_dt = datetime.datetime(start_dt.year, 1, 1)
-        #     # Covert end date to inclusive, flatten to beginning of year,
-        #     # then add a year which will make it exclusive
-        #     end_dt -= relativedelta(days=+1)
-        #     end_dt = datetime.datetime(end_dt.year, 1, 1)
-        #     end_dt += relativedelta(years=+1)
+        start_dt, end_dt = interpolate.period_date_range(
+            datetime.datetime.strptime(start_date or self.start_date, '%Y-%m-%d'),
+            datetime.datetime.strptime(end_date or self.end_date, '%Y-%m-%d'),
+            rollup_interval or t_interval,
+        )
         start_date = start_dt.strftime('%Y-%m-%d')
         end_date = end_dt.strftime('%Y-%m-%d')
 
@@ -451,141 +612,160 @@ class Collection():
         # Update model_args if et_reference parameters were passed to interpolate
         # Intentionally using model_args (instead of self.et_reference_source, etc.) in
         #   this function since model_args is passed to Image class in _build()
-        # if ('et' in variables) or ('et_reference' in variables):
-        if (('et_reference_source' in kwargs.keys()) and
-                (kwargs['et_reference_source'] is not None)):
-            self.model_args['et_reference_source'] = kwargs['et_reference_source']
-        if (('et_reference_band' in kwargs.keys()) and
-                (kwargs['et_reference_band'] is not None)):
-            self.model_args['et_reference_band'] = kwargs['et_reference_band']
-        if (('et_reference_factor' in kwargs.keys()) and
-                (kwargs['et_reference_factor'] is not None)):
-            self.model_args['et_reference_factor'] = kwargs['et_reference_factor']
-        if (('et_reference_resample' in kwargs.keys()) and
-                (kwargs['et_reference_resample'] is not None)):
-            self.model_args['et_reference_resample'] = kwargs['et_reference_resample'].lower()
-
-        # Check that all et_reference parameters were set
-        for et_reference_param in ['et_reference_source', 'et_reference_band']:
-            if et_reference_param not in self.model_args.keys():
-                raise ValueError(f'{et_reference_param} was not set')
-            elif not self.model_args[et_reference_param]:
-                raise ValueError(f'{et_reference_param} was not set')
-
-        if type(self.model_args['et_reference_source']) is str:
-            # Assume a string source is a single image collection ID
-            #   not a list of collection IDs or ee.ImageCollection
-            daily_et_ref_coll = (
-                ee.ImageCollection(self.model_args['et_reference_source'])
-                .filterDate(start_date, end_date)
-                .select([self.model_args['et_reference_band']], ['et_reference'])
-            )
-        # elif isinstance(self.model_args['et_reference_source'], computedobject.ComputedObject):
-        #     # Interpret computed objects as image collections
-        #     daily_et_ref_coll = (
-        #         self.model_args['et_reference_source']
-        #         .filterDate(self.start_date, self.end_date)
-        #         .select([self.model_args['et_reference_band']])
-        #     )
-        else:
-            raise ValueError(f'unsupported et_reference_source: '
-                             f'{self.model_args["et_reference_source"]}')
-
-        # Scale reference ET images (if necessary)
-        # Support for applying an adjustment factor to the reference ET
-        #   may be removed at some point
-        if (('et_reference_factor' in self.model_args.keys()) and
-                self.model_args['et_reference_factor'] and
-                (self.model_args['et_reference_factor'] != 1) and
-                (self.model_args['et_reference_factor'] > 0)):
-            def et_reference_adjust(input_img):
-                return (
-                    input_img.multiply(self.model_args['et_reference_factor'])
-                    .copyProperties(input_img)
-                    .set({'system:time_start': input_img.get('system:time_start')})
-                )
-            daily_et_ref_coll = daily_et_ref_coll.map(et_reference_adjust)
-
-        # Initialize variable list to only variables that can be interpolated
-        interp_vars = list(set(self._interp_vars) & set(variables))
+        model_args = self._interpolate_model_args(**kwargs)
 
-        # To return ET, the ET fraction must be interpolated
-        if ('et' in variables) and ('et_fraction' not in interp_vars):
-            interp_vars = interp_vars + ['et_fraction']
+        # NDVI can be interpolated without reading the reference ET collection
+        #   by interpolating to a synthetic daily target collection
+        ndvi_only = (
+            ('ndvi' in variables) and
+            set(variables).issubset(interpolate.NDVI_ONLY_VARIABLES)
+        )
 
-        # With the current interpolate.daily() function,
-        #   something has to be interpolated in order to return et_reference
-        if ('et_reference' in variables) and ('et_fraction' not in interp_vars):
-            interp_vars = interp_vars + ['et_fraction']
+        if ndvi_only:
+            daily_et_ref_coll = interpolate.daily_target_coll(start_date, end_date)
+        else:
+            # Check that all et_reference parameters were set
+            for et_reference_param in ['et_reference_source', 'et_reference_band']:
+                if et_reference_param not in model_args.keys():
+                    raise ValueError(f'{et_reference_param} was not set')
+                elif not model_args[et_reference_param]:
+                    raise ValueError(f'{et_reference_param} was not set')
+
+            if type(model_args['et_reference_source']) is str:
+                # Assume a string source is a single image collection ID
+                #   not a list of collection IDs or ee.ImageCollection
+                daily_et_ref_coll = (
+                    ee.ImageCollection(model_args['et_reference_source'])
+                    .filterDate(start_date, end_date)
+                    .select([model_args['et_reference_band']], ['et_reference'])
+                )
+            # elif isinstance(model_args['et_reference_source'], computedobject.ComputedObject):
+            #     # Interpret computed objects as image collections
+            #     daily_et_ref_coll = (
+            #         model_args['et_reference_source']
+            #         .filterDate(self.start_date, self.end_date)
+            #         .select([model_args['et_reference_band']])
+            #     )
+            else:
+                raise ValueError(f'unsupported et_reference_source: '
+                                 f'{model_args["et_reference_source"]}')
+
+            # Scale reference ET images (if necessary)
+            # Support for applying an adjustment factor to the reference ET
+            #   may be removed at some point
+            if (('et_reference_factor' in model_args.keys()) and
+                    model_args['et_reference_factor'] and
+                    (model_args['et_reference_factor'] != 1) and
+                    (model_args['et_reference_factor'] > 0)):
+                def et_reference_adjust(input_img):
+                    return (
+                        input_img.multiply(model_args['et_reference_factor'])
+                        .copyProperties(input_img)
+                        .set({'system:time_start': input_img.get('system:time_start')})
+                    )
+                daily_et_ref_coll = daily_et_ref_coll.map(et_reference_adjust)
 
-        # The time band is always needed for interpolation
-        interp_vars = interp_vars + ['time']
+        # Reference ET (and the daily count) can be aggregated directly from the
+        #   reference ET collection, so the Landsat scene collection is not built
+        #   and nothing is interpolated
+        et_reference_only = set(variables).issubset(interpolate.ET_REFERENCE_ONLY_VARIABLES)
 
-        # Count will be determined using the aggregate_coll image masks
-        if 'count' in variables:
-            interp_vars = interp_vars + ['mask']
-            # interp_vars.remove('count')
+        if et_reference_only:
+            interp_vars = []
+            daily_coll = daily_et_ref_coll
+        else:
+            # Initialize variable list to only variables that can be interpolated
+            interp_vars = list(set(self._interp_vars) & set(variables))
 
-        # Build initial scene image collection
-        scene_coll = self._build(
-            variables=interp_vars,
-            start_date=interp_start_date,
-            end_date=interp_end_date,
-        )
+            # To return ET, the ET fraction must be interpolated
+            if ('et' in variables) and ('et_fraction' not in interp_vars):
+                interp_vars = interp_vars + ['et_fraction']
 
-        # For count, compute the composite/mosaic image for the mask band only
-        if 'count' in variables:
-            aggregate_coll = openet.core.interpolate.aggregate_to_daily(
-                image_coll=scene_coll.select(['mask']),
-                start_date=start_date,
-                end_date=end_date,
-            )
+            # With the current interpolate.daily() function,
+            #   something has to be interpolated in order to return et_reference
+            #   with any of the interpolated variables
+            if ('et_reference' in variables) and ('et_fraction' not in interp_vars):
+                interp_vars = interp_vars + ['et_fraction']
 
-            # The following is needed because the aggregate collection can be
-            #   empty if there are no scenes in the target date range but there
-            #   are scenes in the interpolation date range.
-            # Without this the count image will not be built but the other
-            #   bands will be which causes a non-homogenous image collection.
-            aggregate_coll = aggregate_coll.merge(
-                ee.Image.constant(0).rename(['mask'])
-                .set({'system:time_start': ee.Date(start_date).millis()})
-            )
+            # To compute the daily count, the ET fraction must be interpolated
+            #   unless only NDVI is being interpolated
+            if ('daily_count' in variables) and ('et_fraction' not in interp_vars) and not ndvi_only:
+                interp_vars = interp_vars + ['et_fraction']
 
-        # Including count/mask causes problems in interpolate.daily() function.
-        # Issues with mask being an int but the values need to be double.
-        # Casting the mask band to a double would fix this problem also.
-        if 'mask' in interp_vars:
-            interp_vars.remove('mask')
-
-        # Interpolate to a daily time step
-        # NOTE: the daily function is not computing ET (ETf x ETr)
-        #   but is returning the target (ETr) band
-        daily_coll = openet.core.interpolate.daily(
-            target_coll=daily_et_ref_coll,
-            source_coll=scene_coll.select(interp_vars),
-            interp_method=interp_method,
-            interp_days=interp_days,
-            use_joins=use_joins,
-            compute_product=False,
-            # resample_method=et_reference_resample,
-        )
+            # The time band is always needed for interpolation
+            interp_vars = interp_vars + ['time']
 
-        # Compute ET from ET fraction and reference ET (if necessary)
-        # CGM - The conditional is needed if only interpolating NDVI
-        if ('et' in variables) or ('et_fraction' in variables):
-            def compute_et(img):
-                """This function assumes et_reference and et_fraction are present"""
-                # Apply any resampling to the reference ET image before computing ET
-                et_ref_img = img.select(['et_reference'])
-                if (self.model_args['et_reference_resample'] and
-                        (self.model_args['et_reference_resample'] in ['bilinear', 'bicubic'])):
-                    et_ref_img = et_ref_img.resample(self.model_args['et_reference_resample'])
+            # Count will be determined using the aggregate_coll image masks
+            if ('scene_count' in variables) or ('count' in variables):
+                interp_vars = interp_vars + ['mask']
+                # interp_vars.remove('count')
+
+            # Build initial scene image collection
+            if scene_coll is None:
+                scene_coll = self._build(
+                    variables=interp_vars,
+                    start_date=interp_start_date,
+                    end_date=interp_end_date,
+                    model_args=model_args,
+                )
+            else:
+                scene_coll = scene_coll.filterDate(interp_start_date, interp_end_date)
 
-                et_img = img.select(['et_fraction']).multiply(et_ref_img)
+            # For count, compute the composite/mosaic image for the mask band only
+            if ('scene_count' in variables) or ('count' in variables):
+                aggregate_coll = openet.core.interpolate.aggregate_to_daily(
+                    image_coll=scene_coll.select(['mask']),
+                    start_date=start_date,
+                    end_date=end_date,
+                )
 
-                return img.addBands(et_img.double().rename('et'))
+                # The following is needed because the aggregate collection can be
+                #   empty if there are no scenes in the target date range but there
+                #   are scenes in the interpolation date range.
+                # Without this the count image will not be built but the other
+                #   bands will be which causes a non-homogenous image collection.
+                aggregate_coll = aggregate_coll.merge(
+                    ee.Image.constant(0).rename(['mask'])
+                    .set({'system:time_start': ee.Date(start_date).millis()})
+                )
 
-            daily_coll = daily_coll.map(compute_et)
+            # Including count/mask causes problems in interpolate.daily() function.
+            # Issues with mask being an int but the values need to be double.
+            # Casting the mask band to a double would fix this problem also.
+            if 'mask' in interp_vars:
+                interp_vars.remove('mask')
+
+            # Interpolate to a daily time step
+            # Compute ET (ETf x ETr) in the interpolation step (if necessary)
+            #   instead of mapping a separate function over the daily collection
+            # The daily() functions return the product of the source and target
+            #   images as "{source_band}_1" bands, so the ET band is "et_fraction_1"
+            compute_product = ('et' in variables) or ('et_fraction' in variables)
+            if (('et_reference_resample' in model_args.keys()) and
+                    model_args['et_reference_resample']):
+                resample_method = model_args['et_reference_resample']
+            else:
+                resample_method = 'nearest'
+
+            if interp_engine.lower() == 'array':
+                daily_coll = interpolate.daily_array(
+                    target_coll=daily_et_ref_coll,
+                    source_coll=scene_coll.select(interp_vars),
+                    interp_method=interp_method,
+                    interp_days=interp_days,
+                    compute_product=compute_product,
+                    resample_method=resample_method,
+                )
+            else:
+                daily_coll = openet.core.interpolate.daily(
+                    target_coll=daily_et_ref_coll,
+                    source_coll=scene_coll.select(interp_vars),
+                    interp_method=interp_method,
+                    interp_days=interp_days,
+                    use_joins=use_joins,
+                    compute_product=compute_product,
+                    resample_method=resample_method,
+                )
 
         interp_properties = {
             'cloud_cover_max': self.cloud_cover_max,
@@ -597,7 +777,7 @@ class Collection():
             # 'model_name': openet.sims.MODEL_NAME,
             # 'model_version': openet.sims.__version__,
         }
-        interp_properties.update(self.model_args)
+        interp_properties.update(model_args)
 
         # CGM - This function is being declared here to avoid passing in all the common parameters
         #   such as: daily_coll, daily_et_ref_coll, interp_properties, variables, etc.
@@ -624,26 +804,30 @@ class Collection():
             eto_img = None
 
             if ('et' in variables) or ('et_fraction' in variables):
-                et_img = daily_coll.filterDate(agg_start_date, agg_end_date).select(['et']).sum()
+                et_img = (
+                    daily_coll.filterDate(agg_start_date, agg_end_date)
+                    .select(['et_fraction_1']).sum().rename(['et'])
+                )
 
             if ('et_reference' in variables) or ('et_fraction' in variables):
                 eto_img = (
                     daily_coll.filterDate(agg_start_date, agg_end_date)
                     .select(['et_reference']).sum()
                 )
-                if (self.model_args['et_reference_resample'] and
-                        (self.model_args['et_reference_resample'] in ['bilinear', 'bicubic'])):
+                if model_args.get('et_reference_resample') in ['bilinear', 'bicubic']:
                     eto_img = (
                         eto_img.setDefaultProjection(daily_et_ref_coll.first().projection())
-                        .resample(self.model_args['et_reference_resample'])
+                        .resample(model_args['et_reference_resample'])
                     )
 
             # Count the number of interpolated/aggregated values
             # Mask pixels that do not have a full aggregation count for the start/end
             if ('et' in variables) or ('et_fraction' in variables):
-                aggregation_band = 'et'
+                aggregation_band = 'et_fraction_1'
             elif 'ndvi' in interp_vars:
                 aggregation_band = 'ndvi'
+            elif et_reference_only:
+                aggregation_band = 'et_reference'
             else:
                 raise ValueError('no supported aggregation band')
             aggregation_count_img = (
@@ -726,23 +910,408 @@ class Collection():
                     agg_end_date=ee.Date(agg_start_date).advance(1, 'month'),
                     date_format='YYYYMM',
                 )
-            return ee.ImageCollection(
+            monthly_coll = ee.ImageCollection(
                 ee.List(list(month_gen(start_dt, end_dt))).map(aggregate_monthly)
             )
+            if rollup_interval:
+                return ee.ImageCollection(
+                    interpolate.from_monthly_aggregates(
+                        monthly_coll,
+                        start_date=start_date,
+                        end_date=end_date,
+                        variables=output_vars,
+                        t_interval=rollup_interval,
+                        mask_partial_aggregations=mask_partial_aggregations,
+                    )
+                    .map(lambda img: img.set(interp_properties))
+                )
+            return monthly_coll
         else:
             raise ValueError(f'unsupported t_interval: {t_interval}')
 
+    def _interpolate_model_args(self, **kwargs):
+        """Return the model_args updated with the interpolate et_reference parameters
+
+        The updates are made to a copy so that the collection is never modified
+        and a single instance can be used for concurrent interpolate calls.
+
+        """
+        model_args = dict(self.model_args)
+        # if ('et' in variables) or ('et_reference' in variables):
+        if (('et_reference_source' in kwargs.keys()) and
+                (kwargs['et_reference_source'] is not None)):
+            model_args['et_reference_source'] = kwargs['et_reference_source']
+        if (('et_reference_band' in kwargs.keys()) and
+                (kwargs['et_reference_band'] is not None)):
+            model_args['et_reference_band'] = kwargs['et_reference_band']
+        if (('et_reference_factor' in kwargs.keys()) and
+                (kwargs['et_reference_factor'] is not None)):
+            model_args['et_reference_factor'] = kwargs['et_reference_factor']
+        if (('et_reference_resample' in kwargs.keys()) and
+                (kwargs['et_reference_resample'] is not None)):
+            model_args['et_reference_resample'] = kwargs['et_reference_resample'].lower()
+        return model_args
+
+    def interpolate_incremental(
+            self,
+            scene_ids,
+            previous_coll=None,
+            scene_coll=None,
+            t_interval='custom',
+            interp_days=32,
+            **kwargs,
+    ):
+        """Rebuild only the interpolated periods affected by new or changed scenes
+
+        Parameters
+        ----------
+        scene_ids : list
+            New or changed Landsat image IDs.
+        previous_coll : ee.ImageCollection, optional
+            Previously produced interpolate() images for the collection dates.
+            If set, the images for the affected periods are replaced and the
+            full collection is returned.  The default is None.
+        scene_coll : ee.ImageCollection, optional
+            Cached scene images (see interpolate()).  The new and changed
+            scenes are rebuilt and all other scenes are read from this
+            collection.  The default is None, rebuild all the scenes.
+        t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}, optional
+            The default is 'custom'.
+        interp_days : int, optional
+            The default is 32.
+        kwargs : dict, optional
+            Keyword arguments passed to interpolate().
+
+        Returns
+        -------
+        ee.ImageCollection : the images for the affected periods (or all
+            periods if previous_coll is set), sorted by time
+
+        Notes
+        -----
+        Use interpolate.affected_periods() to get the affected period dates.
+
+        """
+        periods = interpolate.affected_periods(
+            scene_ids, self.start_date, self.end_date, t_interval, interp_days=interp_days,
+        )
+
+        # Merge consecutive periods so each date range is interpolated once
+        date_ranges = []
+        for period_start, period_end in periods:
+            if date_ranges and date_ranges[-1][1] == period_start:
+                date_ranges[-1][1] = period_end
+            else:
+                date_ranges.append([period_start, period_end])
+
+        if scene_coll is not None and scene_ids:
+            interp_start_dt, interp_end_dt = interpolate.period_date_range(
+                datetime.datetime.strptime(self.start_date, '%Y-%m-%d'),
+                datetime.datetime.strptime(self.end_date, '%Y-%m-%d'),
+                t_interval,
+            )
+            scene_coll = (
+                scene_coll.filter(ee.Filter.inList('image_id', list(scene_ids)).Not())
+                .merge(self._build(
+                    variables=['et_fraction', 'ndvi', 'time', 'mask'],
+                    start_date=(interp_start_dt - datetime.timedelta(days=interp_days)).strftime('%Y-%m-%d'),
+                    end_date=(interp_end_dt + datetime.timedelta(days=interp_days)).strftime('%Y-%m-%d'),
+                    model_args=self._interpolate_model_args(**kwargs),
+                    image_ids=scene_ids,
+                ))
+            )
+
+        output_coll = ee.ImageCollection([])
+        for range_start, range_end in date_ranges:
+            output_coll = output_coll.merge(self.interpolate(
+                t_interval=t_interval, interp_days=interp_days,
+                start_date=range_start, end_date=range_end, scene_coll=scene_coll, **kwargs
+            ))
+
+        # The previous images are removed with date range filters since their
+        #   system:time_start may not be at 0 UTC (it is copied from the
+        #   reference ET images)
+        if previous_coll is not None and date_ranges:
+            period_filter = ee.Filter.Or(*[
+                ee.Filter.date(range_start, range_end) for range_start, range_end in date_ranges
+            ])
+            output_coll = previous_coll.filter(period_filter.Not()).merge(output_coll)
+        elif previous_coll is not None:
+            output_coll = previous_coll
+
+        return output_coll.sort('system:time_start')
+
+    def interpolate_windows(self, window='year', t_interval='custom', **kwargs):
+        """Split the interpolation into date windows that are built separately
+
+        Each window is interpolated with its own interp_days padding, so the
+        size of each graph does not depend on the length of the date range.
+        The window edges are aligned to the t_interval periods, so the output
+        images are identical to the interpolate() images.
+
+        Parameters
+        ----------
+        window : {'month', 'quarter', 'year'}, optional
+            Window length (the default is 'year').  Windows shorter than the
+            t_interval period will contain a single period.
+        t_interval : {'daily', 'monthly', 'annual', 'water_year'}, optional
+            The 'custom' interval can't be split into windows.
+        kwargs : dict, optional
+            Keyword arguments passed to interpolate().
+
+        Returns
+        -------
+        list of (start_date, end_date, ee.ImageCollection) tuples, in date order
+
+        Raises
+        ------
+        ValueError for unsupported windows or t_interval
+
+        """
+        return [
+            (
+                periods[0][0],
+                periods[-1][1],
+                self.interpolate(
+                    t_interval=t_interval, start_date=periods[0][0], end_date=periods[-1][1], **kwargs
+                ),
+            )
+            for periods in self._window_periods(window, t_interval)
+        ]
+
+    def _window_periods(self, window, t_interval):
+        """Group the t_interval periods into windows
+
+        Returns
+        -------
+        list of lists of (start_date, end_date) ISO format date tuples
+
+        """
+        if window not in INTERPOLATE_WINDOWS.keys():
+            raise ValueError(f'unsupported window: {window}')
+        if t_interval.lower() == 'custom':
+            raise ValueError('custom t_interval values can not be split into windows')
+
+        periods = interpolate.period_list(
+            datetime.datetime.strptime(self.start_date, '%Y-%m-%d'),
+            datetime.datetime.strptime(self.end_date, '%Y-%m-%d'),
+            t_interval,
+        )
+
+        # Start a new window at the first period on or after the end of the
+        #   previous window
+        windows = []
+        window_end_dt = None
+        for period_start_dt, period_end_dt in periods:
+            period = (period_start_dt.strftime('%Y-%m-%d'), period_end_dt.strftime('%Y-%m-%d'))
+            if window_end_dt is not None and period_start_dt < window_end_dt:
+                windows[-1].append(period)
+            else:
+                window_end_dt = period_start_dt + INTERPOLATE_WINDOWS[window]
+                windows.append([period])
+        return windows
+
+    def interpolate_windowed_info(
+            self,
+            window='year',
+            t_interval='monthly',
+            max_workers=4,
+            getinfo_args=None,
+            **kwargs,
+    ):
+        """Return the interpolated collection values, requested in date windows
+
+        A window that fails with a memory error is split in half on its
+        t_interval periods (see utils.getinfo_bisect()).
+
+        Parameters
+        ----------
+        window : {'month', 'quarter', 'year'}, optional
+            The default is 'year'.
+        t_interval : {'daily', 'monthly', 'annual', 'water_year'}, optional
+            The default is 'monthly'.
+        max_workers : int, optional
+            Maximum number of windows requested concurrently (the default is 4).
+            Set to 1 to request the windows sequentially.
+        getinfo_args : dict, optional
+            Keyword arguments passed to utils.getinfo_retry().
+        kwargs : dict, optional
+            Keyword arguments passed to interpolate().
+
+        Returns
+        -------
+        dict : the getInfo() of the first window image collection, with the
+            image features of all the windows concatenated in date order
+
+        Raises
+        ------
+        EEQueryError subclass if a window request fails
+
+        """
+        def build_func(periods):
+            return self.interpolate(
+                t_interval=t_interval, start_date=periods[0][0], end_date=periods[-1][1], **kwargs
+            )
+
+        windows = self._window_periods(window, t_interval)
+        outputs = [None] * len(windows)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    utils.getinfo_bisect, build_func, periods, utils.merge_feature_collections,
+                    **(getinfo_args or {})
+                ): i
+                for i, periods in enumerate(windows)
+            }
+            try:
+                for future in as_completed(futures):
+                    outputs[futures[future]] = future.result()
+            except Exception:
+                for f in futures:
+                    f.cancel()
+                raise
+
+        return utils.merge_feature_collections(outputs)
+
+    async def overpass_async(self, variables=None, limiter=None, getinfo_args=None):
+        """Return the overpass collection values without blocking the event loop
+
+        Parameters
+        ----------
+        variables : list, optional
+            List of variables to compute (see overpass()).
+        limiter : asyncio.Semaphore, optional
+            Semaphore limiting the number of outstanding requests
+            (the default is None).
+        getinfo_args : dict, optional
+            Keyword arguments passed to utils.getinfo_retry().
+
+        Returns
+        -------
+        dict : the getInfo() of the overpass image collection
+
+        """
+        output_coll = await utils.run_async(self.overpass, variables=variables)
+        return await utils.getinfo_async(output_coll, limiter=limiter, **(getinfo_args or {}))
+
+    async def interpolate_async(self, limiter=None, getinfo_args=None, **kwargs):
+        """Return the interpolated collection values without blocking the event loop
+
+        The graph is built in the event loop's default executor since the
+        collection is not modified by interpolate().  Cancelling the task
+        stops it from waiting on the limiter, but a request that has already
+        been sent will finish in its executor thread.
+
+        Parameters
+        ----------
+        limiter : asyncio.Semaphore, optional
+            Semaphore limiting the number of outstanding requests
+            (the default is None).
+        getinfo_args : dict, optional
+            Keyword arguments passed to utils.getinfo_retry().
+        kwargs : dict, optional
+            Keyword arguments passed to interpolate().
+
+        Returns
+        -------
+        dict : the getInfo() of the interpolated image collection
+
+        """
+        output_coll = await utils.run_async(self.interpolate, **kwargs)
+        return await utils.getinfo_async(output_coll, limiter=limiter, **(getinfo_args or {}))
+
     def get_image_ids(self):
         """Return image IDs of the input images
 
         Note, this does not return the extra images used for interpolation
 
+        If a scene catalog was set and it covers the collections, dates and
+        geometry extent, the IDs are read from the catalog without a request
+        (see _catalog_image_ids()).
+
         Returns
         -------
         list
 
         """
+        if self.catalog is not None:
+            image_ids = self._catalog_image_ids()
+            if image_ids is not None:
+                return image_ids
+
         # CGM - Setting variables to None bypasses the Image class, so image_id
         #   is not set and merge indices must be removed from the system:index
         return list(utils.getinfo(self._build(variables=[]).aggregate_array('system:id')))
         # return list(utils.getinfo(self._build(variables=['ndvi']).aggregate_array('image_id')))
+
+    def _catalog_image_ids(self):
+        """Return the image IDs from the scene catalog
+
+        The catalog scenes are filtered the same way as the server side
+        collection: the scene footprints are intersected with the filter
+        geometry (a planar test, so scenes that only touch the geometry at a
+        geodesic edge may differ), the WRS2 index path/rows are applied, and
+        the clear fractions cached in the catalog are used for
+        clear_fraction_min.
+
+        Returns
+        -------
+        list or None if the catalog can't answer the query (the server side
+            collection should be queried instead)
+
+        """
+        # Server side filters can't be applied to the catalog scenes
+        if any(coll_id in self.filter_args for coll_id in self.collections):
+            return None
+
+        bbox = utils.geometry_bbox(self.geometry)
+        if not self.catalog.covers(self.collections, self.start_date, self.end_date, bbox):
+            return None
+
+        # Computed geometries can't be intersected client side
+        try:
+            filter_geojson = self._filter_geometry.toGeoJSON()
+        except ee.ee_exception.EEException:
+            return None
+
+        # Mirror the WRS2 filter, which is skipped outside the index
+        path_rows = None
+        if self.wrs2_index is not None:
+            path_rows = set(self.wrs2_index.query(self.geometry)) or None
+
+        image_ids = []
+        for coll_id in self.collections:
+            time_filter = None
+            for coll_type, (op, date) in COLLECTION_TIME_FILTERS.items():
+                if coll_type in coll_id:
+                    time_filter = (op, utils.millis(datetime.datetime.strptime(date, '%Y-%m-%d')))
+                    break
+
+            for scene in self.catalog.scenes(
+                    [coll_id], self.start_date, self.end_date, bbox=bbox,
+                    cloud_cover_max=self.cloud_cover_max):
+                if time_filter is None:
+                    pass
+                elif time_filter[0] == 'lt' and scene['time_start'] >= time_filter[1]:
+                    continue
+                elif time_filter[0] == 'gt' and scene['time_start'] <= time_filter[1]:
+                    continue
+                if path_rows is not None and (scene['wrs_path'], scene['wrs_row']) not in path_rows:
+                    continue
+                # Catalogs written before the footprints were stored
+                if scene['footprint'] is None:
+                    return None
+                if not utils.geometry_intersects(scene['footprint'], filter_geojson):
+                    continue
+                image_ids.append(scene['image_id'])
+
+        # The clear fractions must all be cached to avoid a request
+        if self.clear_fraction_min is not None:
+            cached = self.catalog.cached_clear_fractions(self.geometry, scale=self.clear_fraction_scale)
+            if not all(image_id in cached for image_id in image_ids):
+                return None
+            image_ids = [
+                image_id for image_id in image_ids if cached[image_id] >= self.clear_fraction_min
+            ]
+
+        return image_ids
@@ -0,0 +1,355 @@
+import datetime
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import ee
+
+from . import utils
+from .collection import Collection
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'openet-sims', 'export_jobs.sqlite')
+
+# Task states (matching the ee.data.getTaskStatus() states)
+ACTIVE_STATES = ['UNSUBMITTED', 'READY', 'RUNNING', 'CANCEL_REQUESTED']
+DONE_STATES = ['COMPLETED']
+FAILED_STATES = ['FAILED', 'CANCELLED']
+
+
+def tile_grid(geometry, crs_transform, tile_size=1024, crs='EPSG:4326', intersect=False):
+    """Split a geometry into tiles aligned to an output grid
+
+    Parameters
+    ----------
+    geometry : ee.Geometry, dict, list
+        Geometry (or [xmin, ymin, xmax, ymax] bounding box in the output CRS).
+    crs_transform : list
+        Output grid affine transform [cellsize, 0, xmin, 0, -cellsize, ymax].
+    tile_size : int, optional
+        Tile size in output grid cells (the default is 1024).
+    crs : str, optional
+        Output grid CRS (the default is 'EPSG:4326').  If the CRS is not
+        EPSG:4326, a getInfo call is made to project the geometry bounds.
+    intersect : bool, optional
+        If True, only keep the tiles intersecting the geometry instead of its
+        bounding box (this makes one getInfo call).  The default is False.
+
+    Returns
+    -------
+    list of dict : id, col, row, bbox, crs, crs_transform, dimensions
+
+    """
+    if isinstance(geometry, ee.Geometry) and crs.upper() != 'EPSG:4326':
+        bbox = utils.geometry_bbox(utils.getinfo(geometry.bounds(1, crs)))
+    else:
+        bbox = utils.geometry_bbox(geometry)
+
+    cs_x, cs_y = crs_transform[0], abs(crs_transform[4])
+    x0, y0 = crs_transform[2], crs_transform[5]
+    tile_x, tile_y = cs_x * tile_size, cs_y * tile_size
+
+    tiles = []
+    for row in range(math.floor((y0 - bbox[3]) / tile_y), math.ceil((y0 - bbox[1]) / tile_y)):
+        for col in range(math.floor((bbox[0] - x0) / tile_x), math.ceil((bbox[2] - x0) / tile_x)):
+            tile_xmin, tile_ymax = x0 + col * tile_x, y0 - row * tile_y
+            tiles.append({
+                'id': f'c{col:04d}r{row:04d}',
+                'col': col,
+                'row': row,
+                'bbox': [tile_xmin, tile_ymax - tile_y, tile_xmin + tile_x, tile_ymax],
+                'crs': crs,
+                'crs_transform': [cs_x, 0, tile_xmin, 0, -cs_y, tile_ymax],
+                'dimensions': f'{tile_size}x{tile_size}',
+            })
+
+    if intersect and isinstance(geometry, ee.Geometry) and tiles:
+        tile_ids = set(utils.getinfo(
+            ee.FeatureCollection([
+                ee.Feature(tile_geometry(tile), {'id': tile['id']}) for tile in tiles
+            ])
+            .filterBounds(geometry)
+            .aggregate_array('id')
+        ))
+        tiles = [tile for tile in tiles if tile['id'] in tile_ids]
+
+    return tiles
+
+
+def tile_geometry(tile):
+    """Return the tile rectangle as an ee.Geometry"""
+    return ee.Geometry.Rectangle(tile['bbox'], ee.Projection(tile['crs']), False)
+
+
+def interpolate_build_func(coll_args, interp_args):
+    """Return a function that builds the interpolated image for a tile
+
+    Parameters
+    ----------
+    coll_args : dict
+        Collection keyword arguments, the geometry will be set to the tile.
+    interp_args : dict
+        Collection.interpolate() keyword arguments.
+
+    Returns
+    -------
+    function : build_func(tile) returning the interpolated images as a
+        single multiband image (see ee.ImageCollection.toBands())
+
+    """
+    def build_func(tile):
+        return (
+            Collection(**dict(coll_args, geometry=tile_geometry(tile)))
+            .interpolate(**interp_args)
+            .toBands()
+        )
+    return build_func
+
+
+class EETaskAPI:
+    """Submit and track Earth Engine export to asset tasks"""
+
+    def __init__(self, asset_folder, max_pixels=1E13, overwrite=False):
+        """
+
+        Parameters
+        ----------
+        asset_folder : str
+            Export asset folder ID.
+        max_pixels : float, optional
+        overwrite : bool, optional
+            The default is False.
+
+        """
+        self.asset_folder = asset_folder
+        self.max_pixels = max_pixels
+        self.overwrite = overwrite
+
+    def start(self, image, description, tile):
+        """Start an export task and return the task ID"""
+        task = ee.batch.Export.image.toAsset(
+            image,
+            description=description,
+            assetId=f'{self.asset_folder}/{description}',
+            crs=tile['crs'],
+            crsTransform=tile['crs_transform'],
+            dimensions=tile['dimensions'],
+            maxPixels=self.max_pixels,
+            overwrite=self.overwrite,
+        )
+        task.start()
+        return task.id
+
+    def status(self, task_id):
+        """Return the task state"""
+        return ee.data.getTaskStatus(task_id)[0]['state']
+
+
+class LocalTaskAPI:
+    """Local stand-in for EETaskAPI that completes tasks after a few polls
+
+    The images are not exported or computed, so no requests are made.
+
+    """
+
+    def __init__(self, polls=1, fail=None):
+        """
+
+        Parameters
+        ----------
+        polls : int, optional
+            Number of status calls before a task is completed (the default is 1).
+        fail : list, optional
+            Descriptions of the tasks that should fail (the default is None).
+
+        """
+        self.polls = polls
+        self.fail = set(fail or [])
+        self.tasks = {}
+        self._lock = threading.Lock()
+
+    def start(self, image, description, tile):
+        with self._lock:
+            task_id = f'LOCAL_{len(self.tasks):06d}'
+            self.tasks[task_id] = {'description': description, 'tile': tile, 'polls': 0}
+        return task_id
+
+    def status(self, task_id):
+        with self._lock:
+            task = self.tasks[task_id]
+            task['polls'] += 1
+            if task['polls'] < self.polls:
+                return 'RUNNING'
+            elif task['description'] in self.fail:
+                return 'FAILED'
+            return 'COMPLETED'
+
+
+class JobStore:
+    """SQLite table of the export job states"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        """
+
+        Parameters
+        ----------
+        path : str, optional
+            SQLite database path (the default is ~/.cache/openet-sims/export_jobs.sqlite).
+            Set to ':memory:' for a job table that is not written to disk.
+
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'description TEXT PRIMARY KEY, tile_id TEXT, state TEXT, task_id TEXT, '
+                'attempts INTEGER, error TEXT, updated TEXT)'
+            )
+
+    def get(self, description):
+        """Return the job as a dictionary (or None if it doesn't exist)"""
+        with self._lock:
+            cursor = self._conn.execute('SELECT * FROM jobs WHERE description = ?', [description])
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([c[0] for c in cursor.description], row))
+
+    def set(self, description, tile_id, state, task_id=None, attempts=0, error=None):
+        """Insert or update a job"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (description, tile_id, state, task_id, attempts, error,
+                 datetime.datetime.now(datetime.timezone.utc).isoformat())
+            )
+
+    def counts(self):
+        """Return the number of jobs in each state"""
+        with self._lock:
+            return dict(self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall())
+
+
+class TileExporter:
+    """Export an image for each tile with bounded task concurrency
+
+    Job states are stored in the job table, so a rerun skips the completed
+    tiles and resumes tracking the tasks that were still running.
+
+    """
+
+    def __init__(
+            self,
+            build_func,
+            tiles,
+            task_api,
+            job_store=None,
+            description='sims_{tile_id}',
+            max_tasks=4,
+            max_attempts=2,
+            poll_seconds=30,
+    ):
+        """
+
+        Parameters
+        ----------
+        build_func : function
+            Function that builds the export ee.Image for a tile
+            (see interpolate_build_func()).
+        tiles : list
+            Tiles from tile_grid().
+        task_api : EETaskAPI, LocalTaskAPI
+            Object with start(image, description, tile) and status(task_id)
+            methods.
+        job_store : JobStore, optional
+            The default is an in memory job table.
+        description : str, optional
+            Task description format, with a "tile_id" field
+            (the default is 'sims_{tile_id}').
+        max_tasks : int, optional
+            Maximum number of active tasks (the default is 4).
+        max_attempts : int, optional
+            Maximum number of submissions for each tile (the default is 2).
+        poll_seconds : float, optional
+            Seconds between task status checks (the default is 30).
+
+        """
+        if max_tasks < 1:
+            raise ValueError('max_tasks must be at least 1')
+        self.build_func = build_func
+        self.tiles = tiles
+        self.task_api = task_api
+        self.job_store = job_store if job_store is not None else JobStore(':memory:')
+        self.description = description
+        self.max_tasks = max_tasks
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+
+    def _submit(self, tile, description, attempts):
+        try:
+            task_id = self.task_api.start(self.build_func(tile), description, tile)
+        except Exception as e:
+            logging.warning(f'  {description}: {e}')
+            self.job_store.set(description, tile['id'], 'FAILED', attempts=attempts + 1, error=str(e))
+            return False
+        logging.info(f'  {description}: submitted {task_id}')
+        self.job_store.set(description, tile['id'], 'READY', task_id=task_id, attempts=attempts + 1)
+        return True
+
+    def run(self):
+        """Submit and track the tile export tasks until they are all finished
+
+        Returns
+        -------
+        dict : number of jobs in each state
+
+        """
+        pending = []
+        active = {}
+        for tile in self.tiles:
+            description = self.description.format(tile_id=tile['id'])
+            job = self.job_store.get(description)
+            if job is None:
+                pending.append((tile, description, 0))
+            elif job['state'] in DONE_STATES:
+                logging.debug(f'  {description}: skipping, already completed')
+            elif job['state'] in ACTIVE_STATES and job['task_id']:
+                active[description] = (tile, job)
+            elif job['attempts'] < self.max_attempts:
+                pending.append((tile, description, job['attempts']))
+
+        while pending or active:
+            while pending and len(active) < self.max_tasks:
+                tile, description, attempts = pending.pop(0)
+                if self._submit(tile, description, attempts):
+                    active[description] = (tile, self.job_store.get(description))
+                elif attempts + 1 < self.max_attempts:
+                    pending.append((tile, description, attempts + 1))
+
+            if not active:
+                continue
+            if self.poll_seconds:
+                time.sleep(self.poll_seconds)
+
+            for description, (tile, job) in list(active.items()):
+                state = self.task_api.status(job['task_id'])
+                if state in ACTIVE_STATES:
+                    continue
+                del active[description]
+                self.job_store.set(
+                    description, tile['id'], state, task_id=job['task_id'], attempts=job['attempts'],
+                )
+                logging.info(f'  {description}: {state}')
+                # States that are not active or completed (i.e. 'UNKNOWN' for a
+                #   purged task ID) are resubmitted like failed tasks
+                if state not in DONE_STATES and job['attempts'] < self.max_attempts:
+                    pending.append((tile, description, job['attempts']))
+
+        return self.job_store.counts()
@@ -0,0 +1,486 @@
+import asyncio
+from concurrent.futures import as_completed, ThreadPoolExecutor
+import datetime
+import functools
+import importlib
+import logging
+import time
+
+import ee
+
+from . import utils
+
+# Maximum number of elements (rows x columns) returned by getRegion
+GETREGION_MAX_ELEMENTS = 1048576
+
+
+def _import_optional(name):
+    """Import an optional dependency of the extract module
+
+    Raises
+    ------
+    ImportError naming the "extract" extra if the module is not installed
+
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(
+            f'{name} is required for the extract module, '
+            f'install it with "pip install openet-sims[extract]"'
+        ) from None
+
+
+def point_coll_values(
+        coll,
+        points,
+        scale=30,
+        crs=None,
+        id_property='id',
+        chunk_size=100,
+        max_workers=8,
+        as_dataframe=True,
+        **kwargs
+):
+    """Extract the time series of an image collection at many points
+
+    Parameters
+    ----------
+    coll : ee.ImageCollection
+        Images must have a system:time_start property
+        (i.e. the output of Collection.interpolate() or Collection.overpass()).
+    points : dict, list, ee.FeatureCollection
+        Dictionary of point IDs and [lon, lat] pairs, a list of [lon, lat]
+        pairs (the list index will be used as the ID), or a FeatureCollection
+        with an id_property property on each feature.
+    scale : float, optional
+        Reduction scale in meters (the default is 30).
+    crs : str, optional
+        Reduction projection (the default is None).
+    id_property : str, optional
+        Point ID property name (the default is 'id').
+    chunk_size : int, optional
+        Number of points in each request (the default is 100).
+        A chunk that fails with a memory error will be split in half.
+    max_workers : int, optional
+        Maximum number of concurrent requests (the default is 8).
+    as_dataframe : bool, optional
+        If True, return a pandas DataFrame, otherwise return a dictionary of
+        NumPy arrays (the default is True).
+    kwargs : dict, optional
+        Additional keyword arguments passed to utils.getinfo_retry().
+
+    Returns
+    -------
+    pandas.DataFrame or dict
+        One row for each point and image with the point ID, the image time
+        (datetime64[ms]), and a column for each image band.
+
+    Raises
+    ------
+    ValueError for invalid chunk_size
+    EEQueryError subclass if a chunk request fails
+
+    """
+    requests = _point_requests(coll, points, scale, crs, id_property, chunk_size, kwargs)
+
+    features = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(request) for request in requests]
+        try:
+            for future in as_completed(futures):
+                features.extend(future.result()['features'])
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+
+    return _point_output(features, id_property, as_dataframe)
+
+
+async def point_coll_values_async(
+        coll,
+        points,
+        scale=30,
+        crs=None,
+        id_property='id',
+        chunk_size=100,
+        max_concurrency=8,
+        limiter=None,
+        as_dataframe=True,
+        **kwargs
+):
+    """Extract the time series at many points without blocking the event loop
+
+    The parameters and output are the same as point_coll_values(), except
+    that the chunk requests are run as concurrent asyncio tasks.
+
+    Parameters
+    ----------
+    max_concurrency : int, optional
+        Maximum number of outstanding requests if limiter is not set
+        (the default is 8).
+    limiter : asyncio.Semaphore, optional
+        Semaphore shared with other calls to limit the total number of
+        outstanding requests (the default is None).
+
+    """
+    if limiter is None:
+        limiter = asyncio.Semaphore(max_concurrency)
+
+    requests = await utils.run_async(
+        _point_requests, coll, points, scale, crs, id_property, chunk_size, kwargs,
+        limiter=limiter,
+    )
+    outputs = await utils.gather_async(
+        [utils.run_async(request, limiter=limiter) for request in requests]
+    )
+    features = [ftr for output in outputs for ftr in output['features']]
+
+    return _point_output(features, id_property, as_dataframe)
+
+
+def _point_requests(coll, points, scale, crs, id_property, chunk_size, getinfo_args):
+    """Build the chunked point extraction request functions"""
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be a positive integer')
+
+    if isinstance(points, ee.FeatureCollection):
+        point_count = utils.getinfo(points.size())
+
+        def build_points(items):
+            return ee.FeatureCollection(points.toList(len(items), items[0]))
+
+        items = list(range(point_count))
+    else:
+        if isinstance(points, dict):
+            items = list(points.items())
+        else:
+            items = list(enumerate(points))
+
+        def build_points(items):
+            return ee.FeatureCollection([
+                ee.Feature(ee.Geometry.Point(list(xy)), {id_property: point_id})
+                for point_id, xy in items
+            ])
+
+    def build_func(items):
+        return reduce_regions(coll, build_points(items), scale=scale, crs=crs)
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    logging.debug(f'  Extracting {len(items)} points in {len(chunks)} requests')
+
+    return [
+        functools.partial(
+            utils.getinfo_bisect, build_func, chunk, utils.merge_feature_collections,
+            **getinfo_args
+        )
+        for chunk in chunks
+    ]
+
+
+def _point_output(features, id_property, as_dataframe):
+    columns = features_to_columns(features, id_property=id_property)
+    if not as_dataframe:
+        return columns
+
+    pd = _import_optional('pandas')
+    return (
+        pd.DataFrame(columns)
+        .sort_values([id_property, 'time'])
+        .reset_index(drop=True)
+    )
+
+
+def reduce_regions(coll, features, scale=30, crs=None):
+    """Reduce each image in a collection at a set of features
+
+    Parameters
+    ----------
+    coll : ee.ImageCollection
+    features : ee.FeatureCollection
+    scale : float, optional
+        Reduction scale in meters (the default is 30).
+    crs : str, optional
+        Reduction projection (the default is None).
+
+    Returns
+    -------
+    ee.FeatureCollection
+        Features with a property for each band and a "time" property,
+        without geometries.
+
+    """
+    def image_reduce(image):
+        time_start = image.get('system:time_start')
+        # Using forEach so that single band images are not named "first"
+        output = image.reduceRegions(
+            collection=features,
+            reducer=ee.Reducer.first().forEach(image.bandNames()),
+            scale=scale,
+            crs=crs,
+        )
+        return output.map(lambda ftr: ftr.set('time', time_start))
+
+    return (
+        ee.FeatureCollection(ee.ImageCollection(coll).map(image_reduce)).flatten()
+        .select(['.*'], None, False)
+    )
+
+
+def features_to_columns(features, id_property='id'):
+    """Parse reduceRegions feature getInfo output into NumPy columns
+
+    Parameters
+    ----------
+    features : list
+        Feature dictionaries (the "features" of a FeatureCollection getInfo).
+    id_property : str, optional
+        Point ID property name (the default is 'id').
+
+    Returns
+    -------
+    dict of NumPy arrays
+        The "time" column is converted from milliseconds to datetime64[ms],
+        numeric columns (i.e. the bands) are float with missing values set
+        to NaN, and other point properties are object arrays.
+
+    """
+    np = _import_optional('numpy')
+
+    properties = [ftr['properties'] for ftr in features]
+    band_names = []
+    for props in properties:
+        for k in props.keys():
+            if k not in band_names and k not in [id_property, 'time']:
+                band_names.append(k)
+
+    columns = {
+        id_property: np.array([p.get(id_property) for p in properties]),
+        'time': np.array([p['time'] for p in properties], dtype='int64').astype('datetime64[ms]'),
+    }
+    for band in band_names:
+        values = [p.get(band) for p in properties]
+        # Point collection properties (i.e. names) are not cast to float
+        if all(v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values):
+            columns[band] = np.array(values, dtype='float64')
+        else:
+            columns[band] = np.array(values, dtype=object)
+
+    return columns
+
+
+def point_coll_region(
+        coll,
+        xy,
+        start_date,
+        end_date,
+        scale=30,
+        chunk_days=None,
+        images_per_day=1,
+        max_elements=GETREGION_MAX_ELEMENTS,
+        max_workers=8,
+        as_dataframe=True,
+        return_latency=False,
+        **kwargs
+):
+    """Extract a long time series at a point with date chunked getRegion calls
+
+    Parameters
+    ----------
+    coll : ee.ImageCollection
+        Images must have a system:time_start property.
+    xy : list
+        Point [lon, lat].
+    start_date : str
+        ISO format start date (inclusive).
+    end_date : str
+        ISO format end date (exclusive).
+    scale : float, optional
+        Reduction scale in meters (the default is 30).
+    chunk_days : int, optional
+        Number of days in each request.  If not set, the chunk size is
+        computed from the number of bands so that each request stays under
+        max_elements (the default is None).
+    images_per_day : float, optional
+        Expected number of images per day, used to size the chunks
+        (the default is 1 for daily collections).
+    max_elements : int, optional
+        Maximum number of getRegion elements in each request
+        (the default is 1048576).
+    max_workers : int, optional
+        Maximum number of concurrent requests (the default is 8).
+    as_dataframe : bool, optional
+        If True, return a pandas DataFrame, otherwise return a dictionary of
+        NumPy arrays (the default is True).
+    return_latency : bool, optional
+        If True, also return a list of the start date, end date, number of
+        rows, and seconds for each chunk (the default is False).
+    kwargs : dict, optional
+        Additional keyword arguments passed to utils.getinfo_retry().
+
+    Returns
+    -------
+    pandas.DataFrame or dict, (list)
+        One row for each image sorted by time.
+
+    Raises
+    ------
+    ValueError for invalid dates or chunk_days
+
+    """
+    chunk_dates, chunk_region = _region_requests(
+        coll, xy, start_date, end_date, scale, chunk_days, images_per_day,
+        max_elements, kwargs,
+    )
+
+    outputs = [None] * len(chunk_dates)
+    latency = [None] * len(chunk_dates)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(chunk_region, start, end): i
+            for i, (start, end) in enumerate(chunk_dates)
+        }
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                outputs[i], latency[i] = future.result()
+        except Exception:
+            for f in futures:
+                f.cancel()
+            raise
+
+    return _region_output(outputs, latency, as_dataframe, return_latency)
+
+
+async def point_coll_region_async(
+        coll,
+        xy,
+        start_date,
+        end_date,
+        scale=30,
+        chunk_days=None,
+        images_per_day=1,
+        max_elements=GETREGION_MAX_ELEMENTS,
+        max_concurrency=8,
+        limiter=None,
+        as_dataframe=True,
+        return_latency=False,
+        **kwargs
+):
+    """Extract a long point time series without blocking the event loop
+
+    The parameters and output are the same as point_coll_region(), except
+    that the date chunk requests are run as concurrent asyncio tasks.
+
+    Parameters
+    ----------
+    max_concurrency : int, optional
+        Maximum number of outstanding requests if limiter is not set
+        (the default is 8).
+    limiter : asyncio.Semaphore, optional
+        Semaphore shared with other calls to limit the total number of
+        outstanding requests (the default is None).
+
+    """
+    if limiter is None:
+        limiter = asyncio.Semaphore(max_concurrency)
+
+    chunk_dates, chunk_region = await utils.run_async(
+        _region_requests, coll, xy, start_date, end_date, scale, chunk_days,
+        images_per_day, max_elements, kwargs, limiter=limiter,
+    )
+    chunk_outputs = await utils.gather_async([
+        utils.run_async(chunk_region, start, end, limiter=limiter)
+        for start, end in chunk_dates
+    ])
+    outputs, latency = map(list, zip(*chunk_outputs))
+
+    return _region_output(outputs, latency, as_dataframe, return_latency)
+
+
+def _region_requests(coll, xy, start_date, end_date, scale, chunk_days, images_per_day,
+                     max_elements, getinfo_args):
+    """Build the date chunks and the function for requesting each chunk"""
+    start_dt = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+    if end_dt <= start_dt:
+        raise ValueError('end_date must be after start_date')
+
+    if chunk_days is None:
+        # getRegion adds id, longitude, latitude, and time columns
+        band_count = utils.getinfo(ee.ImageCollection(coll).first().bandNames().size())
+        chunk_days = int(max_elements / ((band_count + 4) * images_per_day))
+    if chunk_days < 1:
+        raise ValueError('chunk_days must be a positive integer')
+
+    chunk_dates = []
+    chunk_start_dt = start_dt
+    while chunk_start_dt < end_dt:
+        chunk_end_dt = min(chunk_start_dt + datetime.timedelta(days=chunk_days), end_dt)
+        chunk_dates.append((chunk_start_dt.strftime('%Y-%m-%d'), chunk_end_dt.strftime('%Y-%m-%d')))
+        chunk_start_dt = chunk_end_dt
+    logging.debug(f'  Extracting {len(chunk_dates)} date chunks of {chunk_days} days')
+
+    geometry = ee.Geometry.Point(xy)
+
+    def build_func(start, end):
+        return ee.ImageCollection(coll).filterDate(start, end).getRegion(geometry, scale=scale)
+
+    def chunk_region(start, end):
+        chunk_time = time.monotonic()
+        output = utils.getinfo_date_bisect(
+            build_func, start, end, utils.merge_region_lists, **getinfo_args
+        )
+        seconds = time.monotonic() - chunk_time
+        logging.info(f'    {start} {end} - {len(output) - 1} rows in {seconds:.2f}s')
+        return output, [start, end, len(output) - 1, seconds]
+
+    return chunk_dates, chunk_region
+
+
+def _region_output(outputs, latency, as_dataframe, return_latency):
+    columns = region_to_columns(utils.merge_region_lists(outputs))
+    if as_dataframe:
+        pd = _import_optional('pandas')
+        columns = pd.DataFrame(columns)
+
+    if return_latency:
+        return columns, latency
+    return columns
+
+
+def region_to_columns(region):
+    """Parse getRegion output into NumPy columns sorted by time
+
+    Parameters
+    ----------
+    region : list
+        getRegion getInfo output (header row followed by the value rows).
+
+    Returns
+    -------
+    dict of NumPy arrays
+        The "time" column is converted from milliseconds to datetime64[ms],
+        band columns are float with missing values set to NaN.
+
+    """
+    np = _import_optional('numpy')
+
+    header, rows = region[0], region[1:]
+    values = list(zip(*rows)) if rows else [()] * len(header)
+
+    time_index = header.index('time')
+    time_ms = np.array(values[time_index], dtype='int64')
+    order = np.argsort(time_ms, kind='stable')
+
+    columns = {
+        'id': np.array(values[header.index('id')], dtype=str)[order],
+        'time': time_ms[order].astype('datetime64[ms]'),
+    }
+    for i, band in enumerate(header):
+        if band in ['id', 'longitude', 'latitude', 'time']:
+            continue
+        columns[band] = np.array(values[i], dtype='float64')[order]
+
+    return columns
@@ -1,7 +1,9 @@
+import re
+
 import ee
 import openet.core.common
 
-from .model import Model
+from .model import get_model
 # from . import model
 from . import utils
 # import utils
@@ -39,6 +41,7 @@ class Image():
         mask_non_ag_flag=False,
         water_kc_flag=True,
         reflectance_type='SR',
+        year=None,
     ):
         """Earth Engine based SIMS image object
 
@@ -81,6 +84,11 @@ class Image():
             If True, set Kc for water pixels to 1.05.  The default is True.
         reflectance_type : {'SR', 'TOA'}, optional
             Used to select the fractional cover equation (the default is 'SR').
+        year : int, optional
+            Image year.  If set, the crop type Model will be shared with other
+            Image instances from the same year and with the same parameters.
+            The default is None, which will compute the year from the image
+            system:time_start.
 
         Notes
         -----
@@ -109,7 +117,10 @@ class Image():
 
         # Build date properties from the system:time_start
         self._date = ee.Date(self._time_start)
-        self._year = ee.Number(self._date.get('year'))
+        if year is not None:
+            self._year = year
+        else:
+            self._year = ee.Number(self._date.get('year'))
         self._start_date = ee.Date(utils.date_0utc(self._date).millis())
         self._end_date = self._start_date.advance(1, 'day')
         self._doy = self._date.getRelative('day', 'year').add(1).int()
@@ -133,10 +144,10 @@ class Image():
         self.reflectance_type = reflectance_type
 
         # CGM - Model class could inherit these from Image instead of passing them
-        #   Could pass time_start instead of separate year and doy
-        self.model = Model(
+        #   The doy is passed to Model.kc() so that the Model can be shared
+        #   by all the images from the same year
+        self.model = get_model(
             year=self._year,
-            doy=self._doy,
             crop_type_source=crop_type_source,
             crop_type_remap=crop_type_remap,
             crop_type_kc_flag=crop_type_kc_flag,
@@ -299,7 +310,7 @@ class Image():
         ee.Image
 
         """
-        return self.model.kc(self.ndvi).rename(['kc']).set(self._properties)
+        return self.model.kc(self.ndvi, doy=self._doy).rename(['kc']).set(self._properties)
 
     @lazy_property
     def mask(self):
@@ -387,18 +398,24 @@ class Image():
 
         method = getattr(Image, method_name)
 
+        # Get the year from the image ID so that the Model can be shared
+        year_match = re.search(r'_(\d{4})\d{4}$', image_id)
+        if year_match and 'year' not in kwargs.keys():
+            kwargs['year'] = int(year_match.group(1))
+
         return method(ee.Image(image_id), **kwargs)
 
     @classmethod
-    def from_landsat_c2_sr(cls, sr_image, cloudmask_args={}, **kwargs):
+    def from_landsat_c2_sr(cls, sr_image, cloudmask_args=None, **kwargs):
         """Construct a SIMS Image instance from a Landsat C02 level 2 (SR) image
 
         Parameters
         ----------
         sr_image : ee.Image, str
             A raw Landsat Collection 2 level 2 (SR) image or image ID.
-        cloudmask_args : dict
+        cloudmask_args : dict, optional
             keyword arguments to pass through to cloud mask function
+            (the dictionary is copied and not modified)
         kwargs : dict
             Keyword arguments to pass through to model init.
 
@@ -441,6 +458,8 @@ class Image():
 
         # Default the cloudmask flags to True if they were not
         # Eventually these will probably all default to True in openet.core
+        # Update a copy of the args so the caller (and default) is never modified
+        cloudmask_args = dict(cloudmask_args) if cloudmask_args else {}
         if 'cirrus_flag' not in cloudmask_args.keys():
             cloudmask_args['cirrus_flag'] = True
         if 'dilate_flag' not in cloudmask_args.keys():
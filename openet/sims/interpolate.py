@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import logging
+import re
 
 from dateutil.relativedelta import relativedelta
 import ee
@@ -11,6 +12,329 @@ from . import utils
 
 RESAMPLE_METHODS = ['nearest', 'bilinear', 'bicubic']
 
+# Time intervals that are built by aggregating monthly images
+ROLLUP_INTERVALS = ['annual', 'water_year']
+
+INTERP_ENGINES = ['core', 'array']
+
+# Variables that can be computed from the interpolated NDVI without reading
+#   the reference ET collection
+NDVI_ONLY_VARIABLES = {'ndvi', 'count', 'scene_count', 'daily_count'}
+
+# Variables that can be aggregated directly from the reference ET collection
+#   without interpolating the scene collection
+ET_REFERENCE_ONLY_VARIABLES = {'et_reference', 'daily_count'}
+
+
+def period_date_range(start_dt, end_dt, t_interval):
+    """Expand a date range to fully include the aggregation time periods
+
+    Parameters
+    ----------
+    start_dt : datetime
+        Start date (inclusive).
+    end_dt : datetime
+        End date (exclusive).
+    t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}
+
+    Returns
+    -------
+    tuple of datetimes (start and exclusive end)
+
+    Notes
+    -----
+    Water years start on October 1 and are labelled by the calendar year
+    they end in (i.e. water year 2018 is 2017-10-01 to 2018-10-01).
+
+    """
+    if t_interval.lower() == 'monthly':
+        start_dt = datetime(start_dt.year, start_dt.month, 1)
+        end_dt -= relativedelta(days=+1)
+        end_dt = datetime(end_dt.year, end_dt.month, 1)
+        end_dt += relativedelta(months=+1)
+    elif t_interval.lower() == 'annual':
+        # Convert end date to inclusive, flatten to beginning of year,
+        # then add a year which will make it exclusive
+        start_dt = datetime(start_dt.year, 1, 1)
+        end_dt -= relativedelta(days=+1)
+        end_dt = datetime(end_dt.year + 1, 1, 1)
+    elif t_interval.lower() == 'water_year':
+        if start_dt.month >= 10:
+            start_dt = datetime(start_dt.year, 10, 1)
+        else:
+            start_dt = datetime(start_dt.year - 1, 10, 1)
+        end_dt -= relativedelta(days=+1)
+        if end_dt.month >= 10:
+            end_dt = datetime(end_dt.year + 1, 10, 1)
+        else:
+            end_dt = datetime(end_dt.year, 10, 1)
+
+    return start_dt, end_dt
+
+
+def period_list(start_dt, end_dt, t_interval):
+    """Split a date range into the aggregation time periods
+
+    Parameters
+    ----------
+    start_dt : datetime
+        Start date (inclusive).
+    end_dt : datetime
+        End date (exclusive).
+    t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}
+
+    Returns
+    -------
+    list of (start, exclusive end) datetime tuples
+
+    """
+    start_dt, end_dt = period_date_range(start_dt, end_dt, t_interval)
+    if t_interval.lower() == 'daily':
+        step = relativedelta(days=+1)
+    elif t_interval.lower() == 'monthly':
+        step = relativedelta(months=+1)
+    elif t_interval.lower() in ROLLUP_INTERVALS:
+        step = relativedelta(years=+1)
+    elif t_interval.lower() == 'custom':
+        return [(start_dt, end_dt)]
+    else:
+        raise ValueError(f'unsupported t_interval: {t_interval}')
+
+    periods = []
+    while start_dt < end_dt:
+        periods.append((start_dt, start_dt + step))
+        start_dt += step
+    return periods
+
+
+def affected_periods(
+        scenes,
+        start_date,
+        end_date,
+        t_interval,
+        interp_days=32,
+        estimate_soil_evaporation=False,
+):
+    """Return the output periods affected by new or changed scenes
+
+    Parameters
+    ----------
+    scenes : list
+        Scene image IDs (ending in "_YYYYMMDD") or ISO format dates.
+    start_date : str
+        ISO format start date of the outputs.
+    end_date : str
+        ISO format end date of the outputs (exclusive).
+    t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}
+    interp_days : int, optional
+        Interpolation window (the default is 32).  A scene only changes the
+        interpolated daily values within interp_days of the scene date.
+    estimate_soil_evaporation : bool, optional
+        If True, the soil water balance carries each scene forward, so all
+        the days after each scene are affected (the default is False).
+
+    Returns
+    -------
+    list of (start, exclusive end) ISO format date tuples, sorted
+
+    Raises
+    ------
+    ValueError if a scene date can't be parsed
+
+    """
+    # The outputs fully include the periods containing the start and end dates
+    output_start_dt, output_end_dt = period_date_range(
+        datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d'), t_interval
+    )
+    periods = period_list(output_start_dt, output_end_dt, t_interval)
+
+    affected = set()
+    for scene in scenes:
+        date_match = re.search(r'(\d{4})-?(\d{2})-?(\d{2})$', scene)
+        if not date_match:
+            raise ValueError(f'scene date could not be parsed: {scene}')
+        scene_dt = datetime(*map(int, date_match.groups()))
+
+        # The daily values between the scene and its neighboring scenes change
+        affected_start_dt = max(scene_dt - timedelta(days=interp_days), output_start_dt)
+        if estimate_soil_evaporation:
+            affected_end_dt = output_end_dt
+        else:
+            affected_end_dt = min(scene_dt + timedelta(days=interp_days + 1), output_end_dt)
+        if affected_start_dt >= affected_end_dt:
+            continue
+
+        for period_start_dt, period_end_dt in periods:
+            if period_start_dt < affected_end_dt and period_end_dt > affected_start_dt:
+                affected.add((period_start_dt.strftime('%Y-%m-%d'), period_end_dt.strftime('%Y-%m-%d')))
+
+    return sorted(affected)
+
+
+def daily_target_coll(start_date, end_date):
+    """Build a lightweight daily target collection for the interpolation
+
+    Parameters
+    ----------
+    start_date : str
+        ISO format start date.
+    end_date : str
+        ISO format end date (exclusive).
+
+    Returns
+    -------
+    ee.ImageCollection
+
+    Notes
+    -----
+    The images are constant images with a single "target" band and a 0 UTC
+    system:time_start for each day in the date range.  The collection can be
+    used in place of the reference ET collection when the reference ET values
+    are not needed (i.e. when only interpolating NDVI).
+
+    """
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+
+    def target_image(day):
+        target_date = ee.Date(start_date).advance(day, 'day')
+        return (
+            ee.Image.constant(0).double().rename(['target'])
+            .set({
+                'system:index': target_date.format('yyyyMMdd'),
+                'system:time_start': target_date.millis(),
+            })
+        )
+
+    return ee.ImageCollection(
+        ee.List.sequence(0, (end_dt - start_dt).days - 1).map(target_image)
+    )
+
+
+def from_monthly_aggregates(
+        monthly_coll,
+        start_date,
+        end_date,
+        variables,
+        t_interval='annual',
+        mask_partial_aggregations=True,
+):
+    """Aggregate monthly images to annual or water year images
+
+    Parameters
+    ----------
+    monthly_coll : ee.ImageCollection
+        Monthly images, either built with t_interval='monthly' or read from
+        previously exported monthly assets.  The "et" and "et_reference" bands
+        must be present to compute "et_fraction".
+    start_date : str
+        ISO format start date.
+    end_date : str
+        ISO format end date (exclusive, passed directly to .filterDate()).
+    variables : list
+        List of variables that will be returned in the Image Collection.
+    t_interval : {'annual', 'water_year'}, optional
+        Time interval over which to aggregate the monthly values.
+        The default is 'annual'.
+    mask_partial_aggregations : bool, optional
+        If True, pixels that do not have a value for every month in the
+        aggregation time period will be masked.  The default is True.
+
+    Returns
+    -------
+    ee.ImageCollection
+
+    Raises
+    ------
+    ValueError
+
+    Notes
+    -----
+    ET and reference ET are summed and the ET fraction is recomputed from the
+    sums.  Scene and daily counts are summed and NDVI is the mean of the
+    monthly values.
+
+    """
+    if t_interval.lower() not in ROLLUP_INTERVALS:
+        raise ValueError(f'unsupported t_interval: {t_interval}')
+    if not variables:
+        raise ValueError('variables parameter must be set')
+
+    start_dt, end_dt = period_date_range(
+        datetime.strptime(start_date, '%Y-%m-%d'),
+        datetime.strptime(end_date, '%Y-%m-%d'),
+        t_interval,
+    )
+
+    if ('et' in variables) or ('et_fraction' in variables):
+        aggregation_band = 'et'
+    elif 'et_reference' in variables:
+        aggregation_band = 'et_reference'
+    elif 'ndvi' in variables:
+        aggregation_band = 'ndvi'
+    else:
+        raise ValueError('no supported aggregation band')
+
+    def aggregate_image(agg_start_dt, agg_end_dt, index):
+        agg_coll = monthly_coll.filterDate(
+            agg_start_dt.strftime('%Y-%m-%d'), agg_end_dt.strftime('%Y-%m-%d')
+        )
+
+        et_img = None
+        eto_img = None
+        if ('et' in variables) or ('et_fraction' in variables):
+            et_img = agg_coll.select(['et']).sum()
+        if ('et_reference' in variables) or ('et_fraction' in variables):
+            eto_img = agg_coll.select(['et_reference']).sum()
+
+        image_list = []
+        if 'et' in variables:
+            image_list.append(et_img.float())
+        if 'et_reference' in variables:
+            image_list.append(eto_img.float())
+        if 'et_fraction' in variables:
+            image_list.append(et_img.divide(eto_img).rename(['et_fraction']).float())
+        if 'ndvi' in variables:
+            image_list.append(agg_coll.select(['ndvi']).mean().float())
+        if ('scene_count' in variables) or ('count' in variables):
+            image_list.append(agg_coll.select(['count']).sum().rename('count').uint8())
+        if 'daily_count' in variables:
+            image_list.append(
+                agg_coll.select(['daily_count']).sum().rename('daily_count').uint16()
+            )
+
+        output_img = ee.Image(image_list)
+
+        if mask_partial_aggregations:
+            month_count = relativedelta(agg_end_dt, agg_start_dt)
+            month_count = month_count.years * 12 + month_count.months
+            month_count_mask = (
+                agg_coll.select([aggregation_band]).reduce(ee.Reducer.count())
+                .gte(month_count)
+            )
+            output_img = output_img.updateMask(month_count_mask)
+
+        return output_img.set({
+            'system:index': index,
+            'system:time_start': utils.millis(agg_start_dt),
+        })
+
+    image_list = []
+    iter_dt = start_dt
+    # Conditional is "less than" because end date is exclusive
+    while iter_dt < end_dt:
+        next_dt = iter_dt + relativedelta(years=+1)
+        if t_interval.lower() == 'water_year':
+            # Water years are labelled by the year they end in
+            index = next_dt.strftime('%Y')
+        else:
+            index = iter_dt.strftime('%Y')
+        image_list.append(aggregate_image(iter_dt, next_dt, index))
+        iter_dt = next_dt
+
+    return ee.ImageCollection(image_list)
+
+
 def from_scene_et_fraction(
         scene_coll,
         start_date,
@@ -57,6 +381,11 @@ def from_scene_et_fraction(
             If True, use joins to link the target and source collections.
             If False, the source collection will be filtered for each target image.
             This parameter is passed through to interpolate.daily().
+        interp_engine : {'core', 'array'}, optional
+            If 'core', interpolate with openet.core.interpolate.daily().
+            If 'array', interpolate with daily_array(), which stacks the scene
+            images into an array image instead of joining each day to the
+            neighboring scenes.  The default is 'core'.
         estimate_soil_evaporation: bool
             Compute daily Ke values by simulating water balance in evaporable
             zone. Default is False.
@@ -66,10 +395,12 @@ def from_scene_et_fraction(
             setting the interpolation start date.  Default is 0 days.
     model_args : dict
         Parameters from the MODEL section of the INI file.
-    t_interval : {'daily', 'monthly', 'custom'}
+    t_interval : {'daily', 'monthly', 'annual', 'water_year', 'custom'}
         Time interval over which to interpolate and aggregate values
         The 'custom' interval will aggregate all days within the start and end
         dates into an image collection with a single image.
+        The 'annual' and 'water_year' intervals are built by aggregating the
+        monthly images (see from_monthly_aggregates()).
     _interp_vars : list, optional
         The variables that can be interpolated to daily timesteps.
         The default is to interpolate the 'et_fraction' and 'ndvi' bands.
@@ -128,11 +459,20 @@ def from_scene_et_fraction(
         use_joins = True
         logging.debug('use_joins was not set in interp_args, default to True')
 
+    # Get interp_engine
+    if 'interp_engine' in interp_args.keys():
+        interp_engine = interp_args['interp_engine']
+    else:
+        interp_engine = 'core'
+        logging.debug('interp_engine was not set in interp_args, default to "core"')
+
     # Check that the input parameters are valid
-    if t_interval.lower() not in ['daily', 'monthly', 'custom']:
+    if t_interval.lower() not in ['daily', 'monthly', 'custom'] + ROLLUP_INTERVALS:
         raise ValueError(f'unsupported t_interval: {t_interval}')
     elif interp_method.lower() not in ['linear']:
         raise ValueError(f'unsupported interp_method: {interp_method}')
+    elif interp_engine.lower() not in INTERP_ENGINES:
+        raise ValueError(f'unsupported interp_engine: {interp_engine}')
 
     if (((type(interp_days) is str) or (type(interp_days) is float)) and
             utils.is_number(interp_days)):
@@ -145,15 +485,25 @@ def from_scene_et_fraction(
     if not variables:
         raise ValueError('variables parameter must be set')
 
+    # Annual and water year values are aggregated from the monthly images
+    # The ET and reference ET sums are needed to recompute the ET fraction
+    if t_interval.lower() in ROLLUP_INTERVALS:
+        rollup_interval = t_interval.lower()
+        output_vars = variables
+        variables = list(variables)
+        if 'et_fraction' in variables:
+            variables.extend(v for v in ['et', 'et_reference'] if v not in variables)
+        t_interval = 'monthly'
+    else:
+        rollup_interval = None
+
     # Adjust start/end dates based on t_interval
     # Increase the date range to fully include the time interval
-    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-    if t_interval.lower() == 'monthly':
-        start_dt = datetime(start_dt.year, start_dt.month, 1)
-        end_dt -= relativedelta(days=+1)
-        end_dt = datetime(end_dt.year, end_dt.month, 1)
-        end_dt += relativedelta(months=+1)
+    start_dt, end_dt = period_date_range(
+        datetime.strptime(start_date, '%Y-%m-%d'),
+        datetime.strptime(end_date, '%Y-%m-%d'),
+        rollup_interval or t_interval,
+    )
     start_date = start_dt.strftime('%Y-%m-%d')
     end_date = end_dt.strftime('%Y-%m-%d')
 
@@ -167,11 +517,24 @@ def from_scene_et_fraction(
     interp_start_date = interp_start_dt.date().isoformat()
     interp_end_date = interp_end_dt.date().isoformat()
 
+    # NDVI can be interpolated without the reference ET collection
+    # The soil water balance needs the reference ET
+    ndvi_only = (
+        ('ndvi' in variables) and
+        set(variables).issubset(NDVI_ONLY_VARIABLES) and
+        not estimate_soil_evaporation
+    )
+
     # Get reference ET parameters
     # Supporting reading the parameters from both the interp_args and model_args dictionaries
     # Check interp_args then model_args, and eventually drop support for reading from model_args
     # Assume that if source and band are present, factor and resample should also be read
-    if ('et_reference_source' in interp_args.keys()) and ('et_reference_band' in interp_args.keys()):
+    if ndvi_only:
+        et_reference_source = None
+        et_reference_band = None
+        et_reference_factor = None
+        et_reference_resample = None
+    elif ('et_reference_source' in interp_args.keys()) and ('et_reference_band' in interp_args.keys()):
         et_reference_source = interp_args['et_reference_source']
         et_reference_band = interp_args['et_reference_band']
         if not et_reference_source or not et_reference_band:
@@ -222,37 +585,42 @@ def from_scene_et_fraction(
     else:
         raise ValueError('et_reference_source or et_reference_band were not set')
 
-    # Check if collection already has et_reference provided
-    #   if not, get it from the collection
-    if (type(et_reference_source) is str) and (et_reference_source.lower() == 'provided'):
-        daily_et_ref_coll = scene_coll.map(lambda x: x.select('et_reference'))
-    elif type(et_reference_source) is str:
-        # Assume a string source is a single image collection ID
-        #   not a list of collection IDs or ee.ImageCollection
-        daily_et_ref_coll = (
-            ee.ImageCollection(et_reference_source)
-            .filterDate(start_date, end_date)
-            .select([et_reference_band], ['et_reference'])
-        )
-    # elif isinstance(et_reference_source, computedobject.ComputedObject):
-    #     # Interpret computed objects as image collections
-    #     daily_et_ref_coll = (
-    #         et_reference_source
-    #         .filterDate(start_date, end_date)
-    #         .select([et_reference_band], ['et_reference'])
-    #     )
+    if ndvi_only:
+        # Interpolate to a synthetic daily target collection instead of reading
+        #   the reference ET collection
+        daily_et_ref_coll = daily_target_coll(start_date, end_date)
     else:
-        raise ValueError(f'unsupported et_reference_source: {et_reference_source}')
-
-    # Scale reference ET images (if necessary)
-    if et_reference_factor and (et_reference_factor != 1):
-        def et_reference_adjust(input_img):
-            return (
-                input_img.multiply(et_reference_factor)
-                .copyProperties(input_img)
-                .set({'system:time_start': input_img.get('system:time_start')})
+        # Check if collection already has et_reference provided
+        #   if not, get it from the collection
+        if (type(et_reference_source) is str) and (et_reference_source.lower() == 'provided'):
+            daily_et_ref_coll = scene_coll.map(lambda x: x.select('et_reference'))
+        elif type(et_reference_source) is str:
+            # Assume a string source is a single image collection ID
+            #   not a list of collection IDs or ee.ImageCollection
+            daily_et_ref_coll = (
+                ee.ImageCollection(et_reference_source)
+                .filterDate(start_date, end_date)
+                .select([et_reference_band], ['et_reference'])
             )
-        daily_et_ref_coll = daily_et_ref_coll.map(et_reference_adjust)
+        # elif isinstance(et_reference_source, computedobject.ComputedObject):
+        #     # Interpret computed objects as image collections
+        #     daily_et_ref_coll = (
+        #         et_reference_source
+        #         .filterDate(start_date, end_date)
+        #         .select([et_reference_band], ['et_reference'])
+        #     )
+        else:
+            raise ValueError(f'unsupported et_reference_source: {et_reference_source}')
+
+        # Scale reference ET images (if necessary)
+        if et_reference_factor and (et_reference_factor != 1):
+            def et_reference_adjust(input_img):
+                return (
+                    input_img.multiply(et_reference_factor)
+                    .copyProperties(input_img)
+                    .set({'system:time_start': input_img.get('system:time_start')})
+                )
+            daily_et_ref_coll = daily_et_ref_coll.map(et_reference_adjust)
 
     # Initialize variable list to only variables that can be interpolated
     interp_vars = list(set(_interp_vars) & set(variables))
@@ -267,8 +635,8 @@ def from_scene_et_fraction(
         interp_vars = interp_vars + ['et_fraction']
 
     # To compute the daily count, the ETf must be interpolated
-    # We may want to add support for computing daily_count when interpolating NDVI
-    if ('daily_count' in variables) and ('et_fraction' not in interp_vars):
+    #   unless only NDVI is being interpolated
+    if ('daily_count' in variables) and ('et_fraction' not in interp_vars) and not ndvi_only:
         interp_vars = interp_vars + ['et_fraction']
 
     # The NDVI band is always needed for the soil water balance
@@ -278,6 +646,10 @@ def from_scene_et_fraction(
     # TODO: Look into implementing et_fraction clamping here
     #   (similar to et_actual below)
 
+    # The mask and time bands are built from the ET fraction band
+    #   unless only NDVI is being interpolated
+    mask_band = 'ndvi' if ndvi_only else 'et_fraction'
+
     def interpolate_prep(img):
         """Prep WRS2 scene images for interpolation
 
@@ -291,10 +663,10 @@ def from_scene_et_fraction(
 
         """
         mask_img = (
-            img.select(['et_fraction']).multiply(0).add(1).updateMask(1).uint8().rename(['mask'])
+            img.select([mask_band]).multiply(0).add(1).updateMask(1).uint8().rename(['mask'])
         )
         time_img = (
-            img.select(['et_fraction']).double().multiply(0)
+            img.select([mask_band]).double().multiply(0)
             .add(utils.date_0utc(ee.Date(img.get('system:time_start'))).millis())
             .rename(['time'])
         )
@@ -341,30 +713,9 @@ def from_scene_et_fraction(
             .set({'system:time_start': ee.Date(start_date).millis()})
         )
 
-    # Interpolate to a daily time step
-    # The time band is needed for interpolation
-    daily_coll = openet.core.interpolate.daily(
-        target_coll=daily_et_ref_coll,
-        source_coll=scene_coll.select(interp_vars + ['time']),
-        interp_method=interp_method,
-        interp_days=interp_days,
-        use_joins=use_joins,
-        compute_product=False,
-    )
-
-    if estimate_soil_evaporation:
-        daily_coll = daily_ke(daily_coll, model_args, **interp_args)
-
-    # The interpolate.daily() function can/will return the product of
-    # the source and target image named as "{source_band}_1".
-    # The problem with this approach is that it will drop any other bands
-    # that are being interpolated (such as the ndvi).
-    # daily_coll = daily_coll.select(['et_fraction_1'], ['et'])
-
     # Compute ET from ETf and ETr (if necessary)
-    # This isn't needed if compute_product=True in daily() and band is renamed
-    # The check for et_fraction is needed since it is back computed from ET and ETr
-    # if 'et' in variables or 'et_fraction' in variables:
+    # This is only needed when the ET fraction is modified after the
+    #   interpolation (i.e. by the soil water balance)
     def compute_et(img):
         """This function assumes ETf and ETr bands are present in the image"""
         # Apply any resampling to the reference ET image before computing ET
@@ -376,7 +727,51 @@ def from_scene_et_fraction(
 
         return img.addBands(et_img.double().rename('et'))
 
-    daily_coll = daily_coll.map(compute_et)
+    # Reference ET (and the daily count) can be aggregated directly from the
+    #   reference ET collection without interpolating the scene collection
+    et_reference_only = (
+        set(variables).issubset(ET_REFERENCE_ONLY_VARIABLES) and
+        not estimate_soil_evaporation
+    )
+
+    # Compute ET (ETf x ETr) in the interpolation step instead of mapping
+    #   compute_et() over the daily collection
+    # The daily() functions return the product of the source and target images
+    #   as "{source_band}_1" bands, so the ET band is "et_fraction_1"
+    compute_product = not ndvi_only and not estimate_soil_evaporation
+    if compute_product:
+        et_band = 'et_fraction_1'
+    else:
+        et_band = 'et'
+
+    if et_reference_only:
+        daily_coll = daily_et_ref_coll
+    else:
+        # Interpolate to a daily time step
+        # The time band is needed for interpolation
+        if interp_engine.lower() == 'array':
+            daily_coll = daily_array(
+                target_coll=daily_et_ref_coll,
+                source_coll=scene_coll.select(interp_vars + ['time']),
+                interp_method=interp_method,
+                interp_days=interp_days,
+                compute_product=compute_product,
+                resample_method=et_reference_resample,
+            )
+        else:
+            daily_coll = openet.core.interpolate.daily(
+                target_coll=daily_et_ref_coll,
+                source_coll=scene_coll.select(interp_vars + ['time']),
+                interp_method=interp_method,
+                interp_days=interp_days,
+                use_joins=use_joins,
+                compute_product=compute_product,
+                resample_method=et_reference_resample,
+            )
+
+        if estimate_soil_evaporation:
+            daily_coll = daily_ke(daily_coll, model_args, **interp_args)
+            daily_coll = daily_coll.map(compute_et)
 
     # This function is being declared here to avoid passing in all the common parameters
     #   such as: daily_coll, daily_et_ref_coll, interp_properties, variables, etc.
@@ -403,7 +798,10 @@ def from_scene_et_fraction(
         eto_img = None
 
         if ('et' in variables) or ('et_fraction' in variables):
-            et_img = daily_coll.filterDate(agg_start_date, agg_end_date).select(['et']).sum()
+            et_img = (
+                daily_coll.filterDate(agg_start_date, agg_end_date)
+                .select([et_band]).sum().rename(['et'])
+            )
 
         if ('et_reference' in variables) or ('et_fraction' in variables):
             eto_img = (
@@ -420,9 +818,11 @@ def from_scene_et_fraction(
         # Mask pixels that do not have a full aggregation count for the start/end
         # Use "et" band so that count is a function of ET and reference ET
         if ('et' in variables) or ('et_fraction' in variables):
-            aggregation_band = 'et'
+            aggregation_band = et_band
         elif 'ndvi' in variables:
             aggregation_band = 'ndvi'
+        elif et_reference_only:
+            aggregation_band = 'et_reference'
         else:
             raise ValueError('no supported aggregation band')
         aggregation_count_img = (
@@ -513,11 +913,164 @@ def from_scene_et_fraction(
                 agg_end_date=ee.Date(agg_start_date).advance(1, 'month'),
                 date_format='YYYYMM',
             )
-        return ee.ImageCollection(ee.List(list(month_gen(start_dt, end_dt))).map(agg_monthly))
+        monthly_coll = ee.ImageCollection(
+            ee.List(list(month_gen(start_dt, end_dt))).map(agg_monthly)
+        )
+        if rollup_interval:
+            return from_monthly_aggregates(
+                monthly_coll,
+                start_date=start_date,
+                end_date=end_date,
+                variables=output_vars,
+                t_interval=rollup_interval,
+                mask_partial_aggregations=mask_partial_aggregations,
+            )
+        return monthly_coll
     else:
         raise ValueError(f'unsupported t_interval: {t_interval}')
 
 
+def daily_array(
+        target_coll,
+        source_coll,
+        interp_days=32,
+        interp_method='linear',
+        compute_product=False,
+        resample_method='nearest',
+):
+    """Interpolate non-daily source images to a daily target collection using arrays
+
+    This is an alternative to openet.core.interpolate.daily() that stacks the
+    source images into a single array image (once) instead of joining each
+    target image to the neighboring source images.  The output collection is
+    structured the same as the openet.core.interpolate.daily() output.
+
+    Parameters
+    ----------
+    target_coll : ee.ImageCollection
+        Source images will be interpolated to each target image time_start.
+        Target images should have a daily time step.  This will typically be
+        the reference ET (ETo or ETr) collection.
+    source_coll : ee.ImageCollection
+        Images that will be interpolated to the target image collection.
+        The images must have a "time" band with the 0 UTC time in milliseconds.
+    interp_days : int, optional
+        Number of days before and after each image date to include in the
+        interpolation (the default is 32).
+    interp_method : {'linear'}, optional
+        Interpolation method (the default is 'linear').
+    compute_product : bool, optional
+        If True, compute the product of the target and all source image bands.
+        The default is False.
+    resample_method : {'nearest', 'bilinear', 'bicubic'}
+        Resample method to apply to the target image when compute_product=True.
+
+    Returns
+    -------
+    ee.ImageCollection
+
+    Raises
+    ------
+    ValueError
+        If `interp_method` is not a supported method.
+
+    Notes
+    -----
+    Pixels that are masked in a source image are dropped from the array for
+    that pixel, so the previous/next values are the closest unmasked values.
+    The memory needed for the array image scales with the number of source
+    images, not with the number of source/target image pairs.
+
+    """
+    if interp_method.lower() != 'linear':
+        raise ValueError(f'invalid interpolation method: {interp_method}')
+
+    bands = ee.Image(source_coll.first()).bandNames()
+    value_bands = bands.remove('time')
+    time_index = bands.indexOf('time')
+    interp_ms = interp_days * 24 * 60 * 60 * 1000
+
+    # Stack the source images into a 2D array image (image axis, band axis)
+    # Images are sorted so that the last "previous" row and the first
+    #   "next" row are the closest images in time
+    source_array = source_coll.sort('system:time_start').toArray()
+    time_array = source_array.arraySlice(1, time_index, time_index.add(1))
+    row_length = ee.List([1, bands.length()])
+
+    def _linear(image):
+        """Linearly interpolate the source array to the target image time_start"""
+        target_date = ee.Date(image.get('system:time_start'))
+
+        # All filtering will be done based on 0 UTC dates
+        utc0_time = ee.Number(utils.date_0utc(target_date).millis())
+        time_img = ee.Image.constant(utc0_time).double()
+
+        # Source images before (but not on) the target date are "previous"
+        # Source images on or after the target date are "next"
+        prev_array = source_array.arrayMask(
+            time_array.lt(utc0_time).And(time_array.gte(utc0_time.subtract(interp_ms)))
+        )
+        next_array = source_array.arrayMask(
+            time_array.gte(utc0_time).And(time_array.lte(utc0_time.add(interp_ms)))
+        )
+        prev_count = prev_array.arrayLength(0)
+        next_count = next_array.arrayLength(0)
+
+        # Pad the empty arrays so that they can always be flattened
+        prev_img = (
+            prev_array.arraySlice(0, -1).arrayPad(row_length)
+            .arrayProject([1]).arrayFlatten([bands])
+        )
+        next_img = (
+            next_array.arraySlice(0, 0, 1).arrayPad(row_length)
+            .arrayProject([1]).arrayFlatten([bands])
+        )
+
+        # Fill missing values with values from the opposite image
+        # For data gaps, this will cause a flat line instead of a ramp
+        prev_img = prev_img.where(prev_count.eq(0), next_img)
+        next_img = next_img.where(next_count.eq(0), prev_img)
+
+        prev_time_img = prev_img.select(['time'])
+        next_time_img = next_img.select(['time'])
+        prev_value_img = prev_img.select(value_bands)
+        next_value_img = next_img.select(value_bands)
+
+        # Calculate time ratio of the current image between other cloud free images
+        # The denominator is only zero when the previous and next values are
+        #   the same, in which case the ratio does not change the result
+        time_ratio_img = (
+            time_img.subtract(prev_time_img)
+            .divide(next_time_img.subtract(prev_time_img).max(1))
+        )
+
+        # Interpolate values to the current image time
+        interp_img = (
+            next_value_img.subtract(prev_value_img)
+            .multiply(time_ratio_img).add(prev_value_img)
+            .updateMask(prev_count.add(next_count).gt(0))
+        )
+
+        # Pass the target image back out as a new band
+        target_img = image.select([0]).double()
+
+        if compute_product:
+            if resample_method in ['bilinear', 'bicubic']:
+                product_img = interp_img.multiply(target_img.resample(resample_method))
+            else:
+                product_img = interp_img.multiply(target_img)
+            output_img = interp_img.addBands([target_img, product_img])
+        else:
+            output_img = interp_img.addBands([target_img])
+
+        return output_img.set({
+            'system:index': image.get('system:index'),
+            'system:time_start': image.get('system:time_start'),
+        })
+
+    return ee.ImageCollection(target_coll.map(_linear))
+
+
 def daily_ke(
         daily_coll,
         model_args,  # CGM - This parameter isn't used
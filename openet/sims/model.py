@@ -1,3 +1,4 @@
+import functools
 # import pprint
 
 import ee
@@ -5,6 +6,9 @@ import ee
 from . import data
 from . import utils
 
+# Maximum number of Model instances kept by get_model()
+MODEL_CACHE_SIZE = 128
+
 
 # def lazy_property(fn):
 #     """Decorator that makes a property lazy-evaluated
@@ -28,7 +32,7 @@ class Model():
         self,
         # CGM - Switch to ee.Date or time_start instead?
         year,
-        doy,
+        doy=None,
         crop_type_source='USDA/NASS/CDL',
         crop_type_remap='CDL',
         crop_type_kc_flag=False,
@@ -41,9 +45,12 @@ class Model():
 
         Parameters
         ----------
-        year : ee.Number
-        doy : ee.Number
-            Day of year
+        year : ee.Number, int
+        doy : ee.Number, optional
+            Day of year.  The doy is only needed for the crop type specific
+            Kc calculations and can also be passed to kc() directly, so that
+            Model instances can be shared by images from the same year
+            (see get_model()).  The default is None.
         crop_type_source : str, optional
             Crop type source.  The default is the Cropland Data Layer (CDL) assets.
             The source should be an Earth Engine Image ID (or ee.Image).
@@ -108,13 +115,15 @@ class Model():
     # CGM - It would be nice if kc and fc were lazy properties but then fc and
     #   ndvi would need to part of self (inherited from Image?).
     # @lazy_property
-    def kc(self, ndvi):
+    def kc(self, ndvi, doy=None):
         """Crop coefficient (kc) for all crop classes and types
 
         Parameters
         ----------
         ndvi : ee.Image
             Normalized difference vegetation index.
+        doy : ee.Number, optional
+            Day of year.  If not set, the Model doy will be used.
 
         Returns
         -------
@@ -141,6 +150,8 @@ class Model():
             [EQNS 10 (Kd); 7a (Kcb_full) using tree/vine Fr vals from Table 2; 5a (Kcb)]
 
         """
+        if doy is None:
+            doy = self.doy
         fc = self.fc(ndvi)
 
         # Start with the generic NDVI-Kc relationship to initialize Kc
@@ -148,7 +159,7 @@ class Model():
 
         # Apply generic crop class Kc functions
         kc = kc.where(self.crop_class.eq(1), self.kc_row_crop(fc))
-        kc = kc.where(self.crop_class.eq(2), self._kcb(self._kd_vine(fc)).clamp(0, 1.1))
+        kc = kc.where(self.crop_class.eq(2), self._kcb(self._kd_vine(fc), doy).clamp(0, 1.1))
         kc = kc.where(self.crop_class.eq(3), self.kc_tree(fc))
         kc = kc.where(self.crop_class.eq(5), self.kc_rice(fc, ndvi))
         kc = kc.where(self.crop_class.eq(6), self.kc_fallow(fc, ndvi))
@@ -161,15 +172,15 @@ class Model():
             # The h_max image was built with all non-remapped crop_types as nodata
             if not self.crop_type_annual_skip_flag:
                 kc = kc.where(self.crop_class.eq(1).And(self.h_max.gte(0)),
-                              self._kcb(self._kd_row_crop(fc)))
+                              self._kcb(self._kd_row_crop(fc), doy))
 
             kc = kc.where(self.crop_class.eq(3).And(self.h_max.gte(0)),
-                          self._kcb(self._kd_tree(fc)).clamp(0, 1.2))
+                          self._kcb(self._kd_tree(fc), doy).clamp(0, 1.2))
 
             # CGM - Commenting out for now
             # kc = kc.where(
             #     self.crop_class.eq(3).And(self.h_max.gte(0)).And(kc.gte(0.2)),
-            #     self._kcb(self._kd_tree(fc), kc_min=0.5).clamp(0, 1.2))
+            #     self._kcb(self._kd_tree(fc), doy, kc_min=0.5).clamp(0, 1.2))
 
         # CGM - Is it okay to apply this after all the other Kc functions?
         #   Should we only apply this to non-ag crop classes?
@@ -455,13 +466,15 @@ class Model():
         """
         return self.kc_row_crop(fc).where(ndvi.lte(0.35), fc).max(0.01).rename(['kc'])
 
-    def _kcb(self, kd, kc_min=0.15):
+    def _kcb(self, kd, doy=None, kc_min=0.15):
         """Basal crop coefficient (Kcb)
 
         Parameters
         ----------
         kd : ee.Image
             Crop density coefficient
+        doy : ee.Number, optional
+            Day of year.  If not set, the Model doy will be used.
         kc_min : float, optional
 
         Returns
@@ -486,9 +499,14 @@ class Model():
             DOI 10.1007/s00271-009-0182-z [EQNS 5a, 7a]
 
         """
+        if doy is None:
+            doy = self.doy
+        if doy is None:
+            raise ValueError('doy must be set to compute Kcb')
+
         # Reduction factor for adjusting Kcb of tree crops
         fr = (
-            self.ls_start.subtract(self.doy)
+            self.ls_start.subtract(doy)
             .multiply(self.fr_mid.subtract(self.fr_end))
             .divide(self.ls_stop.subtract(self.ls_start))
             .add(self.fr_mid)
@@ -587,6 +605,44 @@ class Model():
         )
 
 
+def get_model(year, **kwargs):
+    """Return a Model instance, sharing instances for the same configuration
+
+    Parameters
+    ----------
+    year : int, ee.Number
+        Instances are only shared if the year is an integer.
+        Earth Engine year values (i.e. from the image date) will always
+        return a new instance.
+    kwargs : dict
+        Keyword arguments to pass through to the Model init (except doy).
+
+    Returns
+    -------
+    Model
+
+    Notes
+    -----
+    The shared instances are not built with a doy, so the doy must be passed
+    to Model.kc().  The shared instances should not be modified.
+
+    """
+    if 'doy' in kwargs.keys():
+        raise ValueError('doy should be passed to Model.kc() instead of get_model()')
+    if not isinstance(year, int):
+        return Model(year=year, **kwargs)
+    try:
+        return _cached_model(year, **kwargs)
+    except TypeError:
+        # Unhashable arguments (i.e. an ee.Image crop_type_source)
+        return Model(year=year, **kwargs)
+
+
+@functools.lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _cached_model(year, **kwargs):
+    return Model(year=year, **kwargs)
+
+
 def crop_data_image(param_name, crop_type, crop_data, default_value=None):
     """Build a constant ee.Image of crop type data for one parameter
 
@@ -0,0 +1,154 @@
+import copy
+import gzip
+import json
+import logging
+import os
+import threading
+
+import ee
+
+from . import cache
+
+MODES = ['record', 'replay']
+
+
+class ReplayMissingError(LookupError):
+    """The request graph was not found in the recording"""
+    pass
+
+
+class Recorder:
+    """Record Earth Engine responses and replay them without a connection
+
+    In "record" mode, ee.Initialize() must be called first.  Each
+    ee.data.computeValue() response (or EEException message) is stored,
+    keyed on the hash of the serialized request graph, along with the
+    algorithm signatures needed to build Earth Engine objects.
+
+    In "replay" mode, the Earth Engine object classes are initialized from
+    the recorded algorithm signatures (ee.Initialize() should not be called)
+    and the recorded responses are returned for matching request graphs.
+
+    Notes
+    -----
+    Responses served from an enabled result cache (see cache.enable()) never
+    reach ee.data.computeValue() and are not recorded.
+
+    """
+
+    def __init__(self, path, mode='replay'):
+        """
+
+        Parameters
+        ----------
+        path : str
+            Recording file path (gzipped JSON).
+        mode : {'record', 'replay'}, optional
+            The default is 'replay'.
+
+        Raises
+        ------
+        ValueError for invalid mode
+
+        """
+        if mode not in MODES:
+            raise ValueError(f'unsupported mode: {mode}, must be one of: {", ".join(MODES)}')
+        self.path = path
+        self.mode = mode
+        self.algorithms = {}
+        self.responses = {}
+        self._lock = threading.Lock()
+        self._compute_value = None
+        self._get_algorithms = None
+
+        if mode == 'replay':
+            self.load()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def load(self):
+        """Read the algorithms and responses from the recording file"""
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            recording = json.load(f)
+        self.algorithms = recording['algorithms']
+        self.responses = recording['responses']
+
+    def save(self):
+        """Write the algorithms and responses to the recording file"""
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock:
+            recording = {'algorithms': self.algorithms, 'responses': self.responses}
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(recording, f, sort_keys=True)
+        logging.debug(f'  Saved {len(self.responses)} responses to {self.path}')
+
+    def start(self):
+        """Patch the ee.data calls"""
+        self._compute_value = ee.data.computeValue
+        self._get_algorithms = ee.data.getAlgorithms
+
+        if self.mode == 'record':
+            # ApiFunction.initialize() modifies the signatures in place
+            self.algorithms = copy.deepcopy(self._get_algorithms())
+            ee.data.computeValue = self._record
+        else:
+            ee.data.getAlgorithms = lambda: copy.deepcopy(self.algorithms)
+            ee.data.computeValue = self._replay
+            initialize_classes()
+
+    def stop(self):
+        """Restore the ee.data calls (and save the recording in record mode)"""
+        if self._compute_value is not None:
+            ee.data.computeValue = self._compute_value
+            ee.data.getAlgorithms = self._get_algorithms
+            self._compute_value = None
+            self._get_algorithms = None
+
+        if self.mode == 'record':
+            self.save()
+
+    def _record(self, obj):
+        key = cache.graph_hash(obj)
+        try:
+            output = self._compute_value(obj)
+        except ee.ee_exception.EEException as e:
+            with self._lock:
+                self.responses[key] = {'error': str(e)}
+            raise
+        with self._lock:
+            self.responses[key] = {'result': output}
+        return output
+
+    def _replay(self, obj):
+        key = cache.graph_hash(obj)
+        try:
+            response = self.responses[key]
+        except KeyError:
+            raise ReplayMissingError(
+                f'request {key[:12]} was not recorded, rerun in "record" mode'
+            ) from None
+        if 'error' in response:
+            raise ee.ee_exception.EEException(response['error'])
+        return copy.deepcopy(response['result'])
+
+
+def initialize_classes():
+    """Initialize the Earth Engine object classes without a server connection
+
+    This is the class setup portion of ee.Initialize() and requires that
+    ee.data.getAlgorithms() has been patched to return the signatures.
+
+    """
+    ee.ApiFunction.reset()
+    ee.ApiFunction.initialize()
+    for dynamic_class in ee._DYNAMIC_CLASSES:
+        dynamic_class.initialize()
+    ee._InitializeGeneratedClasses()
+    # ee.Algorithms is only populated by this call
+    ee._InitializeUnboundMethods()
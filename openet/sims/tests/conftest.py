@@ -5,6 +5,17 @@ import os
 import ee
 import pytest
 
+import openet.sims.cache
+import openet.sims.replay
+
+# Set OPENET_SIMS_EE_REPLAY to "record" or "replay" to record the Earth Engine
+#   responses or to run the tests offline from a previous recording
+EE_REPLAY_MODE = os.environ.get('OPENET_SIMS_EE_REPLAY')
+EE_RECORDING = os.environ.get(
+    'OPENET_SIMS_EE_RECORDING',
+    os.path.join(os.path.dirname(__file__), 'ee_recording.json.gz')
+)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def test_init():
@@ -12,6 +23,17 @@ def test_init():
     logging.getLogger('googleapiclient').setLevel(logging.ERROR)
     logging.debug('Test Setup')
 
+    if EE_REPLAY_MODE == 'replay':
+        # The recording is not committed, it must be recorded first (see CONTRIBUTING.rst)
+        if not os.path.isfile(EE_RECORDING):
+            pytest.skip(
+                f'Earth Engine recording {EE_RECORDING} does not exist, '
+                f'record it with OPENET_SIMS_EE_REPLAY=record'
+            )
+        with openet.sims.replay.Recorder(EE_RECORDING, mode='replay'):
+            yield
+        return
+
     # For GitHub Actions authenticate using private key environment variable
     if 'EE_PRIVATE_KEY_B64' in os.environ:
         print('Writing privatekey.json from environmental variable ...')
@@ -22,3 +44,13 @@ def test_init():
         ee.Initialize(ee.ServiceAccountCredentials('', key_file=EE_KEY_FILE))
     else:
         ee.Initialize()
+
+    # Optionally cache the getinfo results between test runs
+    if os.environ.get('OPENET_SIMS_CACHE'):
+        openet.sims.cache.enable(os.environ['OPENET_SIMS_CACHE'])
+
+    if EE_REPLAY_MODE == 'record':
+        with openet.sims.replay.Recorder(EE_RECORDING, mode='record'):
+            yield
+    else:
+        yield
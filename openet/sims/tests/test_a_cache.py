@@ -0,0 +1,130 @@
+import time
+
+import ee
+import pytest
+
+import openet.sims.cache as cache
+import openet.sims.utils as utils
+
+
+class FakeQuery(ee.encodable.Encodable):
+    """Local serializable stand-in for an Earth Engine object"""
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def encode(self, encoder):
+        return self.value
+
+    def encode_cloud_value(self, encoder):
+        return {'constantValue': self.value}
+
+    def getInfo(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def result_cache():
+    return cache.ResultCache(':memory:')
+
+
+def test_graph_hash_stable():
+    assert cache.graph_hash(FakeQuery(1)) == cache.graph_hash(FakeQuery(1))
+    assert cache.graph_hash(FakeQuery(1)) != cache.graph_hash(FakeQuery(2))
+
+
+def test_graph_hash_params():
+    assert cache.graph_hash(FakeQuery(1), {'scale': 30}) == cache.graph_hash(FakeQuery(1), {'scale': 30})
+    assert cache.graph_hash(FakeQuery(1), {'scale': 30}) != cache.graph_hash(FakeQuery(1), {'scale': 10})
+    assert cache.graph_hash(FakeQuery(1)) != cache.graph_hash(FakeQuery(1), {'scale': 30})
+
+
+def test_ResultCache_get_set(result_cache):
+    assert result_cache.get('foo') is None
+    result_cache.set('foo', {'et': [1, 2]})
+    assert result_cache.get('foo') == {'et': [1, 2]}
+    assert 'foo' in result_cache
+    assert len(result_cache) == 1
+
+
+def test_ResultCache_none_value(result_cache):
+    result_cache.set('foo', None)
+    assert 'foo' in result_cache
+
+
+def test_ResultCache_max_entries():
+    result_cache = cache.ResultCache(':memory:', max_entries=2)
+    result_cache.set('a', 1)
+    result_cache.set('b', 2)
+    # Accessing "a" makes "b" the least recently used
+    time.sleep(0.01)
+    result_cache.get('a')
+    result_cache.set('c', 3)
+    assert len(result_cache) == 2
+    assert 'a' in result_cache
+    assert 'b' not in result_cache
+
+
+def test_ResultCache_max_bytes():
+    result_cache = cache.ResultCache(':memory:', max_bytes=10)
+    result_cache.set('a', 'xxxx')
+    result_cache.set('b', 'yyyy')
+    assert 'a' not in result_cache
+    assert 'b' in result_cache
+
+
+def test_ResultCache_ttl():
+    result_cache = cache.ResultCache(':memory:', ttl=0)
+    result_cache.set('a', 1)
+    assert result_cache.get('a') is None
+    assert len(result_cache) == 0
+
+
+def test_ResultCache_clear(result_cache):
+    result_cache.set('a', 1)
+    result_cache.clear()
+    assert len(result_cache) == 0
+
+
+def test_ResultCache_file(tmp_path):
+    path = str(tmp_path / 'cache' / 'results.sqlite')
+    cache.ResultCache(path).set('a', 1)
+    assert cache.ResultCache(path).get('a') == 1
+
+
+def test_ResultCache_getinfo(result_cache):
+    query = FakeQuery(5)
+    assert result_cache.getinfo(query) == 5
+    assert result_cache.getinfo(query) == 5
+    assert query.calls == 1
+
+
+def test_enable_getinfo():
+    query = FakeQuery(5)
+    cache.enable(':memory:')
+    try:
+        assert utils.getinfo(query) == 5
+        assert utils.getinfo(query) == 5
+    finally:
+        cache.disable()
+    assert query.calls == 1
+    assert cache.get_cache() is None
+
+
+def test_enable_getinfo_bisect():
+    """Test if the getinfo_bisect() requests are cached"""
+    queries = []
+
+    def build_func(items):
+        queries.append(FakeQuery(list(items)))
+        return queries[-1]
+
+    cache.enable(':memory:')
+    try:
+        assert utils.getinfo_bisect(build_func, range(4), sum) == [0, 1, 2, 3]
+        assert utils.getinfo_bisect(build_func, range(4), sum) == [0, 1, 2, 3]
+        assert utils.getinfo_bisect(build_func, range(4), sum, use_cache=False) == [0, 1, 2, 3]
+    finally:
+        cache.disable()
+    assert [query.calls for query in queries] == [1, 0, 1]
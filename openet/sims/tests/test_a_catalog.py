@@ -0,0 +1,156 @@
+import sqlite3
+
+import ee
+import pytest
+
+import openet.sims.catalog as catalog
+
+LC08 = 'LANDSAT/LC08/C02/T1_L2'
+LE07 = 'LANDSAT/LE07/C02/T1_L2'
+# [system:index, time_start, cloud_cover_land, wrs_path, wrs_row, xmin, ymin, xmax, ymax, (footprint)]
+LC08_ROWS = [
+    ['LC08_044033_20170716', 1500230000000, 4.2, 44, 33, -123.3, 37.8, -120.5, 39.9],
+    ['LC08_044033_20170801', 1501612000000, 85.0, 44, 33, -123.3, 37.8, -120.5, 39.9],
+    ['LC08_043033_20170709', 1499624000000, 1.0, 43, 33, -121.8, 37.8, -119.0, 39.9],
+    ['LC08_044034_20170716', 1500230100000, -1.0, 44, 34, -122.8, 36.4, -120.0, 38.5],
+]
+LE07_ROWS = [
+    ['LE07_044033_20170708', 1499540000000, 10.0, 44, 33, -123.2, 37.8, -120.4, 39.9],
+]
+
+
+@pytest.fixture
+def scene_catalog():
+    scene_catalog = catalog.SceneCatalog(':memory:')
+    scene_catalog.add_scenes(LC08, LC08_ROWS)
+    scene_catalog.add_scenes(LE07, LE07_ROWS)
+    return scene_catalog
+
+
+def test_SceneCatalog_add_scenes(scene_catalog):
+    assert len(scene_catalog) == 5
+    # Scenes are replaced, not duplicated
+    scene_catalog.add_scenes(LE07, LE07_ROWS)
+    assert len(scene_catalog) == 5
+
+
+def test_SceneCatalog_file(tmp_path):
+    path = str(tmp_path / 'catalog' / 'catalog.sqlite')
+    catalog.SceneCatalog(path).add_scenes(LE07, LE07_ROWS)
+    assert len(catalog.SceneCatalog(path)) == 1
+
+
+def test_SceneCatalog_footprint(scene_catalog):
+    footprint = {'type': 'Polygon', 'coordinates': [[[-123, 38], [-121, 38], [-121, 40], [-123, 38]]]}
+    scene_catalog.add_scenes(LE07, [LE07_ROWS[0] + [footprint]])
+    scenes = scene_catalog.scenes([LC08, LE07], '2017-07-01', '2017-08-01')
+    assert [scene['footprint'] for scene in scenes if scene['collection'] == LE07] == [footprint]
+    assert all(scene['footprint'] is None for scene in scenes if scene['collection'] == LC08)
+
+
+def test_SceneCatalog_footprint_column(tmp_path):
+    """Test if a footprint column is added to catalogs written without one"""
+    path = str(tmp_path / 'catalog.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE scenes (image_id TEXT PRIMARY KEY, collection TEXT, time_start INTEGER, '
+        'cloud_cover_land REAL, wrs_path INTEGER, wrs_row INTEGER, '
+        'xmin REAL, ymin REAL, xmax REAL, ymax REAL)'
+    )
+    conn.commit()
+    conn.close()
+    scene_catalog = catalog.SceneCatalog(path)
+    scene_catalog.add_scenes(LE07, LE07_ROWS)
+    assert scene_catalog.scenes([LE07], '2017-07-01', '2017-08-01')[0]['footprint'] is None
+
+
+def test_SceneCatalog_image_ids_dates(scene_catalog):
+    output = scene_catalog.image_ids([LC08, LE07], '2017-07-01', '2017-08-01')
+    assert output == sorted(
+        f'{LC08}/{row[0]}' for row in LC08_ROWS if row[0] != 'LC08_044033_20170801'
+    ) + [f'{LE07}/LE07_044033_20170708']
+
+
+def test_SceneCatalog_image_ids_cloud_cover(scene_catalog):
+    output = scene_catalog.image_ids([LC08], '2017-07-01', '2017-09-01', cloud_cover_max=70)
+    assert output == [f'{LC08}/LC08_043033_20170709', f'{LC08}/LC08_044033_20170716']
+
+
+def test_SceneCatalog_image_ids_bbox(scene_catalog):
+    output = scene_catalog.image_ids([LC08], '2017-07-01', '2017-09-01', bbox=[-123, 39, -122.9, 39.1])
+    assert output == [f'{LC08}/LC08_044033_20170716', f'{LC08}/LC08_044033_20170801']
+
+
+def test_SceneCatalog_count(scene_catalog):
+    assert scene_catalog.count([LC08, LE07], '2017-07-01', '2017-09-01') == 5
+    assert scene_catalog.count([LE07], '2017-07-09', '2017-09-01') == 0
+
+
+def test_SceneCatalog_covers(scene_catalog):
+    assert not scene_catalog.covers([LC08], '2017-07-01', '2017-08-01')
+    scene_catalog.add_refresh(LC08, '2017-01-01', '2017-07-15')
+    scene_catalog.add_refresh(LC08, '2017-07-15', '2017-09-01')
+    assert scene_catalog.covers([LC08], '2017-07-01', '2017-08-01')
+    assert not scene_catalog.covers([LC08], '2017-07-01', '2017-10-01')
+    assert not scene_catalog.covers([LC08, LE07], '2017-07-01', '2017-08-01')
+
+
+def test_SceneCatalog_covers_gap(scene_catalog):
+    scene_catalog.add_refresh(LC08, '2017-01-01', '2017-06-01')
+    scene_catalog.add_refresh(LC08, '2017-07-01', '2018-01-01')
+    assert not scene_catalog.covers([LC08], '2017-05-01', '2017-08-01')
+    assert scene_catalog.covers([LC08], '2017-07-01', '2017-08-01')
+
+
+def test_SceneCatalog_covers_bbox(scene_catalog):
+    scene_catalog.add_refresh(LC08, '2017-01-01', '2018-01-01', [-123, 38, -121, 40])
+    assert scene_catalog.covers([LC08], '2017-07-01', '2017-08-01', bbox=[-122, 39, -121.5, 39.5])
+    assert not scene_catalog.covers([LC08], '2017-07-01', '2017-08-01', bbox=[-125, 39, -121.5, 39.5])
+    # Only global refreshes cover an unbounded query
+    assert not scene_catalog.covers([LC08], '2017-07-01', '2017-08-01')
+
+
+def test_SceneCatalog_refresh_start_date(scene_catalog):
+    assert scene_catalog.refresh_start_date(LC08) is None
+    scene_catalog.add_refresh(LC08, '2017-01-01', '2017-09-01')
+    # Incremental refreshes overlap the previous refresh
+    assert scene_catalog.refresh_start_date(LC08) == '2017-07-03'
+
+
+def test_SceneCatalog_refresh_start_date_exception(scene_catalog):
+    with pytest.raises(ValueError):
+        scene_catalog.refresh([LC08], end_date='2017-09-01')
+
+
+def test_SceneCatalog_refresh(scene_catalog):
+    # Refresh makes getInfo calls internally
+    scene_count = scene_catalog.refresh(
+        [LC08], start_date='2017-07-01', end_date='2017-08-01', geometry=[-121.91, 38.99, -121.89, 39.01])
+    assert scene_count > 0
+    assert scene_catalog.covers([LC08], '2017-07-01', '2017-08-01', bbox=[-121.9, 39, -121.9, 39])
+    assert f'{LC08}/LC08_044033_20170716' in scene_catalog.image_ids(
+        [LC08], '2017-07-01', '2017-08-01', bbox=[-121.9, 39, -121.9, 39])
+
+
+def test_SceneCatalog_clear_fractions(scene_catalog, monkeypatch):
+    image_ids = [f'{LC08}/LC08_044033_20170716', f'{LE07}/LE07_044033_20170708']
+    geometry = ee.Geometry.Rectangle(-121.91, 38.99, -121.89, 39.01)
+    # Clear fractions make getInfo calls internally
+    output = scene_catalog.clear_fractions(image_ids, geometry, scale=300)
+    assert set(output.keys()) == set(image_ids)
+    assert all(0 <= x <= 1 for x in output.values())
+
+    # Cached values are returned without a request
+    def getinfo_batch(*args, **kwargs):
+        raise AssertionError('unexpected request')
+    monkeypatch.setattr(catalog.utils, 'getinfo_batch', getinfo_batch)
+    assert scene_catalog.clear_fractions(image_ids, geometry, scale=300) == output
+    assert scene_catalog.cached_clear_fractions(geometry, scale=300) == output
+    assert scene_catalog.cached_clear_fractions(geometry, scale=30) == {}
+
+
+def test_clear_fraction(image_id=f'{LC08}/LC08_044033_20170716', expected=1.0, tol=0.001):
+    output = catalog.clear_fraction(
+        ee.Image(image_id), ee.Geometry.Rectangle(-121.91, 38.99, -121.89, 39.01), scale=300
+    ).getInfo()
+    assert abs(output - expected) <= tol
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+import openet.sims.cli as cli
+
+INI = """
+[INPUTS]
+collections = LANDSAT/LC08/C02/T1_L2, LANDSAT/LE07/C02/T1_L2
+start_date = 2017-01-01
+end_date = 2017-04-01
+geometry = -121.95, 38.55, -121.05, 39.05
+cloud_cover_max = 70
+date_window = month
+
+[INTERPOLATE]
+variables = et, et_reference
+t_interval = monthly
+interp_days = 32
+mask_partial_aggregations = False
+
+[MODEL]
+et_reference_source = IDAHO_EPSCOR/GRIDMET
+et_reference_band = eto
+et_reference_factor = 0.85
+
+[EXPORT]
+mode = dryrun
+"""
+
+
+@pytest.fixture
+def ini_path(tmp_path):
+    ini_path = tmp_path / 'sims.ini'
+    ini_path.write_text(INI)
+    return str(ini_path)
+
+
+@pytest.mark.parametrize(
+    'value, list_flag, expected',
+    [
+        ['32', False, 32],
+        ['0.85', False, 0.85],
+        ['True', False, True],
+        ['None', False, None],
+        ['linear', False, 'linear'],
+        ['2017-01-01', False, '2017-01-01'],
+        ['et, et_reference', True, ['et', 'et_reference']],
+        ['-121.95, 38.55', True, [-121.95, 38.55]],
+    ]
+)
+def test_parse_value(value, list_flag, expected):
+    assert cli.parse_value(value, list_flag) == expected
+
+
+def test_read_ini(ini_path):
+    ini = cli.read_ini(ini_path)
+    assert ini['INPUTS']['collections'] == ['LANDSAT/LC08/C02/T1_L2', 'LANDSAT/LE07/C02/T1_L2']
+    assert ini['INTERPOLATE'] == {
+        'variables': ['et', 'et_reference'], 't_interval': 'monthly', 'interp_days': 32,
+        'mask_partial_aggregations': False,
+    }
+    assert ini['MODEL']['et_reference_factor'] == 0.85
+    assert ini['EXPORT'] == {'mode': 'dryrun'}
+
+
+def test_read_ini_missing_file(tmp_path):
+    with pytest.raises(ValueError):
+        cli.read_ini(str(tmp_path / 'missing.ini'))
+
+
+@pytest.mark.parametrize(
+    'old, new',
+    [
+        ['start_date = 2017-01-01\n', ''],
+        ['date_window = month', 'date_window = week'],
+        ['mode = dryrun', 'mode = drive'],
+        # INTERPOLATE keys must be interpolate() parameters
+        ['interp_days = 32', 'interp_dayz = 32'],
+        ['interp_days = 32', 'start_date = 2017-02-01'],
+        # Asset exports need the asset folder and output grid
+        ['mode = dryrun', 'mode = asset'],
+    ]
+)
+def test_read_ini_exception(tmp_path, old, new):
+    ini_path = tmp_path / 'sims.ini'
+    ini_path.write_text(INI.replace(old, new))
+    with pytest.raises(ValueError):
+        cli.read_ini(str(ini_path))
+
+
+def test_work_units_dates(ini_path):
+    units = cli.work_units(cli.read_ini(ini_path))
+    assert [(unit['start_date'], unit['end_date']) for unit in units] == [
+        ('2017-01-01', '2017-02-01'), ('2017-02-01', '2017-03-01'), ('2017-03-01', '2017-04-01'),
+    ]
+    assert units[0]['id'] == 'all_20170101'
+    assert units[0]['tile']['bbox'] == [-121.95, 38.55, -121.05, 39.05]
+
+
+def test_work_units_tiles(tmp_path):
+    ini_path = tmp_path / 'sims.ini'
+    ini_path.write_text(INI.replace('date_window = month', 'date_window = none') + (
+        'crs = EPSG:4326\ncrs_transform = 0.1, 0, -125, 0, -0.1, 50\ntile_size = 5\n'
+    ))
+    units = cli.work_units(cli.read_ini(str(ini_path)))
+    assert [unit['id'] for unit in units] == [
+        'c0006r0021_20170101', 'c0007r0021_20170101', 'c0006r0022_20170101', 'c0007r0022_20170101',
+    ]
+
+
+def test_work_units_tiles_projected(tmp_path):
+    """Test if the lon/lat bounding box is projected to the EXPORT crs"""
+    ini_path = tmp_path / 'sims.ini'
+    ini_path.write_text(INI.replace('date_window = month', 'date_window = none') + (
+        'crs = EPSG:32610\ncrs_transform = 30, 0, 15, 0, -30, 15\ntile_size = 4096\n'
+    ))
+    units = cli.work_units(cli.read_ini(str(ini_path)))
+    # The bounding box is roughly 80 km x 56 km, so it overlaps 1-3 tiles on each axis
+    assert 1 <= len(units) <= 9
+    assert all(4E5 < unit['tile']['bbox'][0] < 7E5 for unit in units)
+    assert all(4.2E6 < unit['tile']['bbox'][1] < 4.4E6 for unit in units)
+
+
+def test_work_units_geojson(tmp_path):
+    geojson_path = tmp_path / 'aoi.geojson'
+    geojson_path.write_text(json.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [-121.9, 38.6]}},
+        {'type': 'Feature', 'properties': {}, 'geometry': {'type': 'Point', 'coordinates': [-121.1, 39.0]}},
+    ]}))
+    ini_path = tmp_path / 'sims.ini'
+    ini_path.write_text(INI.replace('-121.95, 38.55, -121.05, 39.05', str(geojson_path)))
+    units = cli.work_units(cli.read_ini(str(ini_path)))
+    assert units[0]['tile']['bbox'] == [-121.9, 38.6, -121.1, 39.0]
+
+
+def test_main_list(ini_path, capsys):
+    assert cli.main([ini_path, '--list']) == 0
+    assert len(capsys.readouterr().out.strip().split('\n')) == 3
+
+
+def test_run_dryrun(ini_path):
+    outputs = cli.run(cli.read_ini(ini_path), workers=2)
+    assert sorted(output['id'] for output in outputs) == ['all_20170101', 'all_20170201', 'all_20170301']
+    assert all(output['bytes'] > 0 for output in outputs)
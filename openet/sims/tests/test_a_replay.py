@@ -0,0 +1,81 @@
+import subprocess
+import sys
+
+import ee
+import pytest
+
+import openet.sims.replay as replay
+
+
+class FakeQuery(ee.encodable.Encodable):
+    """Local serializable stand-in for an Earth Engine object"""
+    def __init__(self, value):
+        self.value = value
+
+    def encode(self, encoder):
+        return self.value
+
+    def encode_cloud_value(self, encoder):
+        return {'constantValue': self.value}
+
+    def getInfo(self):
+        return ee.data.computeValue(self)
+
+
+def fake_compute_value(obj):
+    """Stand-in for the Earth Engine server"""
+    if obj.value == 'bad':
+        raise ee.ee_exception.EEException('Invalid argument')
+    return {'value': obj.value}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    monkeypatch.setattr(ee.data, 'computeValue', fake_compute_value)
+    monkeypatch.setattr(ee.data, 'getAlgorithms', lambda: {'Foo.bar': {'args': [], 'returns': 'Object'}})
+    # Don't replace the Earth Engine classes for the rest of the test session
+    monkeypatch.setattr(replay, 'initialize_classes', lambda: None)
+
+
+def test_Recorder_mode_exception(tmp_path):
+    with pytest.raises(ValueError):
+        replay.Recorder(str(tmp_path / 'recording.json.gz'), mode='foo')
+
+
+def test_Recorder_record_replay(tmp_path, fake_server):
+    path = str(tmp_path / 'recording.json.gz')
+    with replay.Recorder(path, mode='record') as recorder:
+        assert FakeQuery(1).getInfo() == {'value': 1}
+        with pytest.raises(ee.ee_exception.EEException):
+            FakeQuery('bad').getInfo()
+    assert len(recorder.responses) == 2
+    assert ee.data.computeValue is fake_compute_value
+
+    with replay.Recorder(path, mode='replay') as recorder:
+        assert recorder.algorithms == {'Foo.bar': {'args': [], 'returns': 'Object'}}
+        assert ee.data.computeValue is not fake_compute_value
+        assert FakeQuery(1).getInfo() == {'value': 1}
+        with pytest.raises(ee.ee_exception.EEException, match='Invalid argument'):
+            FakeQuery('bad').getInfo()
+        with pytest.raises(replay.ReplayMissingError):
+            FakeQuery(2).getInfo()
+    assert ee.data.computeValue is fake_compute_value
+
+
+def test_Recorder_replay_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        replay.Recorder(str(tmp_path / 'recording.json.gz'), mode='replay')
+
+
+def test_initialize_classes_algorithms():
+    """Test if ee.Algorithms is populated from the signatures (in a separate
+    process so the classes are not replaced for the rest of the test session)"""
+    script = (
+        'import ee, ee.apitestcase\n'
+        'import openet.sims.replay as replay\n'
+        'ee.data.getAlgorithms = ee.apitestcase.GetAlgorithms\n'
+        'replay.initialize_classes()\n'
+        'assert callable(ee.Algorithms.If)\n'
+        'ee.Image.constant(1).add(1).serialize()\n'
+    )
+    subprocess.run([sys.executable, '-c', script], check=True)
@@ -1,4 +1,7 @@
+import asyncio
 import datetime
+import threading
+import time
 # import pprint
 
 import ee
@@ -11,6 +14,271 @@ def test_ee_init():
     assert utils.getinfo(ee.Number(1)) == 1
 
 
+class FakeQuery:
+    """Local stand-in for an Earth Engine object with a getInfo() method"""
+    def __init__(self, value, errors=()):
+        self.value = value
+        self.errors = list(errors)
+        self.calls = 0
+
+    def getInfo(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.value
+
+
+@pytest.mark.parametrize(
+    'message, expected',
+    [
+        ['User memory limit exceeded.', utils.EEMemoryError],
+        ['Earth Engine memory capacity exceeded.', utils.EEMemoryError],
+        ['Earth Engine capacity exceeded.', utils.EEMemoryError],
+        ['Too many concurrent aggregations.', utils.EEQuotaError],
+        ['Quota exceeded.', utils.EEQuotaError],
+        ['Computation timed out.', utils.EETimeoutError],
+        ["Image.select: Pattern 'foo' did not match any bands.", utils.EEUserError],
+        ['<HttpError 429 when requesting https://earthengine.googleapis.com>', utils.EEQuotaError],
+        ['HTTP status 429', utils.EEQuotaError],
+        ['Too Many Requests', utils.EEQuotaError],
+        # Numbers that contain 429 are not HTTP statuses
+        ["Image.load: Image asset 'users/x/LC08_044029_20170716' not found.", utils.EEUserError],
+        ['Parameter value 14290 is out of range.', utils.EEUserError],
+    ]
+)
+def test_classify_ee_error(message, expected):
+    output = utils.classify_ee_error(ee.ee_exception.EEException(message))
+    assert type(output) is expected
+    assert str(output) == message
+
+
+def test_classify_ee_error_http_status():
+    """The HTTP status of the response is used if it is set"""
+    class HttpError(Exception):
+        def __init__(self, status):
+            super().__init__('Request failed')
+            self.resp = type('Response', (), {'status': status})()
+    assert type(utils.classify_ee_error(HttpError(429))) is utils.EEQuotaError
+    assert type(utils.classify_ee_error(HttpError(500))) is utils.EEQueryError
+
+
+def test_classify_ee_error_transient():
+    """Non EE exceptions are assumed to be transient"""
+    output = utils.classify_ee_error(ConnectionError('connection reset'))
+    assert type(output) is utils.EEQueryError
+    assert output.retry
+
+
+def test_getinfo_retry_quota():
+    query = FakeQuery(1, errors=[ee.ee_exception.EEException('Too many concurrent aggregations.')])
+    assert utils.getinfo_retry(query, backoff=0) == 1
+    assert query.calls == 2
+
+
+def test_getinfo_retry_falsy_output():
+    """A falsy output should not be resent"""
+    query = FakeQuery(0)
+    assert utils.getinfo_retry(query, backoff=0) == 0
+    assert query.calls == 1
+
+
+def test_getinfo_retry_memory_not_resent():
+    query = FakeQuery(1, errors=[ee.ee_exception.EEException('User memory limit exceeded.')])
+    with pytest.raises(utils.EEMemoryError):
+        utils.getinfo_retry(query, backoff=0)
+    assert query.calls == 1
+
+
+def test_getinfo_retry_attempts_exceeded():
+    query = FakeQuery(1, errors=[ConnectionError('reset')] * 4)
+    with pytest.raises(utils.EEQueryError):
+        utils.getinfo_retry(query, n=3, backoff=0)
+    assert query.calls == 3
+
+
+def test_getinfo_retry_deadline():
+    query = FakeQuery(1, errors=[ee.ee_exception.EEException('Quota exceeded.')])
+    with pytest.raises(utils.EETimeoutError):
+        utils.getinfo_retry(query, backoff=10, deadline=1)
+    assert query.calls == 1
+
+
+def test_getinfo_retry_deadline_hanging_request():
+    """Test if a single slow request is stopped at the deadline"""
+    class SlowQuery:
+        def getInfo(self):
+            time.sleep(2)
+            return 1
+
+    start_time = time.monotonic()
+    with pytest.raises(utils.EETimeoutError):
+        utils.getinfo_retry(SlowQuery(), deadline=0.1)
+    assert time.monotonic() - start_time < 1
+
+
+def test_getinfo_retry_deadline_value():
+    assert utils.getinfo_retry(FakeQuery(1), deadline=10) == 1
+
+
+def test_getinfo_batch_order():
+    queries = [FakeQuery(i) for i in range(20)]
+    assert utils.getinfo_batch(queries, max_workers=4) == list(range(20))
+
+
+def test_getinfo_batch_empty():
+    assert utils.getinfo_batch([]) == []
+
+
+def test_getinfo_batch_raise_errors():
+    queries = [FakeQuery(1), FakeQuery(2, errors=[ee.ee_exception.EEException('bad band')])]
+    with pytest.raises(utils.EEUserError):
+        utils.getinfo_batch(queries, backoff=0)
+
+
+def test_getinfo_batch_return_errors():
+    queries = [FakeQuery(1), FakeQuery(2, errors=[ee.ee_exception.EEException('bad band')])]
+    output = utils.getinfo_batch(queries, backoff=0, raise_errors=False)
+    assert output[0] == 1
+    assert isinstance(output[1], utils.EEUserError)
+
+
+class SlowQuery:
+    """Fake query that records the maximum number of concurrent calls"""
+    lock = threading.Lock()
+    active = 0
+    max_active = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def getInfo(self):
+        with SlowQuery.lock:
+            SlowQuery.active += 1
+            SlowQuery.max_active = max(SlowQuery.max_active, SlowQuery.active)
+        time.sleep(0.01)
+        with SlowQuery.lock:
+            SlowQuery.active -= 1
+        return self.value
+
+
+def test_getinfo_async():
+    assert asyncio.run(utils.getinfo_async(FakeQuery(1))) == 1
+
+
+def test_getinfo_gather_order():
+    output = asyncio.run(utils.getinfo_gather([FakeQuery(i) for i in range(20)]))
+    assert output == list(range(20))
+
+
+def test_getinfo_gather_max_concurrency():
+    SlowQuery.max_active = 0
+    output = asyncio.run(utils.getinfo_gather([SlowQuery(i) for i in range(12)], max_concurrency=3))
+    assert output == list(range(12))
+    assert SlowQuery.max_active <= 3
+
+
+def test_getinfo_gather_raise_errors():
+    queries = [FakeQuery(1), FakeQuery(2, errors=[ee.ee_exception.EEException('bad band')])]
+    with pytest.raises(utils.EEUserError):
+        asyncio.run(utils.getinfo_gather(queries, backoff=0))
+
+
+def test_getinfo_gather_return_errors():
+    queries = [FakeQuery(1), FakeQuery(2, errors=[ee.ee_exception.EEException('bad band')])]
+    output = asyncio.run(utils.getinfo_gather(queries, backoff=0, raise_errors=False))
+    assert output[0] == 1
+    assert isinstance(output[1], utils.EEUserError)
+
+
+def test_gather_async_cancel():
+    """Test that the waiting calls are cancelled when one fails"""
+    started = []
+
+    def call(i):
+        started.append(i)
+        if i == 0:
+            raise ValueError('failed')
+        time.sleep(0.01)
+        return i
+
+    async def main():
+        limiter = asyncio.Semaphore(1)
+        return await utils.gather_async([utils.run_async(call, i, limiter=limiter) for i in range(10)])
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    assert len(started) < 10
+
+
+def memory_limited_query(items, max_items=2):
+    """Fake query that fails with a memory error if too many items are requested"""
+    if len(items) > max_items:
+        return FakeQuery(None, errors=[ee.ee_exception.EEException('User memory limit exceeded.')])
+    return FakeQuery(list(items))
+
+
+def test_getinfo_bisect():
+    output = utils.getinfo_bisect(
+        memory_limited_query, range(7), lambda x: x[0] + x[1], backoff=0
+    )
+    assert output == list(range(7))
+
+
+def test_getinfo_bisect_min_items():
+    with pytest.raises(utils.EEMemoryError):
+        utils.getinfo_bisect(
+            memory_limited_query, range(7), lambda x: x[0] + x[1], min_items=3, backoff=0
+        )
+
+
+def test_getinfo_bisect_user_error_not_split():
+    calls = []
+
+    def build_func(items):
+        calls.append(items)
+        return FakeQuery(None, errors=[ee.ee_exception.EEException('bad band')])
+
+    with pytest.raises(utils.EEUserError):
+        utils.getinfo_bisect(build_func, range(4), lambda x: x[0] + x[1], backoff=0)
+    assert len(calls) == 1
+
+
+def test_getinfo_date_bisect():
+    def build_func(start_date, end_date):
+        days = (datetime.datetime.strptime(end_date, '%Y-%m-%d') -
+                datetime.datetime.strptime(start_date, '%Y-%m-%d')).days
+        if days > 10:
+            return FakeQuery(None, errors=[ee.ee_exception.EEException('Earth Engine capacity exceeded.')])
+        return FakeQuery([[start_date, end_date]])
+
+    output = utils.getinfo_date_bisect(
+        build_func, '2020-01-01', '2020-02-01', lambda x: x[0] + x[1], backoff=0
+    )
+    assert output[0][0] == '2020-01-01'
+    assert output[-1][1] == '2020-02-01'
+    assert all(a[1] == b[0] for a, b in zip(output[:-1], output[1:]))
+
+
+def test_getinfo_date_bisect_exception():
+    with pytest.raises(ValueError):
+        utils.getinfo_date_bisect(FakeQuery, '2020-01-01', '2020-01-01', list)
+
+
+def test_merge_region_lists():
+    output = utils.merge_region_lists([
+        [['id', 'time'], ['a', 1]], [['id', 'time']], [['id', 'time'], ['b', 2]]
+    ])
+    assert output == [['id', 'time'], ['a', 1], ['b', 2]]
+
+
+def test_merge_feature_collections():
+    output = utils.merge_feature_collections([
+        {'type': 'FeatureCollection', 'features': [{'id': 'a'}]},
+        {'type': 'FeatureCollection', 'features': [{'id': 'b'}]},
+    ])
+    assert output == {'type': 'FeatureCollection', 'features': [{'id': 'a'}, {'id': 'b'}]}
+
+
 def test_constant_image_value(expected=10.123456789, tol=0.000001):
     output = utils.constant_image_value(ee.Image.constant(expected))
     assert abs(output['constant'] - expected) <= tol
@@ -74,6 +342,19 @@ def test_point_coll_value(image_id, image_date, xy, scale, expected, tol):
     assert abs(output['output'][image_date] - expected) <= tol
 
 
+def test_point_coll_value_date_range(expected=2364.169, tol=0.001):
+    """Test that setting the date range returns the same values"""
+    input_img = (
+        ee.Image('USGS/3DEP/10m').select(['elevation'], ['output'])
+        .set({'system:time_start': ee.Date('2012-04-04').millis()})
+    )
+    output = utils.point_coll_value(
+        ee.ImageCollection([input_img]), [-106.03249, 37.17777], 30,
+        start_date='2012-04-01', end_date='2012-05-01',
+    )
+    assert abs(output['output']['2012-04-04'] - expected) <= tol
+
+
 @pytest.mark.parametrize(
     'input, expected',
     [
@@ -111,3 +392,88 @@ def test_valid_date():
     assert utils.valid_date('20150713') is False
     assert utils.valid_date('07/13/2015') is False
     assert utils.valid_date('07-13-2015', '%m-%d-%Y') is True
+
+
+@pytest.mark.parametrize(
+    'geometry, expected',
+    [
+        [[-121, 38, -120, 39], [-121, 38, -120, 39]],
+        [{'type': 'Point', 'coordinates': [-121.5, 38.5]}, [-121.5, 38.5, -121.5, 38.5]],
+        [{'type': 'Polygon', 'coordinates': [[[-121, 38], [-120, 38], [-120, 39], [-121, 38]]]},
+         [-121, 38, -120, 39]],
+        [{'type': 'GeometryCollection', 'geometries': [
+            {'type': 'Point', 'coordinates': [-122, 37]},
+            {'type': 'Point', 'coordinates': [-120, 39]}]},
+         [-122, 37, -120, 39]],
+    ]
+)
+def test_geometry_bbox(geometry, expected):
+    assert utils.geometry_bbox(geometry) == expected
+
+
+def test_geometry_bbox_ee_geometry():
+    assert utils.geometry_bbox(ee.Geometry.Rectangle(-121, 38, -120, 39)) == [-121, 38, -120, 39]
+
+
+def test_geometry_bbox_exception():
+    with pytest.raises(ValueError):
+        utils.geometry_bbox({'type': 'GeometryCollection', 'geometries': []})
+
+
+@pytest.mark.parametrize(
+    'geometry, tolerance, expected',
+    [
+        [[0, 0, 1, 1], None, [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]],
+        # Concave vertices are removed
+        [{'type': 'Polygon', 'coordinates': [[[0, 0], [2, 0], [1, 1], [2, 2], [0, 2], [0.5, 1], [0, 0]]]},
+         None, [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]],
+        # Vertices are snapped outward to the tolerance grid
+        [{'type': 'Polygon', 'coordinates': [[[0.1, 0.1], [1.9, 0.2], [1.2, 1.3], [0.1, 0.1]]]},
+         1, [[0, 0], [2, 0], [2, 2], [1, 2], [0, 1], [0, 0]]],
+        [{'type': 'Point', 'coordinates': [0.5, 0.5]}, 1, [[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]],
+    ]
+)
+def test_geometry_hull(geometry, tolerance, expected):
+    assert utils.geometry_hull(geometry, tolerance=tolerance) == expected
+
+
+def test_geometry_hull_ee_geometry():
+    output = utils.geometry_hull(ee.Geometry.Polygon([[[0, 0], [2, 0], [1, 1], [2, 2], [0, 2]]]))
+    assert output == [[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]
+
+
+SQUARE = {'type': 'Polygon', 'coordinates': [[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]]}
+DIAMOND = {'type': 'Polygon', 'coordinates': [[[1, 0], [2, 1], [1, 2], [0, 1], [1, 0]]]}
+
+
+@pytest.mark.parametrize(
+    'geometry, expected',
+    [
+        [{'type': 'Point', 'coordinates': [1, 1]}, True],
+        [{'type': 'Point', 'coordinates': [0.1, 0.1]}, False],
+        [{'type': 'Point', 'coordinates': [1.5, 0.5]}, True],
+        [{'type': 'MultiPoint', 'coordinates': [[0.1, 0.1], [1, 1]]}, True],
+        [{'type': 'LineString', 'coordinates': [[0, 0], [0.4, 0.4]]}, False],
+        [{'type': 'LineString', 'coordinates': [[0, 0], [2, 2]]}, True],
+        # Polygon inside, containing, and in the corner of the diamond
+        [{'type': 'Polygon', 'coordinates': [[[0.9, 0.9], [1.1, 0.9], [1.1, 1.1], [0.9, 0.9]]]}, True],
+        [SQUARE, True],
+        [{'type': 'Polygon', 'coordinates': [[[0, 0], [0.4, 0], [0.4, 0.4], [0, 0.4], [0, 0]]]}, False],
+        # Touching the diamond vertex
+        [{'type': 'Polygon', 'coordinates': [[[2, 0], [3, 0], [3, 1], [2, 1], [2, 0]]]}, True],
+        # Diamond inside the polygon hole
+        [{'type': 'Polygon', 'coordinates': [
+            [[-1, -1], [3, -1], [3, 3], [-1, 3], [-1, -1]],
+            [[-0.5, -0.5], [2.5, -0.5], [2.5, 2.5], [-0.5, 2.5], [-0.5, -0.5]]]}, False],
+        [{'type': 'GeometryCollection', 'geometries': [
+            {'type': 'Point', 'coordinates': [0.1, 0.1]}, {'type': 'Point', 'coordinates': [1, 1]}]}, True],
+    ]
+)
+def test_geometry_intersects(geometry, expected):
+    assert utils.geometry_intersects(DIAMOND, geometry) == expected
+    assert utils.geometry_intersects(geometry, DIAMOND) == expected
+
+
+def test_geometry_intersects_exception():
+    with pytest.raises(ValueError):
+        utils.geometry_intersects(DIAMOND, {'type': 'Curve', 'coordinates': []})
@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+
+import pytest
+
+import openet.sims.export as export
+import openet.sims.workqueue as workqueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return workqueue.WorkQueue(str(tmp_path / 'queue'), lease_seconds=60, max_attempts=2)
+
+
+def test_WorkQueue_put(queue):
+    assert queue.put('job1', {'a': 1})
+    # Jobs are only added once
+    assert not queue.put('job1', {'a': 1})
+    assert queue.counts() == {'pending': 1, 'leased': 0, 'done': 0, 'failed': 0}
+
+
+@pytest.mark.parametrize('job_id', ['job@1', f'job{os.sep}1'])
+def test_WorkQueue_put_exception(queue, job_id):
+    with pytest.raises(ValueError):
+        queue.put(job_id, {})
+
+
+def test_WorkQueue_claim_complete(queue):
+    queue.put('job1', {'a': 1})
+    lease = queue.claim('worker1')
+    assert lease.job_id == 'job1'
+    assert lease.payload == {'a': 1}
+    assert queue.claim('worker2') is None
+    assert not queue.put('job1', {'a': 1})
+
+    queue.complete(lease, result={'b': 2})
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 0}
+    assert not queue.put('job1', {'a': 1})
+
+
+def test_WorkQueue_claim_concurrent(queue):
+    for i in range(20):
+        queue.put(f'job{i:02d}', {})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leases = list(executor.map(lambda i: queue.claim(f'worker{i}'), range(30)))
+    claimed = [lease.job_id for lease in leases if lease is not None]
+    assert sorted(claimed) == [f'job{i:02d}' for i in range(20)]
+
+
+def test_WorkQueue_fail(queue):
+    queue.put('job1', {})
+    queue.fail(queue.claim('worker1'), error='error')
+    assert queue.counts()['pending'] == 1
+    queue.fail(queue.claim('worker1'), error='error')
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1}
+
+
+def test_WorkQueue_requeue_expired(queue):
+    queue.put('job1', {})
+    lease = queue.claim('worker1')
+    assert queue.requeue_expired() == []
+    assert queue.requeue_expired(now=time.time() + 120) == ['job1']
+    assert queue.counts()['pending'] == 1
+
+    # The original worker can no longer renew or complete the job
+    with pytest.raises(workqueue.LeaseLostError):
+        queue.renew(lease)
+    with pytest.raises(workqueue.LeaseLostError):
+        queue.complete(lease)
+
+
+def test_WorkQueue_renew(queue):
+    queue.put('job1', {})
+    lease = queue.claim('worker1')
+    expires = lease.expires
+    time.sleep(1.1)
+    queue.renew(lease)
+    assert lease.expires > expires
+    queue.complete(lease)
+    assert queue.counts()['done'] == 1
+
+
+def test_Worker_run(queue):
+    for i in range(4):
+        queue.put(f'job{i}', {'value': i, 'units': 2})
+    queue.put('bad', {'value': None})
+
+    def run_func(payload):
+        return payload['value'] * 2
+
+    assert workqueue.Worker(queue, run_func, worker_id='worker1').run() == 6
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 4, 'failed': 1}
+    throughput = queue.throughput()
+    assert throughput['worker1']['jobs'] == 4
+    assert throughput['worker1']['units'] == 8
+
+
+def test_Worker_run_max_jobs(queue):
+    for i in range(4):
+        queue.put(f'job{i}', {})
+    assert workqueue.Worker(queue, lambda payload: None).run(max_jobs=3) == 3
+    assert queue.counts()['pending'] == 1
+
+
+def test_tile_jobs():
+    tiles = export.tile_grid([-121.95, 38.55, -121.55, 38.95], [0.1, 0, -125, 0, -0.1, 50], tile_size=5)
+    jobs = workqueue.tile_jobs(
+        tiles, [('2017-01-01', '2017-07-01'), ('2017-07-01', '2018-01-01')],
+        coll_args={'collections': ['LANDSAT/LC08/C02/T1_L2']}, interp_args={},
+    )
+    assert sorted(jobs.keys()) == ['sims_c0006r0022_20170101', 'sims_c0006r0022_20170701']
+    assert jobs['sims_c0006r0022_20170701']['coll_args']['start_date'] == '2017-07-01'
+
+
+def test_export_tile_job(queue, monkeypatch):
+    monkeypatch.setattr(export, 'interpolate_build_func', lambda coll_args, interp_args: lambda tile: None)
+    task_api = export.LocalTaskAPI(polls=2, fail=['job2'])
+    run_func = workqueue.export_tile_job(task_api, poll_seconds=0)
+    for job_id in ['job1', 'job2']:
+        queue.put(job_id, {'tile': {}, 'description': job_id, 'coll_args': {}, 'interp_args': {}})
+    workqueue.Worker(queue, run_func).run()
+    assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 1, 'failed': 1}
+
+
+@pytest.mark.parametrize('state', ['UNKNOWN', 'RUNNING'])
+def test_export_tile_job_not_active(state, monkeypatch):
+    """Test if unknown states and tasks that don't finish are failed"""
+    monkeypatch.setattr(export, 'interpolate_build_func', lambda coll_args, interp_args: lambda tile: None)
+    task_api = export.LocalTaskAPI()
+    monkeypatch.setattr(task_api, 'status', lambda task_id: state)
+    run_func = workqueue.export_tile_job(task_api, poll_seconds=0, max_wait=0.01)
+    with pytest.raises(RuntimeError, match=state):
+        run_func({'tile': {}, 'description': 'job1', 'coll_args': {}, 'interp_args': {}})
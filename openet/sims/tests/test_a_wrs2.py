@@ -0,0 +1,98 @@
+import json
+
+import ee
+import pytest
+
+import openet.sims.catalog as catalog
+import openet.sims.wrs2 as wrs2
+
+FOOTPRINTS = {
+    (44, 33): [-123.3, 37.8, -120.5, 39.9],
+    (43, 33): [-121.8, 37.8, -119.0, 39.9],
+    (44, 34): [-122.8, 36.4, -120.0, 38.5],
+    # Antimeridian footprints are not indexed
+    (88, 17): [-179.9, 62.0, 179.9, 64.1],
+}
+
+
+@pytest.fixture
+def wrs2_index():
+    return wrs2.WRS2Index(FOOTPRINTS)
+
+
+def test_WRS2Index_init(wrs2_index):
+    assert len(wrs2_index) == 3
+
+
+def test_WRS2Index_cell_size_exception():
+    with pytest.raises(ValueError):
+        wrs2.WRS2Index(FOOTPRINTS, cell_size=0)
+
+
+@pytest.mark.parametrize(
+    'geometry, expected',
+    [
+        [[-122.9, 39.5, -122.8, 39.6], [(44, 33)]],
+        [{'type': 'Point', 'coordinates': [-121.5, 38.3]}, [(43, 33), (44, 33), (44, 34)]],
+        [{'type': 'Point', 'coordinates': [-121.5, 39.5]}, [(43, 33), (44, 33)]],
+        [[-100, 30, -99, 31], []],
+    ]
+)
+def test_WRS2Index_query(wrs2_index, geometry, expected):
+    assert wrs2_index.query(geometry) == expected
+
+
+@pytest.mark.parametrize('cell_size', [0.1, 1, 10])
+def test_WRS2Index_query_cell_size(cell_size):
+    wrs2_index = wrs2.WRS2Index(FOOTPRINTS, cell_size=cell_size)
+    assert wrs2_index.query([-121.5, 38.3, -121.5, 38.3]) == [(43, 33), (44, 33), (44, 34)]
+
+
+@pytest.mark.parametrize(
+    'geometry, expected',
+    [
+        [[-122.9, 39.5, -122.8, 39.6], True],
+        [[-123.2, 36.5, -119.1, 39.8], False],
+        [[-125, 38, -122, 39], False],
+        [[-100, 30, -99, 31], False],
+    ]
+)
+def test_WRS2Index_covers(wrs2_index, geometry, expected):
+    assert wrs2_index.covers(geometry) == expected
+
+
+def test_WRS2Index_filter_empty(wrs2_index, caplog):
+    assert wrs2_index.filter([-100, 30, -99, 31]) is None
+    assert 'outside the WRS2 index' in caplog.text
+
+
+def test_WRS2Index_filter(wrs2_index, caplog):
+    assert isinstance(wrs2_index.filter([-122.9, 39.5, -122.8, 39.6]), ee.Filter)
+    assert caplog.text == ''
+
+
+def test_WRS2Index_filter_partial_coverage(wrs2_index, caplog):
+    assert isinstance(wrs2_index.filter([-125, 38, -122, 39]), ee.Filter)
+    assert 'only cover part of the geometry' in caplog.text
+
+
+def test_WRS2Index_from_catalog():
+    scene_catalog = catalog.SceneCatalog(':memory:')
+    scene_catalog.add_scenes('LANDSAT/LC08/C02/T1_L2', [
+        ['LC08_044033_20170716', 1500230000000, 4.2, 44, 33, -123.3, 37.8, -120.5, 39.9],
+        ['LC08_044033_20170801', 1501612000000, 8.0, 44, 33, -123.4, 37.7, -120.6, 39.8],
+    ])
+    wrs2_index = wrs2.WRS2Index.from_catalog(scene_catalog)
+    assert wrs2_index.footprints == {(44, 33): [-123.4, 37.7, -120.5, 39.9]}
+
+
+def test_WRS2Index_from_geojson(tmp_path):
+    geojson_path = tmp_path / 'wrs2.geojson'
+    with open(geojson_path, 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'PATH': 44, 'ROW': 33}, 'geometry': {
+                'type': 'Polygon',
+                'coordinates': [[[-123.3, 37.8], [-120.5, 37.8], [-120.5, 39.9], [-123.3, 37.8]]]}},
+        ]}, f)
+    wrs2_index = wrs2.WRS2Index.from_geojson(str(geojson_path))
+    assert wrs2_index.footprints == {(44, 33): [-123.3, 37.8, -120.5, 39.9]}
@@ -442,6 +442,43 @@ def test_Model_kcb_constant_value(kd, doy, h_max, expected, tol=0.0001):
     assert abs(output['kcb'] - expected) <= tol
 
 
+def test_Model_kc_doy_parameter(tol=0.0001):
+    """Check that passing the doy to kc() matches setting the Model doy"""
+    m = default_model_obj(crop_type_source=69, doy=DOY, crop_type_kc_flag=True)
+    expected = utils.constant_image_value(m.kc(ndvi=ee.Image.constant(0.5)))
+    m = default_model_obj(crop_type_source=69, doy=None, crop_type_kc_flag=True)
+    output = utils.constant_image_value(m.kc(ndvi=ee.Image.constant(0.5), doy=ee.Number(DOY)))
+    assert abs(output['kc'] - expected['kc']) <= tol
+
+
+def test_Model_kcb_doy_exception():
+    m = default_model_obj(crop_type_source=69, doy=None)
+    with pytest.raises(ValueError):
+        m._kcb(kd=ee.Image.constant(0.5))
+
+
+def test_get_model_shared():
+    args = default_model_args()
+    del args['doy']
+    assert model.get_model(**args) is model.get_model(**args)
+    assert model.get_model(**args).doy is None
+
+
+def test_get_model_not_shared():
+    args = default_model_args()
+    del args['doy']
+    assert model.get_model(**args) is not model.get_model(**{**args, 'water_kc_flag': False})
+    assert model.get_model(**args) is not model.get_model(**{**args, 'year': YEAR + 1})
+    # Earth Engine year values are never shared
+    args['year'] = ee.Number(YEAR)
+    assert model.get_model(**args) is not model.get_model(**args)
+
+
+def test_get_model_doy_exception():
+    with pytest.raises(ValueError):
+        model.get_model(**default_model_args())
+
+
 @pytest.mark.parametrize('crop_type', [0, 1, 69, 66, 3, 61])
 def test_Model_kc_crop_class_constant_value(crop_type):
     # Check that a number is returned for all crop classes
@@ -387,6 +387,13 @@ def test_Image_from_landsat_c2_sr_image():
     assert output['properties']['system:index'] == image_id.split('/')[-1]
 
 
+def test_Image_from_landsat_c2_sr_cloudmask_args_not_modified():
+    """Test that the cloudmask_args dictionary is not modified"""
+    cloudmask_args = {'cirrus_flag': False}
+    sims.Image.from_landsat_c2_sr(input_image(), cloudmask_args=cloudmask_args)
+    assert cloudmask_args == {'cirrus_flag': False}
+
+
 def test_Image_from_landsat_c2_sr_kc():
     """Test if ET fraction can be built from a Landsat images"""
     image_id = 'LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716'
@@ -464,6 +471,24 @@ def test_Image_from_image_id(image_id):
     assert output['properties']['image_id'] == image_id
 
 
+def test_Image_from_image_id_shared_model():
+    """Test that images from the same year share the Model"""
+    image_a = sims.Image.from_image_id('LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716')
+    image_b = sims.Image.from_image_id('LANDSAT/LC08/C02/T1_L2/LC08_044033_20170801')
+    image_c = sims.Image.from_image_id('LANDSAT/LC08/C02/T1_L2/LC08_044033_20180719')
+    assert image_a._year == 2017
+    assert image_a.model is image_b.model
+    assert image_a.model is not image_c.model
+
+
+def test_Image_year_kc_values(tol=0.0001):
+    """Test that setting the year doesn't change the Kc values"""
+    expected = utils.constant_image_value(default_image_obj(crop_type_kc_flag=True).kc)
+    image_obj = sims.Image(**default_image_args(crop_type_kc_flag=True), year=SCENE_DT.year)
+    output = utils.constant_image_value(image_obj.kc)
+    assert abs(output['kc'] - expected['kc']) <= tol
+
+
 def test_Image_from_method_kwargs():
     """Test that the init parameters can be passed through the helper methods"""
     assert sims.Image.from_landsat_c2_sr(
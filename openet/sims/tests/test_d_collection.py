@@ -1,4 +1,7 @@
 # import pprint
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import datetime
 import re
 
 import ee
@@ -348,6 +351,20 @@ def test_Collection_interpolate_use_joins(use_joins):
     assert parse_scene_id(output) == ['20170701']
 
 
+@pytest.mark.parametrize('interp_engine', ['core', 'array'])
+def test_Collection_interpolate_interp_engine(interp_engine):
+    """Only checking if the parameter is accepted and runs for now"""
+    output = utils.getinfo(default_coll_obj().interpolate(interp_engine=interp_engine))
+    assert output['type'] == 'ImageCollection'
+    assert parse_scene_id(output) == ['20170701']
+    assert {y['id'] for x in output['features'] for y in x['bands']} == VARIABLES
+
+
+def test_Collection_interpolate_interp_engine_exception():
+    with pytest.raises(ValueError):
+        default_coll_obj().interpolate(interp_engine='deadbeef')
+
+
 def test_Collection_interpolate_variables_custom_et():
     output = utils.getinfo(default_coll_obj().interpolate(variables=['et']))
     assert {y['id'] for x in output['features'] for y in x['bands']} == {'et'}
@@ -358,6 +375,44 @@ def test_Collection_interpolate_variables_custom_ndvi():
     assert {y['id'] for x in output['features'] for y in x['bands']} == {'ndvi'}
 
 
+@pytest.mark.parametrize(
+    'variables, expected',
+    [
+        [['ndvi', 'count'], {'ndvi', 'count'}],
+        [['ndvi', 'scene_count'], {'ndvi', 'count'}],
+        [['ndvi', 'daily_count'], {'ndvi', 'daily_count'}],
+    ]
+)
+def test_Collection_interpolate_variables_ndvi_no_et_reference(variables, expected):
+    """NDVI should be interpolated without the reference ET parameters"""
+    coll = default_coll_obj(
+        et_reference_source=None, et_reference_band=None,
+        et_reference_factor=None, et_reference_resample=None, model_args={},
+    )
+    output = utils.getinfo(coll.interpolate(variables=variables, t_interval='monthly'))
+    assert parse_scene_id(output) == ['201707']
+    assert {y['id'] for x in output['features'] for y in x['bands']} == expected
+
+
+def test_Collection_interpolate_variables_custom_et_reference():
+    output = utils.getinfo(default_coll_obj().interpolate(variables=['et_reference']))
+    assert {y['id'] for x in output['features'] for y in x['bands']} == {'et_reference'}
+
+
+def test_Collection_interpolate_et_reference_only_skips_scenes():
+    """Reference ET only requests should not need any Landsat scenes"""
+    variables = {'et_reference', 'daily_count'}
+    coll = default_coll_obj(
+        collections=['LANDSAT/LC08/C02/T1_L2'],
+        geometry=ee.Geometry.Point(-123.623, 44.745),
+        start_date='2017-04-01', end_date='2017-05-01',
+        variables=list(variables), cloud_cover_max=0,
+    )
+    output = utils.getinfo(coll.interpolate(t_interval='monthly'))
+    assert parse_scene_id(output) == ['201704']
+    assert {y['id'] for x in output['features'] for y in x['bands']} == variables
+
+
 # DEADBEEF
 # def test_Collection_interpolate_variables_custom_daily_count():
 #     output = utils.getinfo(default_coll_obj().interpolate(variables=['daily_count']))
@@ -385,6 +440,22 @@ def test_Collection_interpolate_t_interval_monthly():
     assert {y['id'] for x in output['features'] for y in x['bands']} == VARIABLES
 
 
+@pytest.mark.parametrize(
+    't_interval, expected',
+    [
+        ['annual', ['2017']],
+        ['water_year', ['2017']],
+    ]
+)
+def test_Collection_interpolate_t_interval_annual(t_interval, expected):
+    """Test if the annual and water year time interval parameters work"""
+    output = utils.getinfo(default_coll_obj().interpolate(t_interval=t_interval))
+    assert output['type'] == 'ImageCollection'
+    assert parse_scene_id(output) == expected
+    assert {y['id'] for x in output['features'] for y in x['bands']} == VARIABLES
+    assert output['features'][0]['properties']['interp_days'] == 32
+
+
 def test_Collection_interpolate_t_interval_custom():
     """Test if the custom time interval parameter works"""
     output = utils.getinfo(default_coll_obj().interpolate(t_interval='custom'))
@@ -393,6 +464,134 @@ def test_Collection_interpolate_t_interval_custom():
     assert {y['id'] for x in output['features'] for y in x['bands']} == VARIABLES
 
 
+def test_Collection_interpolate_start_end_date_override():
+    """Test if the interpolate date overrides only build the override periods"""
+    output = utils.getinfo(
+        default_coll_obj(start_date='2017-06-01', end_date='2017-09-01')
+        .interpolate(t_interval='monthly', start_date='2017-07-01', end_date='2017-08-01')
+    )
+    assert parse_scene_id(output) == ['201707']
+
+
+def test_Collection_interpolate_incremental(tol=0.0001):
+    """Test if the incremental outputs match the full outputs for the affected periods"""
+    coll_obj = default_coll_obj(start_date='2017-01-01', end_date='2018-01-01')
+    scene_ids = ['LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716']
+    incremental = utils.point_coll_value(
+        coll_obj.interpolate_incremental(scene_ids, t_interval='monthly'), TEST_POINT, scale=30
+    )
+    full = utils.point_coll_value(coll_obj.interpolate(t_interval='monthly'), TEST_POINT, scale=30)
+    assert sorted(incremental['et'].keys()) == ['2017-06-01', '2017-07-01', '2017-08-01']
+    for date, value in incremental['et'].items():
+        assert abs(value - full['et'][date]) <= tol
+
+
+def test_Collection_interpolate_incremental_previous_coll():
+    """Test if the affected periods are replaced in the previous collection"""
+    coll_obj = default_coll_obj(start_date='2017-01-01', end_date='2018-01-01')
+    previous_coll = coll_obj.interpolate(t_interval='monthly')
+    output = utils.getinfo(coll_obj.interpolate_incremental(
+        ['LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716'], previous_coll=previous_coll,
+        t_interval='monthly',
+    ))
+    assert len(output['features']) == 12
+
+
+def test_Collection_interpolate_incremental_previous_coll_time_offset():
+    """Test if previous images with non-0 UTC times are replaced (not duplicated)"""
+    coll_obj = default_coll_obj(start_date='2017-01-01', end_date='2018-01-01')
+    previous_coll = ee.ImageCollection([
+        ee.Image.constant(0).rename(['et']).set({
+            'system:index': f'2017{month:02d}',
+            'system:time_start': ee.Date.fromYMD(2017, month, 1).advance(6, 'hour').millis(),
+            'previous': 1,
+        })
+        for month in range(1, 13)
+    ])
+    output = utils.getinfo(coll_obj.interpolate_incremental(
+        ['LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716'], previous_coll=previous_coll,
+        t_interval='monthly', variables=['et'],
+    ))
+    assert len(output['features']) == 12
+    replaced = [
+        x['properties']['system:index'][-6:] for x in output['features']
+        if 'previous' not in x['properties']
+    ]
+    assert replaced == ['201706', '201707', '201708']
+
+
+def test_Collection_interpolate_incremental_no_scenes():
+    """Test if no periods are rebuilt for scenes outside the date range"""
+    output = utils.getinfo(default_coll_obj().interpolate_incremental(
+        ['LANDSAT/LC08/C02/T1_L2/LC08_044033_20150716'], t_interval='monthly'
+    ))
+    assert output['features'] == []
+
+
+@pytest.mark.parametrize(
+    'window, expected',
+    [
+        ['year', [('2017-01-01', '2018-01-01'), ('2018-01-01', '2018-03-01')]],
+        ['quarter', [('2017-10-01', '2018-01-01'), ('2018-01-01', '2018-03-01')]],
+    ]
+)
+def test_Collection_interpolate_windows_dates(window, expected):
+    """Test if the windows are aligned to the t_interval periods"""
+    start_date = '2017-01-01' if window == 'year' else '2017-10-15'
+    windows = default_coll_obj(start_date=start_date, end_date='2018-03-01')\
+        .interpolate_windows(window=window, t_interval='monthly')
+    assert [(x[0], x[1]) for x in windows] == expected
+    assert all(isinstance(x[2], ee.ImageCollection) for x in windows)
+
+
+def test_Collection_interpolate_windowed_info(tol=0.0001):
+    """Test if the windowed values match the full interpolate values"""
+    coll_obj = default_coll_obj(start_date='2017-05-01', end_date='2017-09-01')
+    output = coll_obj.interpolate_windowed_info(window='month', t_interval='monthly', max_workers=2)
+    assert parse_scene_id(output) == ['201705', '201706', '201707', '201708']
+    windowed = utils.point_coll_value(
+        ee.ImageCollection([
+            x[2].first() for x in coll_obj.interpolate_windows(window='month', t_interval='monthly')
+        ]),
+        TEST_POINT, scale=30,
+    )
+    full = utils.point_coll_value(coll_obj.interpolate(t_interval='monthly'), TEST_POINT, scale=30)
+    for date, value in full['et'].items():
+        assert abs(windowed['et'][date] - value) <= tol
+
+
+def test_Collection_interpolate_windowed_info_memory_error(monkeypatch):
+    """Test if windows that exceed memory are split on the periods and merged"""
+    class FakeColl:
+        def __init__(self, start_date, end_date):
+            self.start_date, self.end_date = start_date, end_date
+
+        def getInfo(self):
+            # Only single month requests fit in memory
+            days = (datetime.datetime.strptime(self.end_date, '%Y-%m-%d') -
+                    datetime.datetime.strptime(self.start_date, '%Y-%m-%d')).days
+            if days > 31:
+                raise ee.ee_exception.EEException('User memory limit exceeded.')
+            return {'type': 'ImageCollection', 'features': [{'id': self.start_date}]}
+
+    coll_obj = default_coll_obj(start_date='2017-01-01', end_date='2017-07-01')
+    monkeypatch.setattr(
+        coll_obj, 'interpolate',
+        lambda t_interval, start_date, end_date, **kwargs: FakeColl(start_date, end_date)
+    )
+    output = coll_obj.interpolate_windowed_info(window='quarter', t_interval='monthly', max_workers=2)
+    assert [x['id'] for x in output['features']] == [
+        '2017-01-01', '2017-02-01', '2017-03-01', '2017-04-01', '2017-05-01', '2017-06-01'
+    ]
+
+
+def test_Collection_interpolate_windows_exception():
+    with pytest.raises(ValueError):
+        default_coll_obj().interpolate_windows(window='deadbeef', t_interval='monthly')
+    with pytest.raises(ValueError):
+        default_coll_obj().interpolate_windows(window='year', t_interval='custom')
+
+
 # TODO: Write test for monthly interpolation with a date range that is too short
 
 
@@ -473,6 +672,61 @@ def test_Collection_interpolate_et_reference_params_interpolate_args():
     assert output['features'][0]['properties']['et_reference_resample'] == 'bicubic'
 
 
+def test_Collection_init_model_args_not_modified():
+    """Test that the init et_reference parameters are not set in the caller's dict"""
+    model_args = {}
+    coll = default_coll_obj(model_args=model_args)
+    assert model_args == {}
+    assert coll.model_args['et_reference_source'] == 'IDAHO_EPSCOR/GRIDMET'
+
+
+def test_Collection_interpolate_model_args_not_modified():
+    """Test that the interpolate et_reference parameters don't modify the collection"""
+    coll = default_coll_obj(
+        et_reference_source=None, et_reference_band=None,
+        et_reference_factor=None, et_reference_resample=None, model_args={},
+    )
+    coll.interpolate(
+        et_reference_source='IDAHO_EPSCOR/GRIDMET', et_reference_band='eto',
+        et_reference_factor=0.5, et_reference_resample='bicubic',
+    )
+    assert coll.model_args == {}
+
+
+def test_Collection_interpolate_concurrent():
+    """Test that one collection can be interpolated from multiple threads"""
+    coll = default_coll_obj(et_reference_factor=None, model_args={})
+    factors = [0.5, 0.75, 1.25, 1.5]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        output_colls = list(executor.map(
+            lambda factor: coll.interpolate(et_reference_factor=factor), factors
+        ))
+    output = utils.getinfo_batch(
+        [ee.Image(c.first()).get('et_reference_factor') for c in output_colls]
+    )
+    assert output == factors
+    assert 'et_reference_factor' not in coll.model_args
+
+
+def test_Collection_overpass_async():
+    output = asyncio.run(default_coll_obj().overpass_async())
+    assert {y['id'] for x in output['features'] for y in x['bands']} == VARIABLES
+
+
+def test_Collection_interpolate_async():
+    async def main():
+        coll = default_coll_obj()
+        limiter = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            coll.interpolate_async(limiter=limiter, t_interval='custom'),
+            coll.interpolate_async(limiter=limiter, t_interval='monthly'),
+        )
+
+    custom, monthly = asyncio.run(main())
+    assert {y['id'] for x in custom['features'] for y in x['bands']} == VARIABLES
+    assert {y['id'] for x in monthly['features'] for y in x['bands']} == VARIABLES
+
+
 def test_Collection_interpolate_t_interval_exception():
     """Test if Exception is raised for an invalid t_interval parameter"""
     with pytest.raises(ValueError):
@@ -598,3 +852,168 @@ def test_Collection_get_image_ids(collections, scene_id_list):
     output = default_coll_obj(collections=collections, variables=None).get_image_ids()
     assert type(output) is list
     assert set(x.split('/')[-1] for x in output) == set(scene_id_list)
+
+
+def test_Collection_get_image_ids_catalog():
+    scene_catalog = sims.catalog.SceneCatalog(':memory:')
+    scene_catalog.refresh(C02_COLLECTIONS, start_date=START_DATE, end_date=END_DATE, geometry=SCENE_GEOM)
+    coll_obj = default_coll_obj(variables=None, catalog=scene_catalog)
+    assert set(coll_obj._catalog_image_ids()) == set(coll_obj._build(variables=[]).aggregate_array(
+        'system:id').getInfo())
+    assert set(x.split('/')[-1] for x in coll_obj.get_image_ids()) == set(C02_SCENE_ID_LIST)
+
+
+def test_Collection_get_image_ids_catalog_filters():
+    """Test if the catalog applies the same filters as the server query"""
+    scene_catalog = sims.catalog.SceneCatalog(':memory:')
+    scene_catalog.refresh(C02_COLLECTIONS, start_date=START_DATE, end_date=END_DATE, geometry=SCENE_GEOM)
+    coll_args = {
+        'variables': None, 'catalog': scene_catalog, 'clear_fraction_min': 0.5,
+        'wrs2_index': sims.wrs2.WRS2Index({(44, 33): [-123.3, 37.8, -120.5, 39.9]}),
+    }
+    # The clear fractions must be cached before the catalog can be used
+    assert default_coll_obj(**coll_args)._catalog_image_ids() is None
+    coll_obj = default_coll_obj(**coll_args)
+    scene_catalog.clear_fractions(
+        scene_catalog.image_ids(C02_COLLECTIONS, START_DATE, END_DATE), coll_obj.geometry,
+        scale=coll_obj.clear_fraction_scale,
+    )
+    assert set(coll_obj._catalog_image_ids()) == set(coll_obj._build(variables=[]).aggregate_array(
+        'system:id').getInfo())
+
+
+def test_Collection_catalog_image_ids_footprint():
+    """Test if scenes are selected on their footprint, not the bounding box"""
+    scene_catalog = sims.catalog.SceneCatalog(':memory:')
+    scene_catalog.add_refresh('LANDSAT/LC08/C02/T1_L2', '2017-01-01', '2018-01-01')
+    scene_catalog.add_refresh('LANDSAT/LE07/C02/T1_L2', '2017-01-01', '2018-01-01')
+    # The point is in the first diamond's bounding box but outside the footprint
+    scene_catalog.add_scenes('LANDSAT/LC08/C02/T1_L2', [
+        ['LC08_044033_20170716', 1500230000000, 4.2, 44, 33, -123.8, 38.8, -121.8, 40.8,
+         {'type': 'Polygon', 'coordinates': [
+             [[-122.8, 38.8], [-121.8, 39.8], [-122.8, 40.8], [-123.8, 39.8], [-122.8, 38.8]]]}],
+        ['LC08_043033_20170709', 1499624000000, 1.0, 43, 33, -122, 38, -120, 40,
+         {'type': 'Polygon', 'coordinates': [
+             [[-121, 38], [-120, 39], [-121, 40], [-122, 39], [-121, 38]]]}],
+    ])
+    coll_obj = default_coll_obj(variables=None, catalog=scene_catalog)
+    assert coll_obj._catalog_image_ids() == ['LANDSAT/LC08/C02/T1_L2/LC08_043033_20170709']
+
+    # The WRS2 index path/rows are applied
+    coll_obj = default_coll_obj(
+        variables=None, catalog=scene_catalog,
+        wrs2_index=sims.wrs2.WRS2Index({(44, 33): [-123, 38, -121, 40]}),
+    )
+    assert coll_obj._catalog_image_ids() == []
+
+    # Scenes without a stored footprint are requested from the server
+    scene_catalog.add_scenes('LANDSAT/LC08/C02/T1_L2', [
+        ['LC08_043033_20170725', 1500857000000, 1.0, 43, 33, -122, 38, -120, 40],
+    ])
+    assert default_coll_obj(variables=None, catalog=scene_catalog)._catalog_image_ids() is None
+
+
+def test_Collection_get_image_ids_catalog_not_covered():
+    # Dates outside the refreshed range are requested from the server
+    scene_catalog = sims.catalog.SceneCatalog(':memory:')
+    scene_catalog.add_refresh('LANDSAT/LC08/C02/T1_L2', '2016-01-01', '2016-02-01')
+    coll_obj = default_coll_obj(variables=None, catalog=scene_catalog)
+    assert coll_obj._catalog_image_ids() is None
+    assert set(x.split('/')[-1] for x in coll_obj.get_image_ids()) == set(C02_SCENE_ID_LIST)
+
+
+def test_Collection_build_wrs2_index():
+    wrs2_index = sims.wrs2.WRS2Index({
+        (44, 33): [-123.3, 37.8, -120.5, 39.9],
+        (43, 33): [-121.8, 37.8, -119.0, 39.9],
+    })
+    output = utils.getinfo(
+        default_coll_obj(wrs2_index=wrs2_index)._build(variables=[]).aggregate_array('system:id')
+    )
+    assert set(x.split('/')[-1] for x in output) == set(C02_SCENE_ID_LIST)
+
+
+def test_Collection_build_wrs2_index_outside():
+    # The path/row filter is not applied if the geometry is outside the index
+    wrs2_index = sims.wrs2.WRS2Index({(1, 1): [10, 10, 11, 11]})
+    output = utils.getinfo(
+        default_coll_obj(wrs2_index=wrs2_index)._build(variables=[]).aggregate_array('system:id')
+    )
+    assert set(x.split('/')[-1] for x in output) == set(C02_SCENE_ID_LIST)
+
+
+@pytest.mark.parametrize('clear_fraction_min', [-0.1, 1.1])
+def test_Collection_init_clear_fraction_min_exception(clear_fraction_min):
+    with pytest.raises(ValueError):
+        default_coll_obj(clear_fraction_min=clear_fraction_min)
+
+
+def test_Collection_init_clear_fraction_min_type():
+    with pytest.raises(TypeError):
+        default_coll_obj(clear_fraction_min='a')
+
+
+def test_Collection_build_clear_fraction_min():
+    scene_catalog = sims.catalog.SceneCatalog(':memory:')
+    coll_obj = default_coll_obj(clear_fraction_min=0, catalog=scene_catalog)
+    output = utils.getinfo(coll_obj._build(variables=[]).aggregate_array('system:id'))
+    assert set(x.split('/')[-1] for x in output) == set(C02_SCENE_ID_LIST)
+
+    # Only the clearest scene(s) should be kept (the fractions are cached)
+    clear_fractions = scene_catalog.clear_fractions(output, coll_obj.geometry)
+    clear_fraction_max = max(clear_fractions.values())
+    coll_obj = default_coll_obj(clear_fraction_min=clear_fraction_max, catalog=scene_catalog)
+    output = utils.getinfo(coll_obj._build(variables=[]).aggregate_array('system:id'))
+    assert set(output) == {k for k, v in clear_fractions.items() if v >= clear_fraction_max}
+
+
+def test_Collection_build_clear_fraction_min_no_requests(monkeypatch):
+    """Test if the clear fraction filter is built without any requests"""
+    def getinfo(*args, **kwargs):
+        raise AssertionError('unexpected request')
+    monkeypatch.setattr(utils, 'getinfo', getinfo)
+    monkeypatch.setattr(utils, 'getinfo_batch', getinfo)
+    coll_obj = default_coll_obj(clear_fraction_min=0.5)
+    assert isinstance(coll_obj._build(variables=['et']), ee.ImageCollection)
+
+
+@pytest.mark.parametrize(
+    'geometry_filter, geometry_tolerance',
+    [
+        ['exact', None],
+        ['bbox', None],
+        ['hull', None],
+        ['hull', 0.01],
+    ]
+)
+def test_Collection_build_geometry_filter(geometry_filter, geometry_tolerance):
+    coll_obj = default_coll_obj(
+        geometry=ee.Geometry.Polygon([[
+            [SCENE_GEOM[0], SCENE_GEOM[1]], [SCENE_GEOM[2], SCENE_GEOM[1]],
+            [SCENE_POINT[0], SCENE_POINT[1]], [SCENE_GEOM[2], SCENE_GEOM[3]],
+            [SCENE_GEOM[0], SCENE_GEOM[3]],
+        ]]),
+        geometry_filter=geometry_filter,
+        geometry_tolerance=geometry_tolerance,
+    )
+    output = utils.getinfo(coll_obj._build(variables=[]).aggregate_array('system:id'))
+    assert set(x.split('/')[-1] for x in output) == set(C02_SCENE_ID_LIST)
+
+
+def test_Collection_geometry_filter_bbox_graph():
+    # The exact geometry is not embedded in the collection graph
+    geometry = ee.Geometry.Polygon([[[-121.91 + 0.0001 * i, 38.99 + 0.0001 * (i % 2)] for i in range(200)]])
+    exact_graph = default_coll_obj(geometry=geometry)._build(variables=[]).serialize()
+    bbox_graph = default_coll_obj(geometry=geometry, geometry_filter='bbox')._build(variables=[]).serialize()
+    assert len(bbox_graph) < len(exact_graph)
+
+
+def test_Collection_init_geometry_filter_exception():
+    with pytest.raises(ValueError):
+        default_coll_obj(geometry_filter='simplify')
+
+
+@pytest.mark.parametrize('geometry_tolerance', [0, -1])
+def test_Collection_init_geometry_tolerance_exception(geometry_tolerance):
+    with pytest.raises(ValueError):
+        default_coll_obj(geometry_tolerance=geometry_tolerance)
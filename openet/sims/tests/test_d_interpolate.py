@@ -1,7 +1,10 @@
 import datetime
+import inspect
 # import pprint
 
+from dateutil.relativedelta import relativedelta
 import ee
+import openet.core.interpolate
 import pandas as pd
 import pytest
 
@@ -87,6 +90,70 @@ def test_from_scene_et_fraction_t_interval_daily_values(tol=0.0001):
     # assert output['count']['2017-07-01'] == 3
 
 
+def test_from_scene_et_fraction_interp_engine_array_daily_values(tol=0.0001):
+    output_coll = interpolate.from_scene_et_fraction(
+        scene_coll(['et_fraction', 'ndvi'], ndvi=[0.2, 0.4, 0.6]),
+        start_date='2017-07-01',
+        end_date='2017-08-01',
+        variables=['et', 'et_reference', 'et_fraction', 'ndvi'],
+        interp_args={'interp_method': 'linear', 'interp_days': 32,
+                     'interp_engine': 'array'},
+        model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+                    'et_reference_band': 'eto',
+                    'et_reference_resample': 'nearest'},
+        t_interval='daily',
+    )
+
+    TEST_POINT = (-121.5265, 38.7399)
+    output = utils.point_coll_value(output_coll, TEST_POINT, scale=30)
+    assert abs(output['ndvi']['2017-07-01'] - 0.2) <= tol
+    assert abs(output['ndvi']['2017-07-08'] - 0.2) <= tol
+    assert abs(output['ndvi']['2017-07-10'] - 0.25) <= tol
+    assert abs(output['ndvi']['2017-07-12'] - 0.3) <= tol
+    assert abs(output['ndvi']['2017-07-16'] - 0.4) <= tol
+    assert abs(output['ndvi']['2017-07-24'] - 0.6) <= tol
+    assert abs(output['ndvi']['2017-07-31'] - 0.6) <= tol
+    assert abs(output['et_fraction']['2017-07-10'] - 0.4) <= tol
+    assert abs(output['et_reference']['2017-07-10'] - 8.0) <= tol
+    assert abs(output['et']['2017-07-10'] - (8.0 * 0.4)) <= tol
+
+
+def test_from_scene_et_fraction_interp_engine_array_monthly_values(tol=0.0001):
+    output_coll = interpolate.from_scene_et_fraction(
+        scene_coll(['et_fraction', 'ndvi']),
+        start_date='2017-07-01',
+        end_date='2017-08-01',
+        variables=['et', 'et_reference', 'et_fraction', 'ndvi', 'count'],
+        interp_args={'interp_method': 'linear', 'interp_days': 32,
+                     'interp_engine': 'array'},
+        model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+                    'et_reference_band': 'eto',
+                    'et_reference_resample': 'nearest'},
+        t_interval='monthly',
+    )
+
+    TEST_POINT = (-121.5265, 38.7399)
+    output = utils.point_coll_value(output_coll, TEST_POINT, scale=30)
+    assert abs(output['et_fraction']['2017-07-01'] - 0.4) <= tol
+    assert abs(output['et_reference']['2017-07-01'] - 236.5) <= tol
+    assert abs(output['et']['2017-07-01'] - (236.5 * 0.4)) <= tol
+    assert output['count']['2017-07-01'] == 3
+
+
+def test_from_scene_et_fraction_interp_engine_exception():
+    with pytest.raises(ValueError):
+        interpolate.from_scene_et_fraction(
+            scene_coll(['et_fraction']),
+            start_date='2017-07-01',
+            end_date='2017-08-01',
+            variables=['et'],
+            interp_args={'interp_engine': 'deadbeef'},
+            model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+                        'et_reference_band': 'eto'},
+            t_interval='monthly',
+        )
+
+
 def test_from_scene_et_fraction_t_interval_monthly_values(tol=0.0001):
     output_coll = interpolate.from_scene_et_fraction(
         scene_coll(['et_fraction', 'ndvi']),
@@ -150,6 +217,213 @@ def test_from_scene_et_fraction_t_interval_custom_daily_count(tol=0.0001):
     assert output['daily_count']['2017-07-01'] == 31
 
 
+def monthly_coll(start_year=2017, start_month=1, months=12):
+    """Return a generic monthly collection to test the aggregation functions"""
+    image_list = []
+    for i in range(months):
+        month_dt = datetime.datetime(start_year, start_month, 1) + relativedelta(months=i)
+        image_list.append(
+            ee.Image.constant([2, 5, 0.5, 1, 30]).double()
+            .rename(['et', 'et_reference', 'ndvi', 'count', 'daily_count'])
+            .set({'system:index': month_dt.strftime('%Y%m'),
+                  'system:time_start': utils.millis(month_dt)})
+        )
+    return ee.ImageCollection(image_list)
+
+
+@pytest.mark.parametrize(
+    'start_dt, end_dt, t_interval, expected',
+    [
+        ['2017-07-15', '2017-08-15', 'monthly', ['2017-07-01', '2017-09-01']],
+        ['2017-07-15', '2017-08-15', 'annual', ['2017-01-01', '2018-01-01']],
+        ['2017-01-01', '2018-01-01', 'annual', ['2017-01-01', '2018-01-01']],
+        ['2017-07-15', '2017-08-15', 'water_year', ['2016-10-01', '2017-10-01']],
+        ['2017-10-01', '2017-10-02', 'water_year', ['2017-10-01', '2018-10-01']],
+        ['2016-10-01', '2018-10-01', 'water_year', ['2016-10-01', '2018-10-01']],
+        ['2017-07-15', '2017-08-15', 'custom', ['2017-07-15', '2017-08-15']],
+    ]
+)
+def test_period_date_range(start_dt, end_dt, t_interval, expected):
+    output = interpolate.period_date_range(
+        datetime.datetime.strptime(start_dt, '%Y-%m-%d'),
+        datetime.datetime.strptime(end_dt, '%Y-%m-%d'),
+        t_interval,
+    )
+    assert [x.strftime('%Y-%m-%d') for x in output] == expected
+
+
+@pytest.mark.parametrize(
+    'start_dt, end_dt, t_interval, expected',
+    [
+        ['2017-07-15', '2017-09-15', 'monthly', ['2017-07-01', '2017-08-01', '2017-09-01']],
+        ['2017-07-30', '2017-08-02', 'daily', ['2017-07-30', '2017-07-31', '2017-08-01']],
+        ['2016-10-01', '2018-10-01', 'water_year', ['2016-10-01', '2017-10-01']],
+        ['2017-07-15', '2017-08-15', 'custom', ['2017-07-15']],
+    ]
+)
+def test_period_list(start_dt, end_dt, t_interval, expected):
+    output = interpolate.period_list(
+        datetime.datetime.strptime(start_dt, '%Y-%m-%d'),
+        datetime.datetime.strptime(end_dt, '%Y-%m-%d'),
+        t_interval,
+    )
+    assert [x[0].strftime('%Y-%m-%d') for x in output] == expected
+
+
+def test_period_list_t_interval_exception():
+    with pytest.raises(ValueError):
+        interpolate.period_list(
+            datetime.datetime(2017, 7, 1), datetime.datetime(2017, 8, 1), 'deadbeef'
+        )
+
+
+@pytest.mark.parametrize(
+    'scenes, t_interval, interp_days, expected',
+    [
+        # Scenes only change the months within interp_days of the scene date
+        [['LANDSAT/LC08/C02/T1_L2/LC08_044033_20170716'], 'monthly', 32,
+         [('2017-06-01', '2017-07-01'), ('2017-07-01', '2017-08-01'), ('2017-08-01', '2017-09-01')]],
+        [['2017-07-16'], 'monthly', 10, [('2017-07-01', '2017-08-01')]],
+        [['20170716'], 'annual', 32, [('2017-01-01', '2018-01-01')]],
+        [['2017-07-16'], 'daily', 1,
+         [('2017-07-15', '2017-07-16'), ('2017-07-16', '2017-07-17'), ('2017-07-17', '2017-07-18')]],
+        # Affected periods are clipped to the output date range
+        [['2017-01-05'], 'monthly', 32, [('2017-01-01', '2017-02-01'), ('2017-02-01', '2017-03-01')]],
+        [['2016-06-01'], 'monthly', 32, []],
+        [[], 'monthly', 32, []],
+    ]
+)
+def test_affected_periods(scenes, t_interval, interp_days, expected):
+    output = interpolate.affected_periods(
+        scenes, '2017-01-01', '2018-01-01', t_interval, interp_days=interp_days
+    )
+    assert output == expected
+
+
+def test_affected_periods_estimate_soil_evaporation():
+    output = interpolate.affected_periods(
+        ['2017-10-16'], '2017-01-01', '2018-01-01', 'monthly', interp_days=10,
+        estimate_soil_evaporation=True,
+    )
+    assert output == [
+        ('2017-10-01', '2017-11-01'), ('2017-11-01', '2017-12-01'), ('2017-12-01', '2018-01-01')
+    ]
+
+
+def test_affected_periods_scene_exception():
+    with pytest.raises(ValueError):
+        interpolate.affected_periods(['deadbeef'], '2017-01-01', '2018-01-01', 'monthly')
+
+
+def test_from_monthly_aggregates_annual_values(tol=0.0001):
+    output_coll = interpolate.from_monthly_aggregates(
+        monthly_coll(),
+        start_date='2017-01-01',
+        end_date='2018-01-01',
+        variables=['et', 'et_reference', 'et_fraction', 'ndvi', 'count', 'daily_count'],
+        t_interval='annual',
+    )
+    output = utils.point_coll_value(output_coll, (-121.5265, 38.7399), scale=30)
+    assert abs(output['et']['2017-01-01'] - 24) <= tol
+    assert abs(output['et_reference']['2017-01-01'] - 60) <= tol
+    assert abs(output['et_fraction']['2017-01-01'] - 0.4) <= tol
+    assert abs(output['ndvi']['2017-01-01'] - 0.5) <= tol
+    assert output['count']['2017-01-01'] == 12
+    assert output['daily_count']['2017-01-01'] == 360
+
+
+def test_from_monthly_aggregates_water_year_index():
+    output_coll = interpolate.from_monthly_aggregates(
+        monthly_coll(start_year=2016, start_month=10),
+        start_date='2016-10-01',
+        end_date='2017-10-01',
+        variables=['et'],
+        t_interval='water_year',
+    )
+    output = utils.getinfo(output_coll.aggregate_array('system:index'))
+    assert output == ['2017']
+
+
+def test_from_monthly_aggregates_mask_partial_aggregations():
+    # Only 11 months are present so the annual value should be masked
+    output_coll = interpolate.from_monthly_aggregates(
+        monthly_coll(months=11),
+        start_date='2017-01-01',
+        end_date='2018-01-01',
+        variables=['et'],
+        t_interval='annual',
+    )
+    output = utils.point_coll_value(output_coll, (-121.5265, 38.7399), scale=30)
+    assert output['et']['2017-01-01'] is None
+
+
+def test_from_monthly_aggregates_t_interval_exception():
+    with pytest.raises(ValueError):
+        interpolate.from_monthly_aggregates(
+            monthly_coll(), start_date='2017-01-01', end_date='2018-01-01',
+            variables=['et'], t_interval='monthly',
+        )
+
+
+def test_from_scene_et_fraction_t_interval_annual():
+    output_coll = interpolate.from_scene_et_fraction(
+        scene_coll(['et_fraction', 'ndvi']),
+        start_date='2017-07-01',
+        end_date='2017-08-01',
+        variables=['et', 'et_reference', 'et_fraction'],
+        interp_args={'interp_method': 'linear', 'interp_days': 32},
+        model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+                    'et_reference_band': 'eto',
+                    'et_reference_resample': 'nearest'},
+        t_interval='annual',
+    )
+    output = utils.getinfo(output_coll)
+    assert [x['properties']['system:index'] for x in output['features']] == ['2017']
+    assert {y['id'] for x in output['features'] for y in x['bands']} == \
+        {'et', 'et_reference', 'et_fraction'}
+
+
+def test_from_scene_et_fraction_ndvi_only(tol=0.0001):
+    # The reference ET parameters are not needed when only interpolating NDVI
+    output_coll = interpolate.from_scene_et_fraction(
+        scene_coll(['ndvi'], ndvi=[0.2, 0.4, 0.6]),
+        start_date='2017-07-01',
+        end_date='2017-08-01',
+        variables=['ndvi', 'daily_count'],
+        interp_args={'interp_method': 'linear', 'interp_days': 32},
+        model_args={},
+        t_interval='daily',
+    )
+
+    TEST_POINT = (-121.5265, 38.7399)
+    output = utils.point_coll_value(output_coll, TEST_POINT, scale=30)
+    assert abs(output['ndvi']['2017-07-01'] - 0.2) <= tol
+    assert abs(output['ndvi']['2017-07-10'] - 0.25) <= tol
+    assert abs(output['ndvi']['2017-07-31'] - 0.6) <= tol
+    assert output['daily_count']['2017-07-10'] == 1
+    assert '2017-08-01' not in output['ndvi'].keys()
+
+
+def test_from_scene_et_fraction_et_reference_only(tol=0.0001):
+    # The scene collection is not interpolated when only reference ET is requested
+    output_coll = interpolate.from_scene_et_fraction(
+        scene_coll(['et_fraction']),
+        start_date='2017-07-01',
+        end_date='2017-08-01',
+        variables=['et_reference', 'daily_count'],
+        interp_args={'interp_method': 'linear', 'interp_days': 32},
+        model_args={'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+                    'et_reference_band': 'eto',
+                    'et_reference_resample': 'nearest'},
+        t_interval='monthly',
+    )
+
+    TEST_POINT = (-121.5265, 38.7399)
+    output = utils.point_coll_value(output_coll, TEST_POINT, scale=30)
+    assert abs(output['et_reference']['2017-07-01'] - 236.5) <= tol
+    assert output['daily_count']['2017-07-01'] == 31
+
+
 def test_from_scene_et_fraction_t_interval_monthly_et_reference_factor(tol=0.0001):
     output_coll = interpolate.from_scene_et_fraction(
         scene_coll(['et_fraction', 'ndvi']),
@@ -523,3 +797,16 @@ def test_soil_evaporation_synthetic(synth_test_imgs, synth_precip_imgs, tol=0.00
     for i in range(46, 52):
         assert abs(wb_df[wb_df.doy==i]['et'].iloc[0] -
                    comp_df[comp_df.doy==i]['etc'].iloc[0]) < tol
+
+
+def test_openet_core_daily_parameters():
+    """Test if the installed openet-core daily() computes the product bands
+
+    The compute_product and resample_method parameters (and the
+    "{source_band}_1" product bands) are in every openet-core release
+    allowed by the pyproject.toml dependency.
+
+    """
+    parameters = inspect.signature(openet.core.interpolate.daily).parameters
+    assert 'compute_product' in parameters
+    assert 'resample_method' in parameters
@@ -0,0 +1,110 @@
+import ee
+import pytest
+
+import openet.sims.export as export
+
+CRS_TRANSFORM = [0.1, 0, -125, 0, -0.1, 50]
+
+
+def test_tile_grid():
+    tiles = export.tile_grid([-121.95, 38.55, -121.05, 39.05], CRS_TRANSFORM, tile_size=5)
+    assert [tile['id'] for tile in tiles] == ['c0006r0021', 'c0007r0021', 'c0006r0022', 'c0007r0022']
+    assert tiles[0]['bbox'] == pytest.approx([-122.0, 39.0, -121.5, 39.5])
+    assert tiles[0]['crs_transform'] == pytest.approx([0.1, 0, -122.0, 0, -0.1, 39.5])
+    assert tiles[0]['dimensions'] == '5x5'
+
+
+def test_tile_grid_aligned():
+    # Bounds on the tile edges should not add extra tiles
+    tiles = export.tile_grid([-122.0, 38.5, -121.5, 39.0], CRS_TRANSFORM, tile_size=5)
+    assert [tile['id'] for tile in tiles] == ['c0006r0022']
+
+
+def test_tile_grid_intersect():
+    geometry = ee.Geometry.Polygon([[[-121.95, 38.55], [-121.05, 38.55], [-121.95, 39.05]]])
+    tiles = export.tile_grid(geometry, CRS_TRANSFORM, tile_size=5, intersect=True)
+    assert [tile['id'] for tile in tiles] == ['c0006r0021', 'c0006r0022', 'c0007r0022']
+
+
+@pytest.fixture
+def tiles():
+    return export.tile_grid([-121.95, 38.55, -121.05, 39.05], CRS_TRANSFORM, tile_size=5)
+
+
+def test_TileExporter_run(tiles):
+    task_api = export.LocalTaskAPI(polls=2)
+    exporter = export.TileExporter(lambda tile: None, tiles, task_api, max_tasks=2, poll_seconds=0)
+    assert exporter.run() == {'COMPLETED': 4}
+    assert len(task_api.tasks) == 4
+
+
+def test_TileExporter_rerun(tiles, tmp_path):
+    job_store = export.JobStore(str(tmp_path / 'jobs.sqlite'))
+    export.TileExporter(
+        lambda tile: None, tiles[:2], export.LocalTaskAPI(), job_store=job_store, poll_seconds=0
+    ).run()
+
+    # Completed tiles are not submitted again
+    task_api = export.LocalTaskAPI()
+    output = export.TileExporter(
+        lambda tile: None, tiles, task_api, job_store=export.JobStore(job_store.path), poll_seconds=0
+    ).run()
+    assert output == {'COMPLETED': 4}
+    assert sorted(task['tile']['id'] for task in task_api.tasks.values()) == \
+        sorted(tile['id'] for tile in tiles[2:])
+
+
+def test_TileExporter_failed(tiles):
+    task_api = export.LocalTaskAPI(fail=['sims_c0006r0021'])
+    job_store = export.JobStore(':memory:')
+    output = export.TileExporter(
+        lambda tile: None, tiles, task_api, job_store=job_store, max_attempts=3, poll_seconds=0
+    ).run()
+    assert output == {'COMPLETED': 3, 'FAILED': 1}
+    assert job_store.get('sims_c0006r0021')['attempts'] == 3
+
+
+def test_TileExporter_unknown_state(tiles):
+    """Test if tasks in an unknown state are resubmitted"""
+    task_api = export.LocalTaskAPI()
+    status = task_api.status
+    unknown = set()
+
+    def unknown_status(task_id):
+        # The first task of each tile is reported as purged
+        if task_api.tasks[task_id]['tile']['id'] not in unknown:
+            unknown.add(task_api.tasks[task_id]['tile']['id'])
+            return 'UNKNOWN'
+        return status(task_id)
+
+    task_api.status = unknown_status
+    output = export.TileExporter(lambda tile: None, tiles, task_api, max_attempts=2, poll_seconds=0).run()
+    assert output == {'COMPLETED': 4}
+    assert len(task_api.tasks) == 8
+
+
+def test_TileExporter_build_exception(tiles):
+    def build_func(tile):
+        raise ValueError('build error')
+    output = export.TileExporter(build_func, tiles, export.LocalTaskAPI(), poll_seconds=0).run()
+    assert output == {'FAILED': 4}
+
+
+def test_TileExporter_max_tasks_exception(tiles):
+    with pytest.raises(ValueError):
+        export.TileExporter(lambda tile: None, tiles, export.LocalTaskAPI(), max_tasks=0)
+
+
+def test_interpolate_build_func(tiles):
+    build_func = export.interpolate_build_func(
+        coll_args={
+            'collections': ['LANDSAT/LC08/C02/T1_L2'],
+            'start_date': '2017-07-01',
+            'end_date': '2017-08-01',
+            'variables': ['et'],
+            'et_reference_source': 'IDAHO_EPSCOR/GRIDMET',
+            'et_reference_band': 'eto',
+        },
+        interp_args={'t_interval': 'monthly'},
+    )
+    assert isinstance(build_func(tiles[0]), ee.Image)
@@ -0,0 +1,171 @@
+import asyncio
+import math
+import sys
+
+import ee
+import pandas as pd
+import pytest
+
+import openet.sims.extract as extract
+
+
+def elevation_coll():
+    return ee.ImageCollection([
+        ee.Image('USGS/3DEP/10m').select(['elevation'], ['output'])
+        .set({'system:time_start': ee.Date(date).millis()})
+        for date in ['2012-04-04', '2012-04-05']
+    ])
+
+
+def test_features_to_columns():
+    features = [
+        {'type': 'Feature', 'geometry': None,
+         'properties': {'id': 'b', 'time': 1333584000000, 'et': 5.0, 'ndvi': 0.6}},
+        {'type': 'Feature', 'geometry': None,
+         'properties': {'id': 'a', 'time': 1333670400000, 'ndvi': 0.5}},
+    ]
+    output = extract.features_to_columns(features)
+    assert list(output.keys()) == ['id', 'time', 'et', 'ndvi']
+    assert list(output['id']) == ['b', 'a']
+    assert str(output['time'][0]) == '2012-04-05T00:00:00.000'
+    assert output['et'][0] == 5.0
+    assert math.isnan(output['et'][1])
+    assert list(output['ndvi']) == [0.6, 0.5]
+
+
+def test_features_to_columns_id_property():
+    features = [{'properties': {'site': 'US-Twt', 'time': 0, 'et': 1}}]
+    output = extract.features_to_columns(features, id_property='site')
+    assert list(output.keys()) == ['site', 'time', 'et']
+
+
+def test_features_to_columns_empty():
+    output = extract.features_to_columns([])
+    assert list(output.keys()) == ['id', 'time']
+    assert len(output['time']) == 0
+
+
+@pytest.mark.parametrize('module', ['numpy', 'pandas'])
+def test_optional_dependency_exception(module, monkeypatch):
+    """Test if a missing optional dependency names the extract extra"""
+    monkeypatch.setitem(sys.modules, module, None)
+    features = [{'properties': {'id': 'US-Twt', 'time': 0, 'et': 1}}]
+    with pytest.raises(ImportError, match=r'openet-sims\[extract\]'):
+        extract._point_output(features, 'id', as_dataframe=True)
+
+
+def test_features_to_columns_string_property():
+    features = [
+        {'properties': {'id': 'a', 'time': 0, 'crop': 'alfalfa', 'et': 1}},
+        {'properties': {'id': 'b', 'time': 0, 'crop': None, 'et': None}},
+    ]
+    output = extract.features_to_columns(features)
+    assert list(output['crop']) == ['alfalfa', None]
+    assert output['et'].dtype == 'float64'
+
+
+def test_point_coll_values_chunk_size_exception():
+    with pytest.raises(ValueError):
+        extract.point_coll_values(elevation_coll(), [[-106.03249, 37.17777]], chunk_size=0)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 10])
+def test_point_coll_values_list(chunk_size, tol=0.001):
+    output = extract.point_coll_values(
+        elevation_coll(), [[-106.03249, 37.17777], [-106.03249, 37.17777]],
+        scale=30, chunk_size=chunk_size,
+    )
+    assert isinstance(output, pd.DataFrame)
+    assert len(output) == 4
+    assert list(output['id']) == [0, 0, 1, 1]
+    assert str(output['time'].iloc[0].date()) == '2012-04-04'
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+
+
+def test_point_coll_values_dict(tol=0.001):
+    output = extract.point_coll_values(
+        elevation_coll(), {'site': [-106.03249, 37.17777]}, scale=30,
+        as_dataframe=False,
+    )
+    assert list(output['id']) == ['site', 'site']
+    assert abs(output['output'][0] - 2364.169) <= tol
+
+
+def test_point_coll_values_feature_collection(tol=0.001):
+    points = ee.FeatureCollection([
+        ee.Feature(ee.Geometry.Point([-106.03249, 37.17777]), {'site': 'site'})
+    ])
+    output = extract.point_coll_values(
+        elevation_coll(), points, scale=30, id_property='site'
+    )
+    assert list(output['site']) == ['site', 'site']
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+
+
+def test_point_coll_values_feature_collection_string_property(tol=0.001):
+    """Test if string point properties are passed through"""
+    points = ee.FeatureCollection([
+        ee.Feature(ee.Geometry.Point([-106.03249, 37.17777]), {'id': 1, 'name': 'Crestone'})
+    ])
+    output = extract.point_coll_values(elevation_coll(), points, scale=30)
+    assert list(output['name']) == ['Crestone', 'Crestone']
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+
+
+def test_region_to_columns():
+    region = [
+        ['id', 'longitude', 'latitude', 'time', 'et', 'ndvi'],
+        ['20170702', -121.5, 38.7, 1498953600000, 5.0, None],
+        ['20170701', -121.5, 38.7, 1498867200000, 4.0, 0.6],
+    ]
+    output = extract.region_to_columns(region)
+    assert list(output.keys()) == ['id', 'time', 'et', 'ndvi']
+    assert list(output['id']) == ['20170701', '20170702']
+    assert str(output['time'][0]) == '2017-07-01T00:00:00.000'
+    assert list(output['et']) == [4.0, 5.0]
+    assert math.isnan(output['ndvi'][1])
+
+
+def test_region_to_columns_empty():
+    output = extract.region_to_columns([['id', 'longitude', 'latitude', 'time', 'et']])
+    assert len(output['time']) == 0
+    assert len(output['et']) == 0
+
+
+def test_point_coll_region_date_exception():
+    with pytest.raises(ValueError):
+        extract.point_coll_region(elevation_coll(), [-106.03249, 37.17777], '2012-04-05', '2012-04-01')
+
+
+@pytest.mark.parametrize('chunk_days', [1, 2, None])
+def test_point_coll_region(chunk_days, tol=0.001):
+    output, latency = extract.point_coll_region(
+        elevation_coll(), [-106.03249, 37.17777], '2012-04-01', '2012-04-10',
+        scale=30, chunk_days=chunk_days, return_latency=True,
+    )
+    assert len(output) == 2
+    assert str(output['time'].iloc[0].date()) == '2012-04-04'
+    assert str(output['time'].iloc[1].date()) == '2012-04-05'
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+    assert latency[0][0] == '2012-04-01'
+    assert latency[-1][1] == '2012-04-10'
+    assert sum(chunk[2] for chunk in latency) == 2
+
+
+def test_point_coll_values_async(tol=0.001):
+    output = asyncio.run(extract.point_coll_values_async(
+        elevation_coll(), [[-106.03249, 37.17777], [-106.03249, 37.17777]],
+        scale=30, chunk_size=1,
+    ))
+    assert list(output['id']) == [0, 0, 1, 1]
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+
+
+def test_point_coll_region_async(tol=0.001):
+    output, latency = asyncio.run(extract.point_coll_region_async(
+        elevation_coll(), [-106.03249, 37.17777], '2012-04-01', '2012-04-10',
+        scale=30, chunk_days=2, return_latency=True,
+    ))
+    assert len(output) == 2
+    assert abs(output['output'].iloc[0] - 2364.169) <= tol
+    assert len(latency) == 5
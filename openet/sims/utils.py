@@ -1,39 +1,459 @@
+import asyncio
 import calendar
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import datetime
+import functools
 import logging
-from time import sleep
+import math
+import random
+import re
+import time
 
 import ee
 
+from . import cache
 
-def getinfo(ee_obj, n=4):
-    """Make an exponential back off getInfo call on an Earth Engine object"""
-    output = None
-    for i in range(1, n):
+# HTTP 429 (Too Many Requests) status in an error message
+#   (i.e. "HttpError 429", "HTTP status 429", "code: 429")
+_HTTP_429_PATTERN = re.compile(r'\b(?:http\s*error|http|status|code)\W*429\b', re.IGNORECASE)
+
+
+class EEQueryError(Exception):
+    """Base class for classified Earth Engine query errors"""
+    # Whether the query should be resent if it fails with this error
+    retry = True
+
+
+class EEQuotaError(EEQueryError):
+    """Too many concurrent or rate limited requests"""
+    retry = True
+
+
+class EEMemoryError(EEQueryError):
+    """Earth Engine memory or capacity exceeded"""
+    # Resending the same request will almost always fail again
+    retry = False
+
+
+class EETimeoutError(EEQueryError):
+    """Computation timed out or the call deadline was reached"""
+    retry = False
+
+
+class EEUserError(EEQueryError):
+    """Invalid request (i.e. bad band name or parameter)"""
+    retry = False
+
+
+def classify_ee_error(e):
+    """Map an exception from a getInfo call to a classified error
+
+    Parameters
+    ----------
+    e : Exception
+
+    Returns
+    -------
+    EEQueryError subclass instance
+
+    Notes
+    -----
+    Exceptions that are not EEExceptions (i.e. socket or HTTP errors) are
+    assumed to be transient and are returned as a generic EEQueryError.
+
+    """
+    if isinstance(e, EEQueryError):
+        return e
+
+    message = str(e)
+    message_lower = message.lower()
+    if 'memory' in message_lower and 'exceeded' in message_lower:
+        error_type = EEMemoryError
+    elif 'capacity exceeded' in message_lower:
+        error_type = EEMemoryError
+    elif ('too many' in message_lower or 'quota' in message_lower or
+          'rate limit' in message_lower or _http_status(e) == 429 or
+          _HTTP_429_PATTERN.search(message)):
+        error_type = EEQuotaError
+    elif 'timed out' in message_lower or isinstance(e, TimeoutError):
+        error_type = EETimeoutError
+    elif isinstance(e, ee.ee_exception.EEException):
+        error_type = EEUserError
+    else:
+        error_type = EEQueryError
+
+    return error_type(message)
+
+
+def _http_status(e):
+    """Return the HTTP status of an exception (or None)"""
+    # googleapiclient HttpError responses and requests HTTPError responses
+    for response in [getattr(e, 'resp', None), getattr(e, 'response', None)]:
+        status = getattr(response, 'status', getattr(response, 'status_code', None))
+        if status is not None:
+            try:
+                return int(status)
+            except (TypeError, ValueError):
+                pass
+    return None
+
+
+def getinfo_retry(ee_obj, n=4, backoff=1, max_backoff=60, deadline=None):
+    """Make a getInfo call, resending transient failures with a jittered backoff
+
+    Parameters
+    ----------
+    ee_obj : ee.ComputedObject
+        Any object with a getInfo() method.
+    n : int, optional
+        Maximum number of attempts (the default is 4).
+    backoff : float, optional
+        Base backoff in seconds, doubled after each attempt (the default is 1).
+    max_backoff : float, optional
+        Maximum backoff in seconds (the default is 60).
+    deadline : float, optional
+        Maximum total time in seconds to spend on the call (including the
+        backoffs).  If set, each request is made in a separate thread and
+        EETimeoutError is raised when the deadline is reached, but the thread
+        is left to finish the request in the background.  The default is None.
+
+    Returns
+    -------
+    The getInfo() output
+
+    Raises
+    ------
+    EEQueryError subclass if the call fails and can't be (or was not) resent
+
+    """
+    start_time = time.monotonic()
+    for i in range(n):
         try:
-            output = ee_obj.getInfo()
-        except ee.ee_exception.EEException as e:
-            logging.info(f'    Resending query ({i}/{n})')
-            logging.info(f'    {e}')
-            sleep(i ** 3)
-            # if ('Earth Engine memory capacity exceeded' in str(e) or
-            #         'Earth Engine capacity exceeded' in str(e)):
-            #     logging.info(f'    Resending query ({i}/{n})')
-            #     logging.debug(f'    {e}')
-            #     sleep(i ** 2)
-            # else:
-            #     raise e
+            if deadline is None:
+                return ee_obj.getInfo()
+            return _getinfo_timeout(ee_obj, deadline - (time.monotonic() - start_time))
         except Exception as e:
-            logging.info(e)
-            break
+            error = classify_ee_error(e)
+            if not error.retry or (i + 1) >= n:
+                raise error from e
+
+            delay = min(max_backoff, backoff * 2 ** i) * random.uniform(0.5, 1.5)
+            if deadline is not None and (time.monotonic() - start_time + delay) > deadline:
+                raise EETimeoutError(f'deadline exceeded: {error}') from e
+
+            logging.info(f'    Resending query ({i + 1}/{n}) in {delay:.1f}s')
+            logging.debug(f'    {e}')
+            time.sleep(delay)
 
-        if output:
-            break
+
+def _getinfo_timeout(ee_obj, timeout):
+    """Make a getInfo call in a separate thread, waiting at most timeout seconds"""
+    if timeout <= 0:
+        raise EETimeoutError('deadline exceeded')
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(ee_obj.getInfo)
+    # Don't wait on the request thread if the call times out
+    executor.shutdown(wait=False)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        raise EETimeoutError(f'deadline exceeded after {timeout:.1f}s') from None
+
+
+def getinfo_batch(
+        ee_objs,
+        max_workers=8,
+        n=4,
+        backoff=1,
+        max_backoff=60,
+        deadline=None,
+        raise_errors=True,
+):
+    """Make concurrent getInfo calls on a list of Earth Engine objects
+
+    Parameters
+    ----------
+    ee_objs : list
+        Earth Engine objects (or any objects with a getInfo() method).
+    max_workers : int, optional
+        Maximum number of concurrent requests (the default is 8).
+    n : int, optional
+        Maximum number of attempts for each call (the default is 4).
+    backoff : float, optional
+        Base backoff in seconds (the default is 1).
+    max_backoff : float, optional
+        Maximum backoff in seconds (the default is 60).
+    deadline : float, optional
+        Maximum time in seconds to spend on each call (the default is None).
+    raise_errors : bool, optional
+        If True, the first failed call will raise its classified error and
+        the calls that have not started will be cancelled.
+        If False, the classified error is returned in place of the output.
+        The default is True.
+
+    Returns
+    -------
+    list of the getInfo() outputs in the same order as ee_objs
+
+    Raises
+    ------
+    EEQueryError subclass if raise_errors is True and a call fails
+
+    """
+    ee_objs = list(ee_objs)
+    output = [None] * len(ee_objs)
+    if not ee_objs:
+        return output
+
+    retry_kwargs = {
+        'n': n, 'backoff': backoff, 'max_backoff': max_backoff, 'deadline': deadline,
+    }
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(getinfo_retry, ee_obj, **retry_kwargs): i
+            for i, ee_obj in enumerate(ee_objs)
+        }
+        for future in as_completed(futures):
+            try:
+                output[futures[future]] = future.result()
+            except EEQueryError as e:
+                if raise_errors:
+                    for f in futures:
+                        f.cancel()
+                    raise
+                output[futures[future]] = e
 
     return output
 
 
-# TODO: Import from openet.core.utils instead of defining here
+async def run_async(func, *args, limiter=None, **kwargs):
+    """Run a blocking function in the event loop's default executor
+
+    Parameters
+    ----------
+    func : function
+    args : list
+        Positional arguments passed to func.
+    limiter : asyncio.Semaphore, optional
+        Semaphore limiting the number of outstanding calls (the default is None).
+    kwargs : dict
+        Keyword arguments passed to func.
+
+    Returns
+    -------
+    The function output
+
+    Notes
+    -----
+    Cancelling the task will stop it from waiting on the limiter or the output,
+    but a call that has already started in the executor thread will finish.
+
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    if limiter is None:
+        return await loop.run_in_executor(None, call)
+    async with limiter:
+        return await loop.run_in_executor(None, call)
+
+
+async def gather_async(aws, raise_errors=True):
+    """Run awaitables concurrently, cancelling the rest if one fails
+
+    Parameters
+    ----------
+    aws : list
+        Coroutines or futures.
+    raise_errors : bool, optional
+        If True, the first failure is raised and the other awaitables are
+        cancelled.  If False, the exceptions are returned in place of the
+        outputs.  The default is True.
+
+    Returns
+    -------
+    list of the outputs in the same order as aws
+
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks, return_exceptions=not raise_errors)
+    finally:
+        # Cancelling finished tasks has no effect
+        for task in tasks:
+            task.cancel()
+
+
+async def getinfo_async(ee_obj, limiter=None, **kwargs):
+    """Make a getInfo call without blocking the event loop
+
+    Parameters
+    ----------
+    ee_obj : ee.ComputedObject
+    limiter : asyncio.Semaphore, optional
+        Semaphore limiting the number of outstanding requests
+        (the default is None).
+    kwargs : dict, optional
+        Additional keyword arguments passed to getinfo_retry().
+
+    Returns
+    -------
+    The getInfo() output
+
+    """
+    return await run_async(getinfo_retry, ee_obj, limiter=limiter, **kwargs)
+
+
+async def getinfo_gather(ee_objs, max_concurrency=16, limiter=None, raise_errors=True, **kwargs):
+    """Make concurrent getInfo calls on a list of objects from the event loop
+
+    Parameters
+    ----------
+    ee_objs : list
+        Earth Engine objects (or any objects with a getInfo() method).
+    max_concurrency : int, optional
+        Maximum number of outstanding requests if limiter is not set
+        (the default is 16).
+    limiter : asyncio.Semaphore, optional
+        Semaphore shared with other calls to limit the total number of
+        outstanding requests (the default is None).
+    raise_errors : bool, optional
+        If True, the first failed call will raise its classified error and the
+        other calls will be cancelled.  If False, the classified error is
+        returned in place of the output.  The default is True.
+    kwargs : dict, optional
+        Additional keyword arguments passed to getinfo_retry().
+
+    Returns
+    -------
+    list of the getInfo() outputs in the same order as ee_objs
+
+    """
+    if limiter is None:
+        limiter = asyncio.Semaphore(max_concurrency)
+    return await gather_async(
+        [getinfo_async(ee_obj, limiter=limiter, **kwargs) for ee_obj in ee_objs],
+        raise_errors=raise_errors,
+    )
+
+
+def getinfo(ee_obj, n=4, **kwargs):
+    """Make an exponential back off getInfo call on an Earth Engine object
+
+    Transient errors are resent (see getinfo_retry()), all other errors are
+    raised as a classified EEQueryError instead of returning None.
+    If a result cache is enabled (see cache.enable()), repeated calls with the
+    same graph will return the cached result.
+    Additional keyword arguments are passed to getinfo_retry().
+
+    """
+    result_cache = cache.get_cache()
+    if result_cache is not None:
+        return result_cache.getinfo(ee_obj, n=n, **kwargs)
+    return getinfo_retry(ee_obj, n=n, **kwargs)
+
+
+def getinfo_bisect(build_func, items, merge_func, min_items=1, use_cache=True, **kwargs):
+    """Make a getInfo call, splitting the request in half on memory errors
+
+    Parameters
+    ----------
+    build_func : function
+        Function that builds the Earth Engine object for a list of items.
+    items : list
+        Items (i.e. dates, points, image IDs) to split the request on.
+    merge_func : function
+        Function that merges a list of partial getInfo outputs.
+    min_items : int, optional
+        Minimum number of items in a request (the default is 1).
+        A memory error on a request that can't be split is raised.
+    use_cache : bool, optional
+        If True (the default), each request is made with getinfo() so the
+        results are read from and stored in the result cache (if enabled).
+    kwargs : dict, optional
+        Additional keyword arguments passed to getinfo_retry().
+
+    Returns
+    -------
+    The merged getInfo() output
+
+    Raises
+    ------
+    EEMemoryError if the request fails after being split down to min_items
+
+    """
+    items = list(items)
+    getinfo_func = getinfo if use_cache else getinfo_retry
+    try:
+        return getinfo_func(build_func(items), **kwargs)
+    except EEMemoryError:
+        if len(items) < 2 * max(min_items, 1):
+            raise
+        logging.info(f'    Memory exceeded, splitting request ({len(items)} items)')
+
+    split = len(items) // 2
+    return merge_func([
+        getinfo_bisect(build_func, items[:split], merge_func, min_items, use_cache, **kwargs),
+        getinfo_bisect(build_func, items[split:], merge_func, min_items, use_cache, **kwargs),
+    ])
+
+
+def getinfo_date_bisect(build_func, start_date, end_date, merge_func, min_days=1, **kwargs):
+    """Make a getInfo call, splitting the date range in half on memory errors
+
+    Parameters
+    ----------
+    build_func : function
+        Function that builds the Earth Engine object for a start and end date.
+        The dates are passed as ISO format date strings (end date exclusive).
+    start_date : str
+        ISO format start date (inclusive).
+    end_date : str
+        ISO format end date (exclusive).
+    merge_func : function
+        Function that merges a list of partial getInfo outputs.
+    min_days : int, optional
+        Minimum number of days in a request (the default is 1).
+    kwargs : dict, optional
+        Additional keyword arguments passed to getinfo_bisect().
+
+    Returns
+    -------
+    The merged getInfo() output
+
+    """
+    start_dt = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.datetime.strptime(end_date, '%Y-%m-%d')
+    date_list = [
+        start_dt + datetime.timedelta(days=i) for i in range((end_dt - start_dt).days)
+    ]
+    if not date_list:
+        raise ValueError('end_date must be after start_date')
+
+    def build_dates(dates):
+        return build_func(
+            dates[0].strftime('%Y-%m-%d'),
+            (dates[-1] + datetime.timedelta(days=1)).strftime('%Y-%m-%d'),
+        )
+
+    return getinfo_bisect(build_dates, date_list, merge_func, min_days, **kwargs)
+
+
+def merge_region_lists(outputs):
+    """Merge getRegion outputs, keeping the header row from the first output"""
+    merged = list(outputs[0])
+    for output in outputs[1:]:
+        merged.extend(output[1:])
+    return merged
+
+
+def merge_feature_collections(outputs):
+    """Merge FeatureCollection getInfo outputs into a single collection"""
+    merged = dict(outputs[0])
+    merged['features'] = [f for output in outputs for f in output['features']]
+    return merged
+
+
 def constant_image_value(image, crs='EPSG:32613', scale=1):
     """Extract the output value from a calculation done with constant images"""
     rr_params = {
@@ -54,9 +474,20 @@ def point_image_value(image, xy, scale=1):
     return getinfo(ee.Image(image).reduceRegion(**rr_params))
 
 
-def point_coll_value(coll, xy, scale=1):
-    """Extract the output value from a calculation at a point"""
-    output = getinfo(coll.getRegion(ee.Geometry.Point(xy), scale=scale))
+def point_coll_value(coll, xy, scale=1, start_date=None, end_date=None):
+    """Extract the output value from a calculation at a point
+
+    If start_date and end_date (exclusive) are set, the request will be split
+    on the date range if it fails with a memory error.
+
+    """
+    if start_date and end_date:
+        output = getinfo_date_bisect(
+            lambda start, end: coll.filterDate(start, end).getRegion(ee.Geometry.Point(xy), scale=scale),
+            start_date, end_date, merge_region_lists,
+        )
+    else:
+        output = getinfo(coll.getRegion(ee.Geometry.Point(xy), scale=scale))
 
     # Structure output to easily be converted to a Pandas dataframe
     # First key is band name, second key is the date string
@@ -74,6 +505,237 @@ def point_coll_value(coll, xy, scale=1):
     # return pd.DataFrame.from_dict(info_dict)
 
 
+def geometry_bbox(geometry):
+    """Get the [xmin, ymin, xmax, ymax] bounding box of a geometry
+
+    Parameters
+    ----------
+    geometry : ee.Geometry, dict, list
+        Earth Engine geometry, GeoJSON geometry dictionary, or a bounding box
+        list.  Non-computed Earth Engine geometries (i.e. built from
+        coordinates) are read client side, computed geometries will make a
+        getInfo call.
+
+    Returns
+    -------
+    list
+
+    """
+    if isinstance(geometry, (list, tuple)) and len(geometry) == 4 and all(map(is_number, geometry)):
+        return [float(x) for x in geometry]
+
+    xy = _geometry_xy(geometry, lambda geom: geom.bounds(1))
+    return [
+        min(c[0] for c in xy), min(c[1] for c in xy),
+        max(c[0] for c in xy), max(c[1] for c in xy),
+    ]
+
+
+def geometry_hull(geometry, tolerance=None):
+    """Get the convex hull ring of a geometry
+
+    Parameters
+    ----------
+    geometry : ee.Geometry, dict, list
+        Earth Engine geometry, GeoJSON geometry dictionary, or a bounding box
+        list (see geometry_bbox()).  Computed Earth Engine geometries will
+        make a getInfo call for the server side convex hull.
+    tolerance : float, optional
+        Grid spacing in decimal degrees (the default is None).  If set, each
+        vertex is replaced with the corners of the grid cell it falls in,
+        which reduces the number of hull vertices while still containing
+        the geometry.
+
+    Returns
+    -------
+    list : closed counter-clockwise ring of [x, y] coordinates
+
+    """
+    if isinstance(geometry, (list, tuple)) and len(geometry) == 4 and all(map(is_number, geometry)):
+        xmin, ymin, xmax, ymax = [float(x) for x in geometry]
+        xy = [[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]]
+    else:
+        xy = _geometry_xy(geometry, lambda geom: geom.convexHull(1))
+
+    if tolerance:
+        xy = [
+            [x_func(c[0] / tolerance) * tolerance, y_func(c[1] / tolerance) * tolerance]
+            for c in xy
+            for x_func in [math.floor, math.ceil]
+            for y_func in [math.floor, math.ceil]
+        ]
+
+    # Andrew's monotone chain algorithm
+    points = sorted(set((float(c[0]), float(c[1])) for c in xy))
+    if len(points) < 3:
+        return [list(p) for p in points + points[:1]]
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    hull = lower[:-1] + upper[:-1]
+
+    return [list(p) for p in hull + hull[:1]]
+
+
+def geometry_intersects(geometry_a, geometry_b):
+    """Check if two GeoJSON geometries intersect
+
+    The test is planar (in the coordinate units), so geodesic edges are
+    treated as straight lines.  Touching geometries intersect.
+
+    Parameters
+    ----------
+    geometry_a : dict
+    geometry_b : dict
+        GeoJSON geometry dictionaries.
+
+    Returns
+    -------
+    bool
+
+    """
+    parts_a = list(_geometry_parts(geometry_a))
+    parts_b = list(_geometry_parts(geometry_b))
+
+    # Check if any of the edges (or points) cross
+    segments_a = [seg for rings in parts_a for ring in rings for seg in _ring_segments(ring)]
+    segments_b = [seg for rings in parts_b for ring in rings for seg in _ring_segments(ring)]
+    for a0, a1 in segments_a:
+        for b0, b1 in segments_b:
+            if _segments_intersect(a0, a1, b0, b1):
+                return True
+
+    # If no edges cross, a part is either fully inside or fully outside
+    #   each polygon of the other geometry, so one vertex can be tested
+    for parts, polygons in [(parts_a, parts_b), (parts_b, parts_a)]:
+        for rings in polygons:
+            if len(rings[0]) < 4:
+                continue
+            if any(_point_in_rings(part[0][0], rings) for part in parts):
+                return True
+    return False
+
+
+def _geometry_parts(geojson):
+    """Yield the rings of each point, line and polygon in a GeoJSON geometry"""
+    geom_type = geojson['type']
+    coords = geojson.get('coordinates')
+    if geom_type == 'GeometryCollection':
+        for geom in geojson['geometries']:
+            yield from _geometry_parts(geom)
+    elif geom_type == 'Point':
+        yield [[coords]]
+    elif geom_type == 'MultiPoint':
+        for point in coords:
+            yield [[point]]
+    elif geom_type in ['LineString', 'LinearRing']:
+        yield [coords]
+    elif geom_type == 'MultiLineString':
+        for line in coords:
+            yield [line]
+    elif geom_type == 'Polygon':
+        yield coords
+    elif geom_type == 'MultiPolygon':
+        for polygon in coords:
+            yield polygon
+    else:
+        raise ValueError(f'unsupported geometry type: {geom_type}')
+
+
+def _ring_segments(ring):
+    """Return the segments of a ring (a point is a zero length segment)"""
+    if len(ring) == 1:
+        return [(ring[0], ring[0])]
+    return list(zip(ring[:-1], ring[1:]))
+
+
+def _segments_intersect(a0, a1, b0, b1):
+    """Check if two line segments intersect (including touching)"""
+    # Skip segments with non-overlapping bounding boxes
+    if (max(a0[0], a1[0]) < min(b0[0], b1[0]) or max(b0[0], b1[0]) < min(a0[0], a1[0]) or
+            max(a0[1], a1[1]) < min(b0[1], b1[1]) or max(b0[1], b1[1]) < min(a0[1], a1[1])):
+        return False
+
+    def orientation(o, a, b):
+        value = (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+        return (value > 0) - (value < 0)
+
+    d1 = orientation(b0, b1, a0)
+    d2 = orientation(b0, b1, a1)
+    d3 = orientation(a0, a1, b0)
+    d4 = orientation(a0, a1, b1)
+    if d1 != d2 and d3 != d4:
+        return True
+    # Collinear segments intersect since the bounding boxes overlap
+    return d1 == d2 == d3 == d4 == 0
+
+
+def _point_in_rings(xy, rings):
+    """Check if a point is inside a polygon (even-odd rule, holes are excluded)"""
+    inside = False
+    for ring in rings:
+        for (x0, y0), (x1, y1) in zip(ring[:-1], ring[1:]):
+            if (y0 > xy[1]) != (y1 > xy[1]):
+                if xy[0] < x0 + (xy[1] - y0) * (x1 - x0) / (y1 - y0):
+                    inside = not inside
+    return inside
+
+
+def _geometry_xy(geometry, computed_func):
+    """Get the vertex coordinates of a geometry
+
+    Parameters
+    ----------
+    geometry : ee.Geometry, dict
+    computed_func : function
+        Function returning a simpler geometry to request when a computed
+        Earth Engine geometry can't be read client side.
+
+    Returns
+    -------
+    list of [x, y]
+
+    Raises
+    ------
+    ValueError if the geometry has no coordinates
+
+    """
+    if isinstance(geometry, ee.Geometry):
+        try:
+            geometry = geometry.toGeoJSON()
+        except ee.ee_exception.EEException:
+            # Computed geometries can't be converted client side
+            geometry = getinfo(computed_func(geometry))
+
+    def coords(geojson):
+        if 'geometries' in geojson.keys():
+            for geom in geojson['geometries']:
+                yield from coords(geom)
+            return
+        stack = [geojson['coordinates']]
+        while stack:
+            item = stack.pop()
+            if item and is_number(item[0]):
+                yield item
+            else:
+                stack.extend(item)
+
+    xy = list(coords(geometry))
+    if not xy:
+        raise ValueError('geometry has no coordinates')
+    return xy
+
+
 def date_0utc(date):
     """Get the 0 UTC date for a date
 
@@ -0,0 +1,401 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+from . import export
+
+STATES = ['pending', 'leased', 'done', 'failed']
+
+
+class LeaseLostError(RuntimeError):
+    """The job lease expired and was requeued (or claimed) by another worker"""
+    pass
+
+
+class Lease:
+    """A claimed job"""
+
+    def __init__(self, job, path, worker_id, expires):
+        self.job = job
+        self.path = path
+        self.worker_id = worker_id
+        self.expires = expires
+
+    @property
+    def job_id(self):
+        return self.job['id']
+
+    @property
+    def payload(self):
+        return self.job['payload']
+
+
+class WorkQueue:
+    """Work queue in a shared directory, with atomic rename leases
+
+    Each job is a JSON file that is moved between the "pending", "leased",
+    "done" and "failed" sub folders with os.rename(), which is atomic on
+    local and NFS file systems, so only one worker can claim a job.  The
+    lease expiration time and the worker ID are part of the leased file
+    name and leases that are not renewed before they expire are requeued.
+
+    Notes
+    -----
+    The lease times are compared against each machine's clock, so the
+    lease time should be much longer than the clock skew between workers.
+
+    """
+
+    def __init__(self, root, lease_seconds=3600, max_attempts=3):
+        """
+
+        Parameters
+        ----------
+        root : str
+            Queue folder path (on the shared file system).
+        lease_seconds : float, optional
+            Lease duration (the default is 3600).
+        max_attempts : int, optional
+            Maximum number of times a job is run before it is moved to the
+            "failed" folder (the default is 3).
+
+        """
+        self.root = root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for folder in STATES + ['tmp', 'stats']:
+            os.makedirs(os.path.join(root, folder), exist_ok=True)
+
+    def _path(self, state, name):
+        return os.path.join(self.root, state, name)
+
+    def _write(self, job, path):
+        """Write a job file atomically"""
+        tmp_path = self._path('tmp', f'{uuid.uuid4().hex}.json')
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def put(self, job_id, payload):
+        """Add a job to the queue
+
+        Parameters
+        ----------
+        job_id : str
+        payload : dict
+            JSON serializable job parameters.
+
+        Returns
+        -------
+        bool : False if the job is already in the queue (in any state)
+
+        Raises
+        ------
+        ValueError if the job ID contains a path separator or "@"
+
+        """
+        if '@' in job_id or os.sep in job_id:
+            raise ValueError(f'invalid job ID: {job_id}')
+        if any(self._find(state, job_id) for state in STATES):
+            return False
+        self._write({'id': job_id, 'payload': payload, 'attempts': 0}, self._path('pending', f'{job_id}.json'))
+        return True
+
+    def _find(self, state, job_id):
+        if state == 'leased':
+            return [
+                name for name in os.listdir(self._path('leased', ''))
+                if name.split('@')[0] == job_id
+            ]
+        return [f'{job_id}.json'] if os.path.isfile(self._path(state, f'{job_id}.json')) else []
+
+    def _lease_name(self, job_id, worker_id, expires):
+        return f'{job_id}@{worker_id}@{int(expires)}.json'
+
+    def claim(self, worker_id):
+        """Claim the next pending job
+
+        Parameters
+        ----------
+        worker_id : str
+
+        Returns
+        -------
+        Lease or None if there are no pending jobs
+
+        """
+        if '@' in worker_id or os.sep in worker_id:
+            raise ValueError(f'invalid worker ID: {worker_id}')
+        for name in sorted(os.listdir(self._path('pending', ''))):
+            job_id = name[:-len('.json')]
+            expires = time.time() + self.lease_seconds
+            lease_path = self._path('leased', self._lease_name(job_id, worker_id, expires))
+            try:
+                os.rename(self._path('pending', name), lease_path)
+            except FileNotFoundError:
+                # Another worker claimed the job first
+                continue
+            with open(lease_path) as f:
+                job = json.load(f)
+            return Lease(job, lease_path, worker_id, expires)
+        return None
+
+    def renew(self, lease):
+        """Extend a lease
+
+        Raises
+        ------
+        LeaseLostError if the lease was requeued by another worker
+
+        """
+        expires = time.time() + self.lease_seconds
+        lease_path = self._path('leased', self._lease_name(lease.job_id, lease.worker_id, expires))
+        try:
+            os.rename(lease.path, lease_path)
+        except FileNotFoundError:
+            raise LeaseLostError(f'lease for job {lease.job_id} was lost') from None
+        lease.path, lease.expires = lease_path, expires
+
+    def _release(self, lease):
+        """Move the leased file out of the leased folder before updating it"""
+        tmp_path = self._path('tmp', os.path.basename(lease.path))
+        try:
+            os.rename(lease.path, tmp_path)
+        except FileNotFoundError:
+            raise LeaseLostError(f'lease for job {lease.job_id} was lost') from None
+        return tmp_path
+
+    def complete(self, lease, result=None):
+        """Move a leased job to the "done" folder
+
+        Raises
+        ------
+        LeaseLostError if the lease was requeued by another worker
+
+        """
+        tmp_path = self._release(lease)
+        job = dict(lease.job, attempts=lease.job['attempts'] + 1, worker_id=lease.worker_id, result=result)
+        self._write(job, self._path('done', f'{lease.job_id}.json'))
+        os.remove(tmp_path)
+
+    def fail(self, lease, error=None):
+        """Requeue a leased job, or move it to the "failed" folder
+
+        Raises
+        ------
+        LeaseLostError if the lease was requeued by another worker
+
+        """
+        tmp_path = self._release(lease)
+        job = dict(lease.job, attempts=lease.job['attempts'] + 1, error=error)
+        state = 'pending' if job['attempts'] < self.max_attempts else 'failed'
+        self._write(job, self._path(state, f'{lease.job_id}.json'))
+        os.remove(tmp_path)
+
+    def requeue_expired(self, now=None):
+        """Requeue (or fail) the jobs with expired leases
+
+        Returns
+        -------
+        list : the requeued job IDs
+
+        """
+        now = time.time() if now is None else now
+        requeued = []
+        for name in os.listdir(self._path('leased', '')):
+            try:
+                job_id, worker_id, expires = name[:-len('.json')].split('@')
+            except ValueError:
+                continue
+            if int(expires) >= now:
+                continue
+            try:
+                with open(self._path('leased', name)) as f:
+                    job = json.load(f)
+            except FileNotFoundError:
+                # The lease was renewed or released after the listing
+                continue
+            try:
+                self.fail(Lease(job, self._path('leased', name), worker_id, int(expires)), error='lease expired')
+            except LeaseLostError:
+                continue
+            logging.info(f'  Requeued expired job {job_id} from {worker_id}')
+            requeued.append(job_id)
+        return requeued
+
+    def counts(self):
+        """Return the number of jobs in each state"""
+        return {state: len(os.listdir(self._path(state, ''))) for state in STATES}
+
+    def record(self, worker_id, job_id, seconds, units=1):
+        """Append a job timing to the worker's stats file"""
+        with open(self._path('stats', f'{worker_id}.jsonl'), 'a') as f:
+            f.write(json.dumps({
+                'job_id': job_id, 'seconds': seconds, 'units': units, 'time': time.time(),
+            }) + '\n')
+
+    def throughput(self):
+        """Return the jobs, units, busy seconds and units per hour of each worker"""
+        output = {}
+        for name in sorted(os.listdir(self._path('stats', ''))):
+            with open(self._path('stats', name)) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            seconds = sum(row['seconds'] for row in rows)
+            units = sum(row['units'] for row in rows)
+            output[name[:-len('.jsonl')]] = {
+                'jobs': len(rows),
+                'units': units,
+                'seconds': seconds,
+                'units_per_hour': 3600 * units / seconds if seconds else None,
+            }
+        return output
+
+
+class Worker:
+    """Claim and run jobs from a work queue until it is empty"""
+
+    def __init__(self, queue, run_func, worker_id=None):
+        """
+
+        Parameters
+        ----------
+        queue : WorkQueue
+        run_func : function
+            Function called with the job payload, returning a JSON
+            serializable result.
+        worker_id : str, optional
+            The default is "{hostname}-{pid}".
+
+        """
+        self.queue = queue
+        self.run_func = run_func
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+
+    def _heartbeat(self, lease, stop_event):
+        while not stop_event.wait(self.queue.lease_seconds / 3):
+            try:
+                self.queue.renew(lease)
+            except LeaseLostError as e:
+                logging.warning(f'  {e}')
+                return
+
+    def run(self, max_jobs=None):
+        """Run jobs until the queue is empty (or max_jobs have been run)
+
+        Returns
+        -------
+        int : number of jobs run
+
+        """
+        job_count = 0
+        while max_jobs is None or job_count < max_jobs:
+            self.queue.requeue_expired()
+            lease = self.queue.claim(self.worker_id)
+            if lease is None:
+                break
+
+            stop_event = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(lease, stop_event), daemon=True)
+            heartbeat.start()
+            start_time = time.perf_counter()
+            try:
+                result = self.run_func(lease.payload)
+            except Exception as e:
+                logging.warning(f'  {lease.job_id}: {e}')
+                stop_event.set()
+                heartbeat.join()
+                try:
+                    self.queue.fail(lease, error=str(e))
+                except LeaseLostError as lost:
+                    logging.warning(f'  {lost}')
+            else:
+                stop_event.set()
+                heartbeat.join()
+                seconds = time.perf_counter() - start_time
+                try:
+                    self.queue.complete(lease, result=result)
+                except LeaseLostError as lost:
+                    logging.warning(f'  {lost}')
+                else:
+                    self.queue.record(self.worker_id, lease.job_id, seconds, lease.payload.get('units', 1))
+                    logging.info(f'  {lease.job_id}: {seconds:.1f}s')
+            job_count += 1
+
+        return job_count
+
+
+def tile_jobs(tiles, date_windows, coll_args, interp_args, description='sims_{tile_id}_{start_date}'):
+    """Build the work queue jobs for each tile and date window
+
+    Parameters
+    ----------
+    tiles : list
+        Tiles from export.tile_grid().
+    date_windows : list
+        (start_date, end_date) tuples.
+    coll_args : dict
+        Collection keyword arguments (the geometry and dates are set for each job).
+    interp_args : dict
+        Collection.interpolate() keyword arguments.
+    description : str, optional
+        Job ID and task description format, with "tile_id" and "start_date"
+        fields (the default is 'sims_{tile_id}_{start_date}').
+
+    Returns
+    -------
+    dict : job payloads keyed on the job ID
+
+    """
+    jobs = {}
+    for tile in tiles:
+        for start_date, end_date in date_windows:
+            job_id = description.format(tile_id=tile['id'], start_date=start_date.replace('-', ''))
+            jobs[job_id] = {
+                'tile': tile,
+                'description': job_id,
+                'coll_args': dict(coll_args, start_date=start_date, end_date=end_date),
+                'interp_args': interp_args,
+            }
+    return jobs
+
+
+def export_tile_job(task_api, poll_seconds=30, max_wait=6 * 3600):
+    """Return a job function that exports a tile and waits for the task
+
+    Parameters
+    ----------
+    task_api : export.EETaskAPI, export.LocalTaskAPI
+    poll_seconds : float, optional
+        Seconds between task status checks (the default is 30).
+    max_wait : float, optional
+        Maximum seconds to wait for the task (the default is 6 hours).
+
+    Returns
+    -------
+    function : run_func(payload) for Worker
+
+    Raises
+    ------
+    RuntimeError (from the returned function) if the export task fails, is
+        in a state that is not active (i.e. 'UNKNOWN' for a purged task ID),
+        or doesn't finish within max_wait
+
+    """
+    def run_func(payload):
+        build_func = export.interpolate_build_func(payload['coll_args'], payload['interp_args'])
+        task_id = task_api.start(build_func(payload['tile']), payload['description'], payload['tile'])
+        start_time = time.monotonic()
+        while True:
+            state = task_api.status(task_id)
+            if state in export.DONE_STATES:
+                return {'task_id': task_id, 'state': state}
+            elif state not in export.ACTIVE_STATES:
+                raise RuntimeError(f'task {task_id} {state}')
+            elif time.monotonic() - start_time > max_wait:
+                raise RuntimeError(f'task {task_id} still {state} after {max_wait}s')
+            time.sleep(poll_seconds)
+    return run_func
@@ -0,0 +1,190 @@
+import collections
+import json
+import logging
+import math
+
+import ee
+
+from . import utils
+
+
+class WRS2Index:
+    """Grid index of the Landsat WRS2 path/row footprint bounding boxes
+
+    The index resolves a geometry to the WRS2 path/rows whose footprint
+    bounding box intersects the geometry bounding box, without a request.
+    Since only bounding boxes are compared, the path/rows are a superset of
+    the scenes that actually intersect the geometry.
+
+    """
+
+    def __init__(self, footprints, cell_size=1.0):
+        """
+
+        Parameters
+        ----------
+        footprints : dict
+            Footprint [xmin, ymin, xmax, ymax] bounding boxes (in decimal
+            degrees) keyed on the (path, row) tuple.
+        cell_size : float, optional
+            Grid cell size in decimal degrees (the default is 1.0).
+
+        """
+        if cell_size <= 0:
+            raise ValueError('cell_size must be greater than zero')
+        self.cell_size = cell_size
+        self.footprints = {}
+        self._grid = collections.defaultdict(list)
+
+        for (wrs_path, wrs_row), bbox in footprints.items():
+            bbox = [float(x) for x in bbox]
+            # Footprints crossing the antimeridian have a bounding box
+            #   that wraps the globe and are not indexed
+            if bbox[2] - bbox[0] > 180:
+                logging.debug(f'  Skipping antimeridian footprint {wrs_path}/{wrs_row}')
+                continue
+            key = (int(wrs_path), int(wrs_row))
+            self.footprints[key] = bbox
+            for cell in self._cells(bbox):
+                self._grid[cell].append(key)
+
+    def __len__(self):
+        return len(self.footprints)
+
+    def _cells(self, bbox):
+        for i in range(math.floor(bbox[0] / self.cell_size), math.floor(bbox[2] / self.cell_size) + 1):
+            for j in range(math.floor(bbox[1] / self.cell_size), math.floor(bbox[3] / self.cell_size) + 1):
+                yield i, j
+
+    def query(self, geometry):
+        """Return the WRS2 path/rows intersecting a geometry
+
+        Parameters
+        ----------
+        geometry : ee.Geometry, dict, list
+            Geometry or [xmin, ymin, xmax, ymax] bounding box
+            (see utils.geometry_bbox()).
+
+        Returns
+        -------
+        list of (path, row) tuples, sorted
+
+        """
+        bbox = utils.geometry_bbox(geometry)
+        candidates = {key for cell in self._cells(bbox) for key in self._grid.get(cell, [])}
+        return sorted(
+            key for key in candidates
+            if (self.footprints[key][0] <= bbox[2] and self.footprints[key][2] >= bbox[0] and
+                self.footprints[key][1] <= bbox[3] and self.footprints[key][3] >= bbox[1])
+        )
+
+    def covers(self, geometry, samples=5):
+        """Check if the indexed footprints cover a geometry bounding box
+
+        The bounding box is checked at a grid of sample points, so a small
+        gap between the footprints may not be detected.
+
+        Parameters
+        ----------
+        geometry : ee.Geometry, dict, list
+        samples : int, optional
+            Number of sample points along each axis (the default is 5).
+
+        Returns
+        -------
+        bool
+
+        """
+        bbox = utils.geometry_bbox(geometry)
+        path_rows = self.query(bbox)
+        steps = [i / (samples - 1) for i in range(samples)] if samples > 1 else [0.5]
+        for x in [bbox[0] + f * (bbox[2] - bbox[0]) for f in steps]:
+            for y in [bbox[1] + f * (bbox[3] - bbox[1]) for f in steps]:
+                if not any(
+                        self.footprints[key][0] <= x <= self.footprints[key][2] and
+                        self.footprints[key][1] <= y <= self.footprints[key][3]
+                        for key in path_rows):
+                    return False
+        return True
+
+    def filter(self, geometry):
+        """Return a WRS_PATH/WRS_ROW metadata filter for a geometry
+
+        A warning is logged if no path/rows intersect the geometry (the
+        collection is then not prefiltered), or if the footprints only cover
+        part of the geometry, since the scenes of the path/rows missing from
+        the index would be removed by the filter.
+
+        Parameters
+        ----------
+        geometry : ee.Geometry, dict, list
+
+        Returns
+        -------
+        ee.Filter or None if no path/rows intersect the geometry
+
+        """
+        path_rows = self.query(geometry)
+        if not path_rows:
+            logging.warning(
+                'The geometry is outside the WRS2 index footprints, '
+                'the collection will not be prefiltered on path/row'
+            )
+            return None
+        elif not self.covers(geometry):
+            logging.warning(
+                'The WRS2 index footprints only cover part of the geometry, '
+                'scenes of path/rows missing from the index will be dropped'
+            )
+        return ee.Filter.Or([
+            ee.Filter.And(ee.Filter.eq('WRS_PATH', wrs_path), ee.Filter.eq('WRS_ROW', wrs_row))
+            for wrs_path, wrs_row in path_rows
+        ])
+
+    @classmethod
+    def from_catalog(cls, scene_catalog, collections=None, cell_size=1.0):
+        """Build the index from the scene footprints in a scene catalog
+
+        Parameters
+        ----------
+        scene_catalog : openet.sims.catalog.SceneCatalog
+        collections : list, optional
+            Only use the scenes from these collections (the default is None).
+        cell_size : float, optional
+
+        Returns
+        -------
+        WRS2Index
+
+        """
+        return cls(scene_catalog.footprints(collections), cell_size=cell_size)
+
+    @classmethod
+    def from_geojson(cls, path, path_property='PATH', row_property='ROW', cell_size=1.0):
+        """Build the index from a WRS2 footprint GeoJSON FeatureCollection
+
+        Parameters
+        ----------
+        path : str
+            GeoJSON file path (i.e. the USGS WRS2 descending polygons).
+        path_property : str, optional
+            The default is 'PATH'.
+        row_property : str, optional
+            The default is 'ROW'.
+        cell_size : float, optional
+
+        Returns
+        -------
+        WRS2Index
+
+        """
+        with open(path) as f:
+            features = json.load(f)['features']
+        return cls(
+            {
+                (ftr['properties'][path_property], ftr['properties'][row_property]):
+                    utils.geometry_bbox(ftr['geometry'])
+                for ftr in features
+            },
+            cell_size=cell_size,
+        )